@@ -0,0 +1 @@
+"""Benchmarks for BlazeMeter API Monitoring MCP Server"""
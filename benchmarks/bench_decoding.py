@@ -0,0 +1,98 @@
+"""
+Benchmark: decoding API responses via Python dicts vs straight from the JSON bytes.
+
+Decodes synthetic response bodies of test results and environments. The dict mode is how
+api_request used to work, `json.loads` of the body into dicts that `format_models` then validates
+and dumps; the bytes mode is `api_client._decode`, which validates the body into the formatter's
+model with pydantic-core and dumps it, without the intermediate dicts. Environments have a before
+model validator, which needs the dicts anyway, so for them the bytes mode parses the body with the
+pydantic-core JSON parser and formats the dicts.
+
+The bytes mode only pays off for large bodies: below a few hundred kB both modes take about as long,
+within the noise of a shared machine. `_decode` therefore takes it for bodies of at least
+JSON_BYTES_DECODE_MIN_SIZE bytes only; the last column shows the mode it takes. The benchmark lowers
+the threshold to time the bytes mode at every size.
+
+Usage:
+    python -m benchmarks.bench_decoding [--sizes 50 1000 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+
+from benchmarks.bench_formatters import best_of, make_result
+from src.common import api_client
+from src.common.api_client import _decode
+from src.config.defaults import JSON_BYTES_DECODE_MIN_SIZE
+from src.formatters.environment import format_environments
+from src.formatters.result import format_results
+
+
+def make_environment(i: int) -> dict:
+    return {
+        "id": f"env_{i}",
+        "test_id": "test_123",
+        "name": f"Environment {i}",
+        "parent_environment_id": None,
+        "initial_variables": {f"var_{v}": f"value_{v}" for v in range(10)},
+        "retry_on_failure": False,
+        "script": "var now = Date.now();",
+        "webhooks": [],
+        "integrations": [{"id": "int_1", "type": "slack", "description": "Alerts"}],
+        "emails": {"recipients": [{"email": "qa@example.com", "name": "QA"}]},
+        "preserve_cookies": True,
+        "stop_on_failure": False,
+        "verify_ssl": True,
+        "http_version_support": "h1",
+        "force_h2c": False,
+        "regions": ["us1", "eu1"],
+        "remote_agents": [],
+        "headers": {"Accept": ["application/json"]},
+        "pre_request_scripts": [],
+        "post_response_scripts": [],
+        "auth": {"auth_type": "basic", "username": "user", "password": "secret"},
+    }
+
+
+def via_dicts(formatter):
+    def decode(body: bytes) -> list:
+        return formatter(json.loads(body)["data"])
+
+    return decode
+
+
+def via_bytes(formatter):
+    def decode(body: bytes) -> list:
+        return _decode(body, formatter, None)[0]
+
+    return decode
+
+
+def main(sizes: list, requests: int, repeat: int) -> None:
+    payloads = [
+        ("results", format_results, lambda i: make_result(i, requests)),
+        ("environments", format_environments, make_environment),
+    ]
+    print(f"requests per result={requests} repeat={repeat} (best of)")
+    print(f"{'payload':>14}{'items':>8}{'size':>10}{'dicts':>14}{'bytes':>14}{'speedup':>10}{'_decode':>9}")
+    api_client.JSON_BYTES_DECODE_MIN_SIZE = 0
+    for name, formatter, make in payloads:
+        for size in sizes:
+            body = json.dumps({"data": [make(i) for i in range(size)], "error": None}).encode()
+            assert via_dicts(formatter)(body) == via_bytes(formatter)(body)
+            dicts_s = best_of(via_dicts(formatter), body, repeat)
+            bytes_s = best_of(via_bytes(formatter), body, repeat)
+            mode = "bytes" if len(body) >= JSON_BYTES_DECODE_MIN_SIZE else "dicts"
+            print(
+                f"{name:>14}{size:>8}{len(body) / 1024:>8.0f}kB{dicts_s * 1000:>12.2f}ms"
+                f"{bytes_s * 1000:>12.2f}ms{dicts_s / bytes_s:>9.2f}x{mode:>9}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 1000, 10000])
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.sizes, args.requests, args.repeat)
@@ -0,0 +1,142 @@
+"""
+Benchmark: per-item model formatting vs batch TypeAdapter formatting.
+
+Formats synthetic items shaped like the API's: buckets, whose only nested model is their team, and
+test results, each with a few request results holding lists of assertions and scripts. The per-item
+mode is how formatters used to work, `Model(**item).model_dump(by_alias=False)` in a Python loop; the
+batch mode validates and dumps the whole list with one cached `TypeAdapter(List[Model])`.
+
+Batching wins on buckets but loses on test results, whose lists of nested models are slower to
+validate and dump through the list adapter. `format_models` therefore batches only models without
+lists of models; the last column shows the path it takes.
+
+Usage:
+    python -m benchmarks.bench_formatters [--sizes 50 1000 10000] [--repeat 5]
+"""
+
+import argparse
+import gc
+import time
+from functools import partial
+
+from src.formatters.base import has_model_lists, list_adapter
+from src.models.bucket import Bucket
+from src.models.result import TestResult
+
+
+def make_bucket(i: int, requests: int) -> dict:
+    return {
+        "key": f"bucket_{i}",
+        "name": f"Bucket {i}",
+        "created_at": 1700000000 + i,
+        "default": i == 0,
+        "is_private": False,
+        "tests_count": requests,
+        "trigger_url": f"https://api.runscope.com/radar/bucket/{i}/trigger",
+        "team": {"id": "team_1", "name": "Payments"},
+    }
+
+
+def make_result(i: int, requests: int) -> dict:
+    return {
+        "test_run_id": f"run_{i}",
+        "bucket_key": "bucket_abc",
+        "test_id": "test_123",
+        "test_name": "Checkout flow",
+        "assertions_defined": requests * 2,
+        "assertions_failed": i % 2,
+        "assertions_passed": requests * 2 - i % 2,
+        "variables_defined": 1,
+        "variables_passed": 1,
+        "variables_failed": 0,
+        "scripts_defined": 1,
+        "scripts_passed": 1,
+        "scripts_failed": 0,
+        "started_at": 1700000000.0 + i,
+        "finished_at": 1700000001.5 + i,
+        "requests_executed": requests,
+        "result": "fail" if i % 2 else "pass",
+        "source": "scheduled",
+        "region": "us1",
+        "environment_id": "env_1",
+        "requests": [
+            {
+                "url": f"https://example.com/api/items/{r}",
+                "method": "GET",
+                "uuid": f"step_{r}",
+                "result": "pass",
+                "assertions": [
+                    {
+                        "result": "pass",
+                        "source": "response_status",
+                        "comparison": "equal_number",
+                        "target_value": 200,
+                        "actual_value": 200,
+                    },
+                    {
+                        "result": "pass",
+                        "source": "response_json",
+                        "property": "data.id",
+                        "comparison": "not_empty",
+                        "target_value": None,
+                        "actual_value": r,
+                    },
+                ],
+                "scripts": [{"result": "pass", "output": "ok"}],
+                "assertions_defined": 2,
+                "assertions_passed": 2,
+                "assertions_failed": 0,
+                "timings": {"dns_lookup_ms": 1.2, "connect_time_ms": 10.5, "response_time_ms": 85.0},
+            }
+            for r in range(requests)
+        ],
+    }
+
+
+def per_item(model, items: list) -> list:
+    return [model(**item).model_dump(by_alias=False) for item in items]
+
+
+def batch(model, items: list) -> list:
+    adapter = list_adapter(model)
+    return adapter.dump_python(adapter.validate_python(items), by_alias=False)
+
+
+def best_of(fn, items: list, repeat: int) -> float:
+    # Like timeit, collect garbage up front and keep the collector out of the timings
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(items)
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def main(sizes: list, requests: int, repeat: int) -> None:
+    print(f"requests per result={requests} repeat={repeat} (best of)")
+    print(f"{'model':>12}{'items':>8}{'per-item':>14}{'batch':>14}{'speedup':>10}{'format_models':>15}")
+    for model, make in ((Bucket, make_bucket), (TestResult, make_result)):
+        path = "per-item" if has_model_lists(model) else "batch"
+        for size in sizes:
+            items = [make(i, requests) for i in range(size)]
+            assert per_item(model, items) == batch(model, items)
+            loop_s = best_of(partial(per_item, model), items, repeat)
+            batch_s = best_of(partial(batch, model), items, repeat)
+            print(
+                f"{model.__name__:>12}{size:>8}{loop_s * 1000:>12.2f}ms{batch_s * 1000:>12.2f}ms"
+                f"{loop_s / batch_s:>9.2f}x{path:>15}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 1000, 10000])
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.sizes, args.requests, args.repeat)
@@ -0,0 +1,141 @@
+"""
+Benchmark: HTTP/1.1 vs HTTP/2 transport of the shared API client.
+
+Runs a local stand-in for the APIM API that speaks both HTTP/1.1 and cleartext HTTP/2 (prior
+knowledge) and replays the fan-out pattern of agents reading a whole bucket: rounds of parallel
+GETs. Each new connection pays a simulated TLS handshake and each response a simulated server
+latency, so the numbers reflect connection setup and head-of-line blocking, not raw throughput.
+
+Usage:
+    python -m benchmarks.bench_http_transport [--rounds 10] [--fanout 40]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import h2.config
+import h2.connection
+import h2.events
+import h11
+
+from src.common.api_client import build_client
+
+H2_PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+
+
+class StandInServer:
+    """Minimal APIM stand-in answering every request with a small JSON test list."""
+
+    def __init__(self, handshake_s: float, latency_s: float):
+        self.handshake_s = handshake_s
+        self.latency_s = latency_s
+        self.connections = 0
+        self.body = json.dumps(
+            {"data": [{"id": f"test_{i}", "name": f"Test {i}"} for i in range(20)], "error": None}
+        ).encode()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        await asyncio.sleep(self.handshake_s)
+        try:
+            first = await reader.read(65535)
+            if first.startswith(H2_PREFACE):
+                await self._serve_h2(first, reader, writer)
+            else:
+                await self._serve_h11(first, reader, writer)
+        except (ConnectionError, h11.RemoteProtocolError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_h11(self, data: bytes, reader, writer) -> None:
+        conn = h11.Connection(h11.SERVER)
+        conn.receive_data(data)
+        while True:
+            event = conn.next_event()
+            if event is h11.NEED_DATA:
+                data = await reader.read(65535)
+                conn.receive_data(data)
+                if not data:
+                    return
+            elif isinstance(event, h11.EndOfMessage):
+                await asyncio.sleep(self.latency_s)
+                headers = [("content-type", "application/json"), ("content-length", str(len(self.body)))]
+                writer.write(conn.send(h11.Response(status_code=200, headers=headers)))
+                writer.write(conn.send(h11.Data(data=self.body)))
+                writer.write(conn.send(h11.EndOfMessage()))
+                await writer.drain()
+                conn.start_next_cycle()
+            elif isinstance(event, h11.ConnectionClosed):
+                return
+
+    async def _serve_h2(self, data: bytes, reader, writer) -> None:
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        tasks = set()
+
+        async def respond(stream_id: int) -> None:
+            await asyncio.sleep(self.latency_s)
+            headers = [
+                (":status", "200"),
+                ("content-type", "application/json"),
+                ("content-length", str(len(self.body))),
+            ]
+            conn.send_headers(stream_id, headers)
+            conn.send_data(stream_id, self.body, end_stream=True)
+            writer.write(conn.data_to_send())
+            await writer.drain()
+
+        while data:
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    task = asyncio.create_task(respond(event.stream_id))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+            writer.write(conn.data_to_send())
+            await writer.drain()
+            data = await reader.read(65535)
+
+
+async def run_mode(base_url: str, http2: bool, rounds: int, fanout: int) -> list:
+    client = build_client(base_url=base_url, http2=http2, http1=not http2)
+    durations = []
+    async with client:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            responses = await asyncio.gather(
+                *(client.get(f"/buckets/bucket_abc/tests/test_{i}/steps") for i in range(fanout))
+            )
+            durations.append(time.perf_counter() - start)
+            assert all(resp.status_code == 200 for resp in responses)
+    return durations
+
+
+async def main(rounds: int, fanout: int, handshake_ms: float, latency_ms: float) -> None:
+    print(f"rounds={rounds} fanout={fanout} handshake={handshake_ms}ms latency={latency_ms}ms")
+    print(f"{'mode':<10}{'connections':>13}{'first round':>14}{'median round':>14}{'total':>10}")
+    for label, http2 in (("HTTP/1.1", False), ("HTTP/2", True)):
+        stand_in = StandInServer(handshake_ms / 1000, latency_ms / 1000)
+        server = await asyncio.start_server(stand_in.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            durations = await run_mode(f"http://127.0.0.1:{port}", http2, rounds, fanout)
+        print(
+            f"{label:<10}{stand_in.connections:>13}{durations[0] * 1000:>12.1f}ms"
+            f"{statistics.median(durations) * 1000:>12.1f}ms{sum(durations) * 1000:>8.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--fanout", type=int, default=40)
+    parser.add_argument("--handshake-ms", type=float, default=60.0)
+    parser.add_argument("--latency-ms", type=float, default=25.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds, args.fanout, args.handshake_ms, args.latency_ms))
@@ -7,9 +7,11 @@ from typing import Literal, cast
 
 from mcp.server.fastmcp import FastMCP
 
+from src.common.api_client import client_lifespan, on_startup
 from src.config.token import BzmApimToken, BzmApimTokenError
 from src.config.version import __version__, __executable__
-from src.server import register_tools
+from src.config.defaults import PREWARM_REQUEST_BUDGET
+from src.server import prewarm_cache, register_tools
 
 BLAZEMETER_APIM_KEY_FILE_PATH = os.getenv('BZM_API_TEST_TOKEN_FILE')
 
@@ -79,6 +81,9 @@ def run(log_level: str = "CRITICAL"):
            error message or tool call result itself will have the error field populated.
         - You can use list_buckets to get all buckets the user has access to. Each bucket object contains 
            the team_id it belongs to.
+        - To find a test, bucket or team by name, e.g. "checkout smoke test in payments team", invoke the
+           'search' action on teams tools instead of listing teams, buckets and tests one by one. It returns
+           the team_id, bucket_key, test_id and trigger_url of the best matches in one call.
         - If you have the information needed to call a tool action with its arguments, do so.
         - Read action always get more information about a particular item than the list action, 
            list only display minimal information.
@@ -93,8 +98,11 @@ def run(log_level: str = "CRITICAL"):
             results: Test execution results belong to a particular test.
     """
     mcp = FastMCP("blazemeter-apitest-mcp", instructions=instructions,
-                  log_level=cast(LOG_LEVELS, log_level))
+                  log_level=cast(LOG_LEVELS, log_level), lifespan=client_lifespan)
     register_tools(mcp, token)
+    if token and PREWARM_REQUEST_BUDGET > 0:
+        # Fill the cache in the background while the agent starts up, without delaying stdio readiness
+        on_startup(lambda: prewarm_cache(token))
     mcp.run(transport="stdio")
 
 
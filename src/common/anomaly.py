@@ -0,0 +1,102 @@
+"""
+Streaming anomaly detection over the response time series of test metrics
+"""
+
+from bisect import insort
+from collections import deque
+from typing import Iterable, List, Optional
+
+from src.config.defaults import (
+    ANOMALY_MIN_LATENCY_RATIO,
+    ANOMALY_MIN_POINTS,
+    ANOMALY_MIN_SUCCESS_DROP,
+    ANOMALY_THRESHOLD,
+    ANOMALY_WINDOW,
+)
+
+# Scales the median absolute deviation to the standard deviation of normally distributed values
+MAD_SCALE: float = 1.4826
+
+
+class RollingMedian:
+    """
+    Median and median absolute deviation of the last `window` values pushed, kept sorted so each push
+    costs O(window).
+    """
+
+    def __init__(self, window: int):
+        self._values = deque(maxlen=window)
+        self._sorted: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def push(self, value: float) -> None:
+        if len(self._values) == self._values.maxlen:
+            self._sorted.remove(self._values[0])
+        self._values.append(value)
+        insort(self._sorted, value)
+
+    def median(self) -> float:
+        return _median(self._sorted)
+
+    def mad(self) -> float:
+        median = self.median()
+        return MAD_SCALE * _median(sorted(abs(value - median) for value in self._sorted))
+
+
+def detect_anomalies(
+    points: Iterable[dict],
+    window: int = ANOMALY_WINDOW,
+    threshold: float = ANOMALY_THRESHOLD,
+) -> List[dict]:
+    """
+    Flag the latency spikes and success ratio dips of a response time series, oldest point first.
+    Each point is judged against the rolling median of the `window` points before it, once there are
+    ANOMALY_MIN_POINTS of them: it is anomalous when it deviates from the median by more than
+    `threshold` median absolute deviations, and by enough to matter, i.e. a latency of at least
+    ANOMALY_MIN_LATENCY_RATIO times the median or a success ratio ANOMALY_MIN_SUCCESS_DROP below it.
+    Flat series have no deviation, so any such change in them is flagged.
+    """
+    latencies, successes = RollingMedian(window), RollingMedian(window)
+    anomalies = []
+    for point in points:
+        latency, success = point.get("avg_response_time_ms"), point.get("success_ratio")
+        if len(latencies) >= ANOMALY_MIN_POINTS and latency is not None:
+            baseline = latencies.median()
+            score = _deviation(latency - baseline, latencies.mad())
+            if score > threshold and latency >= baseline * ANOMALY_MIN_LATENCY_RATIO:
+                anomalies.append(_anomaly(point, "latency_spike", latency, baseline, score))
+        if len(successes) >= ANOMALY_MIN_POINTS and success is not None:
+            baseline = successes.median()
+            score = _deviation(baseline - success, successes.mad())
+            if score > threshold and baseline - success >= ANOMALY_MIN_SUCCESS_DROP:
+                anomalies.append(_anomaly(point, "success_dip", success, baseline, score))
+        if latency is not None:
+            latencies.push(latency)
+        if success is not None:
+            successes.push(success)
+    return anomalies
+
+
+def _deviation(difference: float, mad: float) -> float:
+    if mad > 0:
+        return difference / mad
+    return float("inf") if difference > 0 else 0.0
+
+
+def _anomaly(point: dict, kind: str, value: float, baseline: float, score: float) -> dict:
+    return {
+        "timestamp": point.get("timestamp"),
+        "kind": kind,
+        "value": value,
+        "baseline": baseline,
+        "deviation": None if score == float("inf") else round(score, 2),
+    }
+
+
+def _median(values: List[float]) -> Optional[float]:
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2
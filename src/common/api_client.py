@@ -2,15 +2,48 @@
 API Client for BlazeMeter API Monitoring
 """
 
+import asyncio
+import importlib.util
+import json
+import logging
 import platform
-from typing import Callable, Optional
+import random
+import time
+import weakref
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, List, Optional, Set, Tuple, Type
 
 import httpx
+from pydantic import BaseModel
+from pydantic_core import from_json
 
-from src.config.defaults import BZM_APIM_BASE_URL
+from src.common.rate_limiter import TokenBucket
+from src.common.response_cache import ResponseCache
+from src.common.single_flight import SingleFlight
+from src.config.defaults import (
+    BZM_APIM_BASE_URL,
+    CACHE_MAX_ENTRIES,
+    CACHE_STALE_WHILE_REVALIDATE,
+    CACHE_TTL_SECONDS,
+    HTTP2_ENABLED,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    JSON_BYTES_DECODE_MIN_SIZE,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_PER_SECOND,
+    RETRY_AFTER_MAX,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_STATUS_CODES,
+)
 from src.config.token import BzmApimToken
 from src.config.version import __version__
-from src.models import BaseResult
+from src.formatters.base import dump_models, fields_error
+from src.models import ApiResponse, BaseResult
 
 so = platform.system()  # "Windows", "Linux", "Darwin"
 version = platform.version()  # kernel / build version
@@ -19,6 +52,355 @@ machine = platform.machine()  # ex. "x86_64", "AMD64", "arm64"
 
 ua_part = f"{so} {release}; {machine}"
 
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Process-wide client shared by every tool call, so keep-alive connections are reused
+_client: Optional[httpx.AsyncClient] = None
+# Clients built in HTTP/2 mode, and whether HTTP/2 has been given up for this process
+_http2_clients: "weakref.WeakSet[httpx.AsyncClient]" = weakref.WeakSet()
+_http2_fallback: bool = False
+# Clients that got a response, so their connections can be set up, and the requests in flight per
+# client. A client replaced by the fallback is retired, and closed once it has no request in flight
+_established_clients: "weakref.WeakSet[httpx.AsyncClient]" = weakref.WeakSet()
+_inflight: "weakref.WeakKeyDictionary[httpx.AsyncClient, int]" = weakref.WeakKeyDictionary()
+_retired_clients: "weakref.WeakSet[httpx.AsyncClient]" = weakref.WeakSet()
+
+rate_limiter = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+# Identical GET requests in flight share one upstream request and one decoded response
+inflight_requests = SingleFlight()
+# Formatted responses of read-mostly entities, invalidated by writes made through api_request
+response_cache = ResponseCache(CACHE_MAX_ENTRIES, CACHE_STALE_WHILE_REVALIDATE, CACHE_TTL_SECONDS)
+# Background refreshes of stale cache entries, referenced until they finish
+_revalidations: Set[asyncio.Task] = set()
+# Jobs started in the background when the server starts, e.g. the cache prewarm
+_startup_jobs: List[Callable[[], Awaitable[Any]]] = []
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_client(
+    base_url: str = BZM_APIM_BASE_URL, http2: bool = False, http1: bool = True
+) -> httpx.AsyncClient:
+    """
+    Build an AsyncClient with the connection pool limits and timeouts used for the APIM APIs.
+    With http2=True, HTTP/2 is negotiated via ALPN and all concurrent requests are multiplexed
+    over a single connection; servers without HTTP/2 support are still served over HTTP/1.1.
+    """
+    if http2 and not http2_available():
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1")
+        http2, http1 = False, True
+    client = httpx.AsyncClient(
+        base_url=base_url,
+        http1=http1,
+        http2=http2,
+        timeout=httpx.Timeout(connect=15.0, read=60.0, write=15.0, pool=60.0),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+    if http2:
+        _http2_clients.add(client)
+    return client
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the shared client, creating it on first use (or after it was closed).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_client(http2=HTTP2_ENABLED and not _http2_fallback)
+    return _client
+
+
+async def _fallback_to_http1(client: httpx.AsyncClient) -> None:
+    """
+    Replace the shared HTTP/2 client with an HTTP/1.1 one for the rest of the process. The HTTP/2
+    client is closed once the other requests in flight on it are done, so they are not aborted.
+    """
+    global _client, _http2_fallback
+    if not _http2_fallback:
+        logger.warning("HTTP/2 connection to the APIM APIs failed, falling back to HTTP/1.1")
+        _http2_fallback = True
+    if client is _client:
+        _client = None
+    _retired_clients.add(client)
+    await _close_if_idle(client)
+
+
+async def _close_if_idle(client: httpx.AsyncClient) -> None:
+    if client in _retired_clients and not _inflight.get(client):
+        _retired_clients.discard(client)
+        await client.aclose()
+
+
+async def _request_over(client: httpx.AsyncClient, method: str, endpoint: str, **kwargs) -> httpx.Response:
+    _inflight[client] = _inflight.get(client, 0) + 1
+    try:
+        response = await client.request(method, endpoint, **kwargs)
+    finally:
+        _inflight[client] -= 1
+        await _close_if_idle(client)
+    _established_clients.add(client)
+    return response
+
+
+async def _send(method: str, endpoint: str, idempotent: bool = True, **kwargs) -> httpx.Response:
+    """
+    Send a request over the shared client. A protocol error on an HTTP/2 client that never got a
+    response, i.e. whose connections cannot be set up, switches the process to HTTP/1.1; idempotent
+    requests are then replayed once over the new client. Protocol errors once the client is
+    established, like a GOAWAY or a reset stream, are raised as any other transport error.
+    """
+    client = get_client()
+    try:
+        return await _request_over(client, method, endpoint, **kwargs)
+    except (httpx.RemoteProtocolError, httpx.LocalProtocolError):
+        if client not in _http2_clients or client in _established_clients:
+            raise
+        await _fallback_to_http1(client)
+        if not idempotent or method.upper() not in IDEMPOTENT_METHODS:
+            raise
+        return await _request_over(get_client(), method, endpoint, **kwargs)
+
+
+def _retry_after_seconds(resp: httpx.Response) -> Optional[float]:
+    """
+    Parse the Retry-After header, given either as delta-seconds or as an HTTP date.
+    """
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def _backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff with full jitter.
+    """
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2**attempt))
+
+
+async def _request_with_retries(
+    method: str, endpoint: str, idempotent: bool = True, **kwargs
+) -> httpx.Response:
+    """
+    Send a request within the shared rate limit. Idempotent requests are retried on 429/5xx responses
+    and transport errors, honouring Retry-After. POST/PUT requests, and GET requests marked as not
+    idempotent like trigger URLs, are never retried, as a failed response does not guarantee the
+    change was not applied.
+    """
+    retryable = idempotent and method.upper() in IDEMPOTENT_METHODS
+    attempt = 0
+    while True:
+        await rate_limiter.acquire()
+        attempt += 1
+        try:
+            resp = await _send(method, endpoint, idempotent, **kwargs)
+        except httpx.TransportError as e:
+            if not retryable or attempt >= RETRY_MAX_ATTEMPTS:
+                raise
+            delay = _backoff_delay(attempt)
+            logger.debug("%s %s failed with %r, retrying in %.2fs", method, endpoint, e, delay)
+        else:
+            if resp.status_code not in RETRY_STATUS_CODES:
+                return resp
+            retry_after = _retry_after_seconds(resp)
+            if resp.status_code == 429:
+                rate_limiter.block_for(retry_after if retry_after is not None else _backoff_delay(attempt))
+            if not retryable or attempt >= RETRY_MAX_ATTEMPTS:
+                return resp
+            if retry_after is not None and retry_after > RETRY_AFTER_MAX:
+                return resp
+            delay = retry_after if retry_after is not None else _backoff_delay(attempt)
+            logger.debug("%s %s returned %s, retrying in %.2fs", method, endpoint, resp.status_code, delay)
+        await asyncio.sleep(delay)
+
+
+def _retry_error(method: str, resp: httpx.Response, idempotent: bool = True) -> BaseResult:
+    """
+    Turn a rate limited or failed (5xx) upstream response into a tool result the client can act on.
+    """
+    if resp.status_code == 429:
+        error = "Rate limit of the BlazeMeter API reached"
+    elif resp.status_code in RETRY_STATUS_CODES:
+        error = f"BlazeMeter API is temporarily unavailable (HTTP {resp.status_code})"
+    else:
+        error = f"BlazeMeter API failed to process the request (HTTP {resp.status_code})"
+    hint = []
+    if method.upper() not in IDEMPOTENT_METHODS:
+        hint.append(
+            f"{method.upper()} requests are not retried automatically. Verify whether the change was "
+            "applied before repeating it."
+        )
+    elif not idempotent:
+        hint.append(
+            "This request has side effects, like starting test runs, and is not retried automatically. "
+            "Verify whether it took effect before repeating it."
+        )
+    retry_after = _retry_after_seconds(resp)
+    if retry_after is not None:
+        hint.append(f"Retry after {retry_after:.0f} seconds.")
+    return BaseResult(error=error, hint=hint or None)
+
+
+def status_error_message(error: httpx.HTTPStatusError) -> str:
+    """
+    Describe a request the API rejected (4xx), for tools that report it and carry on with the next one.
+    """
+    try:
+        body = error.response.json()
+    except ValueError:
+        body = None
+    message = body.get("error") if isinstance(body, dict) else None
+    if isinstance(message, dict):
+        message = message.get("message")
+    return f"HTTP {error.response.status_code}: {message or error.response.reason_phrase}"
+
+
+async def close_client() -> None:
+    """
+    Close the shared client, and any client retired by the HTTP/2 fallback, releasing their pooled
+    connections.
+    """
+    global _client
+    client, _client = _client, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+    for retired in list(_retired_clients):
+        _retired_clients.discard(retired)
+        await retired.aclose()
+
+
+def on_startup(job: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Run `job` in the background once the server has started. The server does not wait for it, and it
+    is cancelled if still running at shutdown.
+    """
+    _startup_jobs.append(job)
+
+
+def _startup_job_done(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug("Background startup job failed: %r", task.exception())
+
+
+@asynccontextmanager
+async def client_lifespan(server: Any) -> AsyncIterator[None]:
+    """
+    FastMCP lifespan that opens the shared client on startup and closes it on shutdown. Startup jobs
+    are started without being awaited, so the server is ready to serve right away.
+    """
+    get_client()
+    jobs = [asyncio.ensure_future(job()) for job in _startup_jobs]
+    for job in jobs:
+        job.add_done_callback(_startup_job_done)
+    try:
+        yield
+    finally:
+        for job in jobs:
+            job.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+        await close_client()
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value if isinstance(value, Hashable) else repr(value)
+
+
+def _request_key(
+    token: BzmApimToken,
+    method: str,
+    endpoint: str,
+    result_formatter: Optional[Callable],
+    result_formatter_params: Optional[dict],
+    hint: list,
+    kwargs: dict,
+) -> Optional[tuple]:
+    """
+    Key identifying a GET request and how its response is formatted, or None for requests that
+    must not be coalesced.
+    """
+    if method.upper() != "GET" or set(kwargs) - {"params", "headers"}:
+        return None
+    return (
+        str(token),
+        endpoint,
+        _freeze(kwargs.get("params")),
+        _freeze(kwargs.get("headers")),
+        result_formatter,
+        _freeze(result_formatter_params),
+        _freeze(hint),
+    )
+
+
+def invalidate_cache(endpoint: str, descendants: bool = False) -> None:
+    """
+    Drop cached responses for the endpoint and its ancestors, e.g. after a change made elsewhere.
+    """
+    response_cache.invalidate(endpoint, descendants=descendants)
+
+
+async def _fetch_uncached(method: str, endpoint: str, fetch: Callable) -> BaseResult:
+    try:
+        return (await fetch())[0]
+    finally:
+        if method.upper() not in IDEMPOTENT_METHODS:
+            response_cache.invalidate(endpoint, descendants=method.upper() != "POST")
+
+
+def _store(key: tuple, endpoint: str, result: BaseResult, ttl: float, etag: Optional[str]) -> None:
+    # Entities with a TTL of 0 are only worth keeping when they can be revalidated with their ETag
+    if ttl > 0 or etag:
+        response_cache.set(key, endpoint, result.model_copy(deep=True), ttl, etag)
+
+
+def _revalidate(key: tuple, fetch: Callable) -> None:
+    task = asyncio.ensure_future(inflight_requests.do(key, fetch))
+    _revalidations.add(task)
+    task.add_done_callback(_revalidation_done)
+
+
+def _revalidation_done(task: asyncio.Task) -> None:
+    _revalidations.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug("Background refresh of a cached response failed: %r", task.exception())
+
+
+def _request_error(
+    token: Optional[BzmApimToken],
+    result_formatter: Optional[Callable],
+    result_formatter_params: Optional[dict],
+) -> Optional[str]:
+    """
+    Why a request cannot be made: a missing token, or fields the formatter does not know. Unknown fields
+    would only fail once the response came back, so they are rejected before sending.
+    """
+    if not token:
+        return (
+            "No API token. Set BZM_API_TEST_TOKEN env var with the token or BZM_API_TEST_TOKEN_FILE "
+            "with the file path or BZM_API_TEST_TOKEN secrets in docker catalog configuration."
+        )
+    return fields_error(result_formatter, result_formatter_params)
+
 
 async def api_request(
     token: Optional[BzmApimToken],
@@ -26,39 +408,164 @@ async def api_request(
     endpoint: str,
     result_formatter: Callable = None,
     result_formatter_params: Optional[dict] = None,
+    use_cache: bool = True,
+    idempotent: bool = True,
     **kwargs,
 ) -> BaseResult:
     """
     Make an authenticated request to the BlazeMeter APIM APIs.
     Handles authentication errors gracefully.
+    Identical concurrent GET requests are coalesced into a single upstream request, and responses of
+    read-mostly entities are cached until they expire or a write to the same resource is made.
+    Expired responses that came with an ETag are revalidated with If-None-Match, so an unchanged
+    resource costs a 304 instead of a download, decode and format.
+    Pass use_cache=False to always read the current state, e.g. before modifying it.
+    Pass idempotent=False for GET requests with side effects, like trigger URLs starting a test run,
+    so that each call reaches the API on its own instead of being coalesced, served from the cache or
+    retried.
     """
-    if not token:
-        return BaseResult(
-            error="No API token. Set BZM_API_TEST_TOKEN env var with the token or BZM_API_TEST_TOKEN_FILE "
-            "with the file path or BZM_API_TEST_TOKEN secrets in docker catalog configuration."
+    error = _request_error(token, result_formatter, result_formatter_params)
+    if error:
+        return BaseResult(error=error)
+
+    hint = kwargs.pop("hint", [])
+    key = (
+        _request_key(token, method, endpoint, result_formatter, result_formatter_params, hint, kwargs)
+        if idempotent
+        else None
+    )
+
+    async def fetch(etag: Optional[str] = None) -> Tuple[Optional[BaseResult], Optional[str]]:
+        return await _execute(
+            token,
+            method,
+            endpoint,
+            result_formatter,
+            result_formatter_params,
+            hint,
+            kwargs,
+            etag,
+            idempotent,
         )
 
-    headers = kwargs.pop("headers", {})
+    if key is None:
+        return await _fetch_uncached(method, endpoint, fetch)
+
+    ttl = response_cache.ttl_for(endpoint) if use_cache else None
+    entry = response_cache.get(key) if ttl is not None else None
+
+    async def fetch_and_store() -> BaseResult:
+        generation = response_cache.generation
+        result, etag = await fetch(entry.etag if entry is not None else None)
+        if result is None:
+            # Not modified: the cached result was already decoded and formatted, reuse it as is
+            response_cache.refresh(key, entry)
+            return entry.value.model_copy(deep=True)
+        if ttl is not None and result.error is None and generation == response_cache.generation:
+            _store(key, endpoint, result, ttl, etag)
+        return result
+
+    if entry is not None:
+        if response_cache.is_fresh(entry):
+            return entry.value.model_copy(deep=True)
+        if response_cache.is_usable_stale(entry):
+            _revalidate(key, fetch_and_store)
+            return entry.value.model_copy(deep=True)
+
+    result, shared = await inflight_requests.do(key, fetch_and_store)
+    # Waiters get their own copy, as callers may modify the result they receive
+    return result.model_copy(deep=True) if shared else result
+
+
+@lru_cache(maxsize=None)
+def response_model(model: Type[BaseModel]) -> Type[ApiResponse]:
+    """
+    The API response schema with data of the model, built once per model.
+    """
+    return ApiResponse[model]
+
+
+@lru_cache(maxsize=None)
+def validates_json(model: Type[BaseModel]) -> bool:
+    """
+    Whether the model is worth validating straight from JSON. A before or wrap model validator gets
+    the item as a Python dict anyway, and building it within pydantic-core is slower than parsing the
+    body to dicts first.
+    """
+    validators = model.__pydantic_decorators__.model_validators.values()
+    return all(validator.info.mode == "after" for validator in validators)
+
+
+def _decode(
+    content: bytes, result_formatter: Optional[Callable], result_formatter_params: Optional[dict]
+) -> Tuple[List[Any], dict, int]:
+    """
+    Decode a response body into its formatted data, always as a list, its envelope fields and the
+    total to report when the envelope has none.
+    Large bodies, of JSON_BYTES_DECODE_MIN_SIZE bytes or more, of formatters marked with their model are
+    validated straight from the JSON bytes by pydantic-core, without building the Python dicts of the
+    whole response first, and other large bodies are parsed by the pydantic-core JSON parser. Smaller
+    bodies are parsed to dicts and formatted, which is as fast for them.
+    """
+    large = len(content) >= JSON_BYTES_DECODE_MIN_SIZE
+    model = getattr(result_formatter, "model", None) if large else None
+    if model is not None and not validates_json(model):
+        model = None
+    if model is not None:
+        response = response_model(model).model_validate_json(content)
+        response_dict = {
+            name: getattr(response, name) for name in response.model_fields_set if name != "data"
+        }
+        data = [] if response.data is None else response.data
+    else:
+        response_dict = from_json(content) if large else json.loads(content)
+        data = response_dict.get("data", [])
+
+    default_total = 0
+    if not isinstance(data, list):  # Generalize result always as a list
+        data = [data]
+        default_total = 1
+    elif "total" not in response_dict:
+        default_total = len(data)
+    if model is not None:
+        final_result = dump_models(model, data, result_formatter_params)
+    else:
+        final_result = result_formatter(data, result_formatter_params) if result_formatter else data
+    return final_result, response_dict, default_total
+
+
+async def _execute(
+    token: BzmApimToken,
+    method: str,
+    endpoint: str,
+    result_formatter: Optional[Callable],
+    result_formatter_params: Optional[dict],
+    hint: list,
+    kwargs: dict,
+    etag: Optional[str] = None,
+    idempotent: bool = True,
+) -> Tuple[Optional[BaseResult], Optional[str]]:
+    """
+    Send the request and format its response. Returns the result with the ETag of the response, or
+    no result when `etag` was given and the API answered 304 Not Modified.
+    """
+    kwargs = dict(kwargs)
+    headers = dict(kwargs.pop("headers", {}))
     headers["Authorization"] = f"Bearer {token}"
     headers["User-Agent"] = f"bzm-apitest-mcp/{__version__} ({ua_part})"
-    hint = kwargs.pop("hint", [])
+    if etag:
+        headers["If-None-Match"] = etag
 
-    timeout = httpx.Timeout(connect=15.0, read=60.0, write=15.0, pool=60.0)
-
-    async with httpx.AsyncClient(base_url=BZM_APIM_BASE_URL, timeout=timeout) as client:
-        try:
-            resp = await client.request(method, endpoint, headers=headers, **kwargs)
-            resp.raise_for_status()
-            response_dict = resp.json()
-            result = response_dict.get("data", [])
-            default_total = 0
-            if not isinstance(result, list):  # Generalize result always as a list
-                result = [result]
-                default_total = 1
-            elif "total" not in response_dict:
-                default_total = len(result)
-            final_result = result_formatter(result, result_formatter_params) if result_formatter else result
-            return BaseResult(
+    try:
+        resp = await _request_with_retries(method, endpoint, idempotent, headers=headers, **kwargs)
+        if etag and resp.status_code == 304:
+            return None, etag
+        resp.raise_for_status()
+        final_result, response_dict, default_total = _decode(
+            resp.content, result_formatter, result_formatter_params
+        )
+        return (
+            BaseResult(
                 result=final_result,
                 error=response_dict.get("error", None),
                 total=response_dict.get("total", default_total),
@@ -66,12 +573,17 @@ async def api_request(
                 - (response_dict.get("skip", 0) + response_dict.get("limit", 0))
                 > 0,
                 hint=hint,
+            ),
+            resp.headers.get("ETag"),
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 403:
+            return (
+                BaseResult(error=e.response.json().get("error", {}).get("message", "Invalid Credentials")),
+                None,
             )
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 403:
-                return BaseResult(
-                    error=e.response.json().get("error", {}).get("message", "Invalid Credentials")
-                )
-            elif e.response.status_code == 401:
-                return BaseResult(error="Unauthorized to perform this action")
-            raise
+        elif e.response.status_code == 401:
+            return BaseResult(error="Unauthorized to perform this action"), None
+        elif e.response.status_code in RETRY_STATUS_CODES or e.response.status_code >= 500:
+            return _retry_error(method, e.response, idempotent), None
+        raise
@@ -0,0 +1,71 @@
+"""
+Bucket archives: the tests of a bucket with their steps, environments and schedules, as gzip'd JSON Lines
+"""
+
+import asyncio
+import gzip
+import json
+import os
+from typing import AsyncIterator, Optional
+
+from src.config.defaults import ARCHIVE_READ_CHUNK
+
+ARCHIVE_VERSION: int = 1
+ARCHIVE_SUFFIX: str = ".jsonl.gz"
+
+
+def check_archive_path(path: str, writing: bool, overwrite: bool = False) -> Optional[str]:
+    """
+    The reason the path cannot be used for an archive, if any. Archives must be named *.jsonl.gz, so
+    no other file is ever overwritten.
+    """
+    if not path.endswith(ARCHIVE_SUFFIX):
+        return f"The archive path must end with {ARCHIVE_SUFFIX}: {path}"
+    if writing and os.path.exists(path) and not overwrite:
+        return f"The archive {path} already exists. Pass overwrite to replace it."
+    if not writing and not os.path.isfile(path):
+        return f"The archive {path} does not exist"
+    return None
+
+
+class ArchiveWriter:
+    """
+    Writes archive records one JSON line at a time, in a worker thread, so only the records in flight
+    are held in memory and the event loop never waits on compression or the disk.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    async def open(self) -> "ArchiveWriter":
+        directory = os.path.dirname(os.path.abspath(self.path))
+        await asyncio.to_thread(os.makedirs, directory, exist_ok=True)
+        self._file = await asyncio.to_thread(gzip.open, self.path, "wt", encoding="utf-8")
+        return self
+
+    async def write(self, record: dict) -> None:
+        await asyncio.to_thread(self._file.write, json.dumps(record, separators=(",", ":")) + "\n")
+
+    async def close(self) -> None:
+        if self._file is not None:
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+
+
+async def read_archive(path: str) -> AsyncIterator[dict]:
+    """
+    Yield the records of an archive in order, reading about ARCHIVE_READ_CHUNK bytes of lines at a time
+    in a worker thread.
+    """
+    archive = await asyncio.to_thread(gzip.open, path, "rt", encoding="utf-8")
+    try:
+        while True:
+            lines = await asyncio.to_thread(archive.readlines, ARCHIVE_READ_CHUNK)
+            if not lines:
+                return
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        await asyncio.to_thread(archive.close)
@@ -0,0 +1,185 @@
+"""
+In-process index of the teams, buckets and tests the user has access to, searchable by fuzzy names
+"""
+
+import re
+import time
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Words that only link the parts of a query, e.g. "checkout test in payments team"
+STOP_WORDS = frozenset({"a", "an", "at", "for", "from", "in", "my", "of", "on", "the", "to", "under"})
+# Words naming the kind of entity searched for; they only count towards a score when a name contains them
+KIND_WORDS = frozenset({"team", "teams", "bucket", "buckets", "test", "tests"})
+# Weight of a query word matching the name of the entity itself, or of the bucket or team it belongs to
+OWN_NAME_WEIGHT: float = 1.0
+PARENT_NAME_WEIGHT: float = 0.7
+# Smallest similarity of two words (as a difflib ratio) accepted as a misspelling of one another
+TYPO_SIMILARITY: float = 0.8
+
+
+def name_tokens(text: Optional[str]) -> Tuple[str, ...]:
+    return tuple(re.findall(r"[a-z0-9]+", (text or "").lower()))
+
+
+def query_tokens(query: str) -> Tuple[str, ...]:
+    return tuple(token for token in name_tokens(query) if token not in STOP_WORDS)
+
+
+def word_similarity(word: str, tokens: Sequence[str]) -> float:
+    """
+    How well a query word matches the best of the words of a name: 1 for the same word, 0.9 when one
+    is a prefix of the other (e.g. 'pay' and 'payments'), less for likely misspellings (0.9 times
+    their difflib ratio), and 0 otherwise.
+    """
+    best = 0.0
+    for token in tokens:
+        if token == word:
+            return 1.0
+        if min(len(token), len(word)) >= 3 and (token.startswith(word) or word.startswith(token)):
+            best = max(best, 0.9)
+        elif best < 0.9:
+            ratio = SequenceMatcher(None, word, token).ratio()
+            if ratio >= TYPO_SIMILARITY:
+                best = max(best, 0.9 * ratio)
+    return best
+
+
+def match_score(words: Sequence[str], names: Iterable[Tuple[Sequence[str], float]]) -> float:
+    """
+    Score from 0 to 1 of how well the query words match the weighted names of an entity: the mean of
+    the best weighted similarity of each word. Kind words matching no name are left out of the mean.
+    """
+    names = list(names)
+    total, counted = 0.0, 0
+    for word in words:
+        best = max((word_similarity(word, tokens) * weight for tokens, weight in names), default=0.0)
+        if best == 0 and word in KIND_WORDS:
+            continue
+        total += best
+        counted += 1
+    return total / counted if counted else 0.0
+
+
+class EntityIndex:
+    """
+    Names and ids of teams, buckets and the tests of each bucket. The teams and buckets are refreshed
+    together, and the tests of each bucket on their own, so a refresh only re-lists the buckets whose
+    tests are older than their TTL or have never been listed.
+    """
+
+    def __init__(self):
+        self.teams: Dict[str, str] = {}
+        self.buckets: Dict[str, dict] = {}
+        self.tests: Dict[str, List[dict]] = {}
+        self.directory_loaded_at: Optional[float] = None
+        self._tests_loaded_at: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.teams) + len(self.buckets) + sum(map(len, self.tests.values()))
+
+    def clear(self) -> None:
+        self.teams, self.buckets, self.tests = {}, {}, {}
+        self.directory_loaded_at = None
+        self._tests_loaded_at = {}
+
+    def directory_stale(self, ttl: float) -> bool:
+        return self.directory_loaded_at is None or time.monotonic() - self.directory_loaded_at >= ttl
+
+    def stale_buckets(self, ttl: float) -> List[str]:
+        now = time.monotonic()
+        return [
+            bucket_key
+            for bucket_key in self.buckets
+            if bucket_key not in self._tests_loaded_at or now - self._tests_loaded_at[bucket_key] >= ttl
+        ]
+
+    def set_directory(self, teams: Dict[str, str], buckets: List[dict]) -> None:
+        """
+        Replace the teams and buckets, given as {team_id: name} and dicts with bucket_key, name,
+        trigger_url and team_id. The tests of buckets that are gone are dropped.
+        """
+        self.teams = dict(teams)
+        self.buckets = {bucket["bucket_key"]: bucket for bucket in buckets}
+        for team_id, name in ((bucket.get("team_id"), bucket.get("team_name")) for bucket in buckets):
+            if team_id and team_id not in self.teams:
+                self.teams[team_id] = name or ""
+        for bucket_key in set(self.tests) - set(self.buckets):
+            del self.tests[bucket_key]
+            self._tests_loaded_at.pop(bucket_key, None)
+        self.directory_loaded_at = time.monotonic()
+
+    def set_tests(self, bucket_key: str, tests: List[dict]) -> None:
+        self.tests[bucket_key] = tests
+        self._tests_loaded_at[bucket_key] = time.monotonic()
+
+    def search(
+        self, query: str, kinds: Optional[Iterable[str]] = None, min_score: float = 0.0
+    ) -> List[dict]:
+        """
+        Teams, buckets and tests matching the query, best first. A test also matches on the names of
+        its bucket and team, and a bucket on the name of its team, with a lower weight than their own
+        name, so "checkout smoke test in payments team" ranks the checkout smoke test of the payments
+        team's buckets above both the team and the buckets.
+        """
+        words = query_tokens(query)
+        kinds = set(kinds or ("team", "bucket", "test"))
+        if not words:
+            return []
+        team_tokens = {team_id: name_tokens(name) for team_id, name in self.teams.items()}
+        matches = []
+
+        if "team" in kinds:
+            for team_id, name in self.teams.items():
+                score = match_score(words, [(team_tokens[team_id], OWN_NAME_WEIGHT)])
+                matches.append((score, {"kind": "team", "team_id": team_id, "team_name": name}))
+
+        for bucket_key, bucket in self.buckets.items():
+            team_id = bucket.get("team_id")
+            bucket_match = {
+                "team_id": team_id,
+                "team_name": self.teams.get(team_id),
+                "bucket_key": bucket_key,
+                "bucket_name": bucket.get("name"),
+            }
+            parents = [(team_tokens.get(team_id, ()), PARENT_NAME_WEIGHT)]
+            bucket_tokens = name_tokens(bucket.get("name"))
+            if "bucket" in kinds:
+                score = match_score(words, [(bucket_tokens, OWN_NAME_WEIGHT), *parents])
+                matches.append(
+                    (score, {"kind": "bucket", **bucket_match, "trigger_url": bucket.get("trigger_url")})
+                )
+            if "test" in kinds:
+                parents.append((bucket_tokens, PARENT_NAME_WEIGHT))
+                for test in self.tests.get(bucket_key, []):
+                    score = match_score(words, [(name_tokens(test.get("name")), OWN_NAME_WEIGHT), *parents])
+                    matches.append(
+                        (
+                            score,
+                            {
+                                "kind": "test",
+                                **bucket_match,
+                                "test_id": test.get("test_id"),
+                                "test_name": test.get("name"),
+                                "trigger_url": test.get("trigger_url"),
+                                "default_environment_id": test.get("default_environment_id"),
+                            },
+                        )
+                    )
+
+        matches = [(score, match) for score, match in matches if score > 0 and score >= min_score]
+        matches.sort(key=lambda scored: scored[0], reverse=True)
+        return [{**match, "score": round(score, 3)} for score, match in matches]
+
+
+_index: Optional[EntityIndex] = None
+
+
+def get_entity_index() -> EntityIndex:
+    """
+    Return the process-wide index, created empty on first use.
+    """
+    global _index
+    if _index is None:
+        _index = EntityIndex()
+    return _index
@@ -0,0 +1,85 @@
+"""
+Flakiness of tests from the results of their latest runs
+"""
+
+from typing import Dict, List, Optional
+
+# Weights of the signals of a flaky test in its score
+FLIP_WEIGHT: float = 0.5
+RETRY_PASS_WEIGHT: float = 0.3
+REGION_WEIGHT: float = 0.2
+
+ASSERTION_FIELDS = ("step_id", "url", "source", "property", "comparison")
+
+
+def flakiness(runs: List[dict], retry_window: float) -> dict:
+    """
+    Score the flakiness of a test from its finished runs, oldest first, between 0 (steady) and 1:
+    how often the result flips between pass and fail, the share of its failures that passed when run
+    again within `retry_window` seconds, and whether its failures are isolated to one region while the
+    other regions pass. A test that always passes or always fails is not flaky.
+    """
+    passed = [run.get("result") == "pass" for run in runs]
+    failed = passed.count(False)
+    flips = sum(before != after for before, after in zip(passed, passed[1:]))
+    retry_passes = sum(
+        1
+        for run, next_run in zip(runs, runs[1:])
+        if run.get("result") != "pass"
+        and next_run.get("result") == "pass"
+        and (next_run.get("started_at") or 0) - (run.get("started_at") or 0) <= retry_window
+    )
+
+    regions: Dict[str, List[bool]] = {}
+    for run, run_passed in zip(runs, passed):
+        regions.setdefault(run.get("region") or run.get("agent") or "unknown", []).append(run_passed)
+    failing_regions = sorted(region for region, results in regions.items() if not all(results))
+    region_isolated = len(failing_regions) == 1 and len(regions) > 1
+
+    flip_rate = flips / (len(runs) - 1) if len(runs) > 1 else 0.0
+    if failed in (0, len(runs)):
+        score = 0.0
+    else:
+        score = (
+            FLIP_WEIGHT * flip_rate
+            + RETRY_PASS_WEIGHT * retry_passes / failed
+            + REGION_WEIGHT * region_isolated
+        )
+    return {
+        "runs": len(runs),
+        "passed": len(runs) - failed,
+        "failed": failed,
+        "flips": flips,
+        "flip_rate": round(flip_rate, 3),
+        "retry_passes": retry_passes,
+        "failing_regions": failing_regions,
+        "region_isolated": region_isolated,
+        "score": round(score, 3),
+    }
+
+
+def assertion_flips(runs: List[Optional[List[dict]]]) -> List[dict]:
+    """
+    The flips between pass and fail and the failures of each assertion over the runs of a test, oldest
+    first, most flips first. A run is the assertion outcomes of a failed run, or None for a passed run,
+    in which every assertion passed, so only the failed runs have to be read.
+    """
+    assertions: Dict[tuple, dict] = {}
+    outcomes = []
+    for run in runs:
+        if run is None:
+            outcomes.append(None)
+            continue
+        outcome = {}
+        for assertion in run:
+            key = tuple(assertion.get(field) for field in ASSERTION_FIELDS if field != "url")
+            assertions.setdefault(key, {field: assertion.get(field) for field in ASSERTION_FIELDS})
+            outcome[key] = assertion.get("result") == "pass"
+        outcomes.append(outcome)
+
+    for key, assertion in assertions.items():
+        states = [True if outcome is None else outcome.get(key) for outcome in outcomes]
+        states = [state for state in states if state is not None]
+        assertion["failures"] = states.count(False)
+        assertion["flips"] = sum(before != after for before, after in zip(states, states[1:]))
+    return sorted(assertions.values(), key=lambda a: (a["flips"], a["failures"]), reverse=True)
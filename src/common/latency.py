@@ -0,0 +1,62 @@
+"""
+Latency percentiles of test steps across the runs of a test
+"""
+
+import importlib.util
+import math
+from itertools import chain
+from typing import Dict, Hashable, List, Sequence
+
+PERCENTILES: Sequence[float] = (50, 95, 99)
+
+
+def numpy_available() -> bool:
+    return importlib.util.find_spec("numpy") is not None
+
+
+def step_percentiles(
+    samples: Dict[Hashable, List[float]], percentiles: Sequence[float] = PERCENTILES
+) -> Dict[Hashable, List[float]]:
+    """
+    The percentiles and the maximum of the samples of each step, e.g. [p50, p95, p99, max], with
+    linear interpolation between the closest ranks. Steps without samples are left out.
+    With NumPy installed, all steps are computed at once on a sorted steps x runs matrix; otherwise
+    each step is computed in Python, with the same results.
+    """
+    samples = {step: values for step, values in samples.items() if values}
+    if not samples:
+        return {}
+    if numpy_available():
+        return _numpy_percentiles(samples, percentiles)
+    return {step: _percentiles(sorted(values), percentiles) for step, values in samples.items()}
+
+
+def _numpy_percentiles(
+    samples: Dict[Hashable, List[float]], percentiles: Sequence[float]
+) -> Dict[Hashable, List[float]]:
+    import numpy as np
+
+    counts = np.fromiter(map(len, samples.values()), dtype=np.intp, count=len(samples))
+    flat = np.fromiter(chain.from_iterable(samples.values()), dtype=float, count=counts.sum())
+    rows = np.repeat(np.arange(len(samples)), counts)
+    columns = np.arange(len(flat)) - np.repeat(np.cumsum(counts) - counts, counts)
+    matrix = np.full((len(samples), counts.max()), np.inf)
+    matrix[rows, columns] = flat
+    # Padding sorts after the samples, so the ranks of each row only index its own samples
+    matrix.sort(axis=1)
+    ranks = (counts[:, None] - 1) * (np.asarray(percentiles, dtype=float) / 100)
+    low, high = np.floor(ranks).astype(np.intp), np.ceil(ranks).astype(np.intp)
+    low_values = np.take_along_axis(matrix, low, axis=1)
+    high_values = np.take_along_axis(matrix, high, axis=1)
+    stats = low_values + (high_values - low_values) * (ranks - low)
+    maxima = matrix[np.arange(len(samples)), counts - 1]
+    return {step: [*stats[row].tolist(), maxima[row].item()] for row, step in enumerate(samples)}
+
+
+def _percentiles(values: List[float], percentiles: Sequence[float]) -> List[float]:
+    stats = []
+    for percentile in percentiles:
+        rank = (len(values) - 1) * percentile / 100
+        low, high = math.floor(rank), math.ceil(rank)
+        stats.append(values[low] + (values[high] - values[low]) * (rank - low))
+    return [*stats, values[-1]]
@@ -0,0 +1,50 @@
+"""
+Process-wide request budget for the BlazeMeter APIM APIs
+"""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket shared by all concurrent tool calls, so together they stay within one upstream budget.
+
+    Tokens refill at `rate` per second up to `capacity`. A caller that finds the bucket empty reserves
+    the next token (the balance goes negative) and sleeps until it is due, which keeps waiters in
+    FIFO order without holding a lock across event loops. A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Take one token and return the number of seconds the caller has to wait before using it.
+        """
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens -= 1
+        wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        return max(wait, self._blocked_until - now)
+
+    async def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def block_for(self, seconds: float) -> None:
+        """
+        Hold back every caller for `seconds`, e.g. after the API answered with a Retry-After header.
+        """
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
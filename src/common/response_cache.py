@@ -0,0 +1,126 @@
+"""
+In-process cache of formatted API responses for read-mostly entities
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+def path_segments(endpoint: str) -> Tuple[str, ...]:
+    """
+    Normalize an endpoint (relative path or absolute URL, with or without the /v1 prefix) into its
+    path segments, so cache entries and writes to the same resource can be matched.
+    """
+    segments = tuple(segment for segment in urlsplit(endpoint).path.split("/") if segment)
+    if segments[:1] == ("v1",):
+        segments = segments[1:]
+    return segments
+
+
+def entity_type(endpoint: str) -> Optional[str]:
+    """
+    The type of entity an endpoint returns: the innermost collection of /collection/id/... paths,
+    e.g. 'steps' for /buckets/{key}/tests/{id}/steps/{step_id}.
+    """
+    segments = path_segments(endpoint)
+    return segments[::2][-1] if segments else None
+
+
+class CacheEntry:
+    __slots__ = ("value", "segments", "ttl", "etag", "stored_at")
+
+    def __init__(self, value: Any, segments: Tuple[str, ...], ttl: float, etag: Optional[str] = None):
+        self.value = value
+        self.segments = segments
+        self.ttl = ttl
+        self.etag = etag
+        self.stored_at = time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+
+class ResponseCache:
+    """
+    LRU cache with a TTL per entry. Entries older than their TTL can still be served for
+    `stale_while_revalidate` seconds while they are refreshed in the background.
+
+    Entries with an ETag are kept after they expire, so they can be revalidated with a conditional
+    request; a TTL of 0 means the entry is never served without such a revalidation.
+
+    Writes invalidate the written resource and its ancestors, e.g. adding a step to a test drops the
+    cached steps, the test detail, the test list and the bucket.
+    """
+
+    def __init__(self, max_entries: int, stale_while_revalidate: float, ttls: Dict[str, float]):
+        self.max_entries = max_entries
+        self.stale_while_revalidate = stale_while_revalidate
+        self.ttls = ttls
+        # Bumped on every invalidation, so responses fetched before a write are not stored after it
+        self.generation = 0
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, endpoint: str) -> Optional[float]:
+        if self.max_entries <= 0:
+            return None
+        return self.ttls.get(entity_type(endpoint))
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        Return the entry if it can be served or revalidated, marking it recently used.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.etag is None and not self.is_usable_stale(entry) and not self.is_fresh(entry):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    @staticmethod
+    def is_fresh(entry: CacheEntry) -> bool:
+        return entry.age < entry.ttl
+
+    def is_usable_stale(self, entry: CacheEntry) -> bool:
+        return entry.ttl > 0 and entry.age < entry.ttl + self.stale_while_revalidate
+
+    def set(self, key: Hashable, endpoint: str, value: Any, ttl: float, etag: Optional[str] = None) -> None:
+        self._entries[key] = CacheEntry(value, path_segments(endpoint), ttl, etag)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def refresh(self, key: Hashable, entry: CacheEntry) -> None:
+        """
+        Restart the TTL of an entry the API confirmed as unchanged, unless it was dropped meanwhile.
+        """
+        if self._entries.get(key) is entry:
+            entry.stored_at = time.monotonic()
+
+    def invalidate(self, endpoint: str, descendants: bool = False) -> int:
+        """
+        Drop entries for the endpoint and its ancestors, plus everything below it when
+        `descendants` is set. Returns the number of dropped entries.
+        """
+        self.generation += 1
+        written = path_segments(endpoint)
+        stale_keys = [
+            key
+            for key, entry in self._entries.items()
+            if written[: len(entry.segments)] == entry.segments
+            or (descendants and entry.segments[: len(written)] == written)
+        ]
+        for key in stale_keys:
+            del self._entries[key]
+        return len(stale_keys)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
@@ -0,0 +1,181 @@
+"""
+Local SQLite store of finished test runs, synced incrementally from the results API
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.config.defaults import RESULTS_DB_PATH
+
+# Columns stored per test run, named like the fields of a formatted TestResult
+RUN_COLUMNS: Tuple[str, ...] = (
+    "test_run_id",
+    "bucket_key",
+    "test_id",
+    "test_name",
+    "started_at",
+    "finished_at",
+    "result",
+    "region",
+    "agent",
+    "environment_id",
+    "environment_name",
+    "source",
+    "requests_executed",
+    "assertions_failed",
+    "scripts_failed",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS test_runs (
+    test_run_id TEXT PRIMARY KEY,
+    bucket_key TEXT NOT NULL,
+    test_id TEXT NOT NULL,
+    test_name TEXT,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    region TEXT,
+    agent TEXT,
+    environment_id TEXT,
+    environment_name TEXT,
+    source TEXT,
+    requests_executed INTEGER,
+    assertions_failed INTEGER,
+    scripts_failed INTEGER
+);
+CREATE INDEX IF NOT EXISTS test_runs_started_at ON test_runs (bucket_key, test_id, started_at);
+CREATE INDEX IF NOT EXISTS test_runs_result ON test_runs (bucket_key, test_id, result, started_at);
+CREATE INDEX IF NOT EXISTS test_runs_region ON test_runs (bucket_key, test_id, region, started_at);
+CREATE INDEX IF NOT EXISTS test_runs_environment ON test_runs (
+    bucket_key, test_id, environment_id, started_at
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    bucket_key TEXT NOT NULL,
+    test_id TEXT NOT NULL,
+    synced_until REAL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (bucket_key, test_id)
+);
+"""
+
+# Filters of a history query and the column each one matches
+FILTER_COLUMNS: Dict[str, str] = {
+    "result": "result",
+    "region": "region",
+    "environment_id": "environment_id",
+}
+
+
+class ResultsStore:
+    """
+    Finished test runs of every synced test, keyed by test_run_id. Finished runs never change, so a
+    sync only adds the runs started after the `synced_until` of the test; runs still running are left
+    out and fetched again by the next sync.
+
+    Access is serialized by a lock, as the connection is shared by all tool calls.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def synced_until(self, bucket_key: str, test_id: str) -> Optional[float]:
+        """
+        The started_at from which runs of the test still have to be fetched, or None if it was never
+        synced.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT synced_until FROM sync_state WHERE bucket_key = ? AND test_id = ?",
+                (bucket_key, test_id),
+            ).fetchone()
+        return row["synced_until"] if row else None
+
+    def add_runs(
+        self, bucket_key: str, test_id: str, runs: Iterable[dict], synced_until: Optional[float]
+    ) -> int:
+        """
+        Store finished runs of the test and move its sync cursor, in one transaction. Returns the
+        number of runs stored.
+        """
+        rows = [tuple(run.get(column) for column in RUN_COLUMNS) for run in runs if run.get("test_run_id")]
+        with self._lock, self._db:
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO test_runs ({', '.join(RUN_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in RUN_COLUMNS)})",
+                rows,
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_state (bucket_key, test_id, synced_until, synced_at) "
+                "VALUES (?, ?, ?, ?)",
+                (bucket_key, test_id, synced_until, time.time()),
+            )
+        return len(rows)
+
+    def query(
+        self,
+        bucket_key: str,
+        test_id: str,
+        since: Optional[float] = None,
+        limit: int = 50,
+        **filters: Optional[str],
+    ) -> Tuple[Dict[str, Any], List[dict]]:
+        """
+        Aggregates of the stored runs of the test matching the filters, and the latest `limit` of them.
+        """
+        where, args = ["bucket_key = ?", "test_id = ?"], [bucket_key, test_id]
+        if since is not None:
+            where.append("started_at >= ?")
+            args.append(since)
+        for name, value in filters.items():
+            if value is not None:
+                where.append(f"{FILTER_COLUMNS[name]} = ?")
+                args.append(value)
+        condition = " AND ".join(where)
+
+        with self._lock:
+            stats = self._db.execute(
+                "SELECT COUNT(*) AS runs, "
+                "COALESCE(SUM(result = 'pass'), 0) AS passed, "
+                "COALESCE(SUM(result != 'pass'), 0) AS failed, "
+                "AVG(finished_at - started_at) AS avg_duration_in_sec, "
+                "MAX(finished_at - started_at) AS max_duration_in_sec, "
+                "MIN(started_at) AS first_started_at, "
+                "MAX(started_at) AS last_started_at "
+                f"FROM test_runs WHERE {condition}",
+                args,
+            ).fetchone()
+            rows = self._db.execute(
+                f"SELECT * FROM test_runs WHERE {condition} ORDER BY started_at DESC LIMIT ?",
+                [*args, limit],
+            ).fetchall()
+        return dict(stats), [dict(row) for row in rows]
+
+
+_store: Optional[ResultsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore:
+    """
+    Return the process-wide store, opening the database on first use.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultsStore(RESULTS_DB_PATH)
+        return _store
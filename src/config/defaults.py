@@ -1,3 +1,23 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def _env_number(name: str, default, cast=int):
+    """
+    Read a numeric setting from the environment, keeping the default when the value is not a number.
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning("Ignoring %s=%r, expected a number. Using the default %s", name, value, default)
+        return default
+
+
 BZM_APIM_BASE_URL: str = "https://api.runscope.com"
 TOOLS_PREFIX: str = "blazemeter_apitest"
 
@@ -10,3 +30,112 @@ STEPS_ENDPOINT: str = "/buckets/{}/tests/{}/steps"
 RESULTS_ENDPOINT: str = "/buckets/{}/tests/{}/results"
 BUCKET_LEVEL_RESULTS_ENDPOINT: str = "/buckets/{}/results"
 TEST_ENVIRONMENT_ENDPOINT: str = "/buckets/{}/tests/{}/environments"
+
+# Pagination of list endpoints: the largest page the API returns, and how many pages are fetched at once
+# when listing all entities
+LIST_PAGE_SIZE: int = 50
+LIST_ALL_CONCURRENCY: int = 4
+# Buckets whose tests are listed at once when listing tests across all buckets
+LIST_BUCKETS_CONCURRENCY: int = 8
+
+# Index of team, bucket and test names searched by the teams search action: the seconds before the teams
+# and buckets, and the tests of a bucket, are listed again, and the default number and smallest score
+# (from 0 to 1) of the matches returned
+ENTITY_INDEX_DIRECTORY_TTL: float = 300.0
+ENTITY_INDEX_TESTS_TTL: float = 60.0
+SEARCH_LIMIT_DEFAULT: int = 5
+SEARCH_MIN_SCORE: float = 0.5
+
+# Steps added to a test by a single add_steps call
+STEPS_BATCH_MAX: int = 100
+
+# Environments and schedules written at once when cloning a test
+CLONE_WRITE_CONCURRENCY: int = 4
+
+# Bucket archives: tests read or written at once when exporting or importing a bucket, and the bytes
+# of lines read from an archive at a time
+ARCHIVE_CONCURRENCY: int = 4
+ARCHIVE_READ_CHUNK: int = 1 << 16
+
+# Failed requests listed per read of a test result summary
+RESULT_SUMMARY_MAX_FAILED_REQUESTS: int = 20
+
+# Waiting for started test runs to finish: the default and largest deadline in seconds, the bounds of
+# the interval between polls of a run, the past runs of a test used to estimate its duration, and how
+# many runs are read at once when waiting for many, e.g. those of a bucket-level run
+WAIT_TIMEOUT_DEFAULT: float = 300.0
+WAIT_TIMEOUT_MAX: float = 1800.0
+POLL_INTERVAL_MIN: float = 1.0
+POLL_INTERVAL_MAX: float = 30.0
+POLL_HISTORY_RUNS: int = 10
+POLL_CONCURRENCY: int = 8
+
+# Local SQLite store of finished test runs, synced from the results API for history queries
+RESULTS_DB_PATH: str = os.getenv(
+    "BZM_API_TEST_RESULTS_DB", os.path.join(os.path.expanduser("~"), ".bzm-apitest", "results.sqlite3")
+)
+# Largest number of results the results API returns per request
+RESULTS_PAGE_SIZE: int = 50
+# Test run results read at once when reading many runs, e.g. for latency percentiles
+RESULTS_FETCH_CONCURRENCY: int = 8
+# A failed run followed by a passing run within this many seconds counts as passing on retry when
+# scoring the flakiness of a test
+FLAKY_RETRY_WINDOW: float = 900.0
+# How far back the history of a test is fetched on its first sync, in days
+RESULTS_SYNC_DAYS: int = _env_number("BZM_API_TEST_RESULTS_SYNC_DAYS", 30)
+
+# Anomaly detection over the response times of test metrics: the points of the rolling baseline, the
+# points needed before judging one, the deviations from the baseline in median absolute deviations that
+# flag a point, and the smallest latency increase (as a ratio) and success ratio drop worth flagging
+ANOMALY_WINDOW: int = 12
+ANOMALY_MIN_POINTS: int = 5
+ANOMALY_THRESHOLD: float = 3.5
+ANOMALY_MIN_LATENCY_RATIO: float = 1.2
+ANOMALY_MIN_SUCCESS_DROP: float = 0.05
+# Smallest number of points a metrics response time series is downsampled to
+METRICS_MIN_POINTS: int = 10
+# Metrics read at once when detecting anomalies across the tests of a bucket
+METRICS_FETCH_CONCURRENCY: int = 8
+
+# Smallest response body in bytes validated straight from its JSON bytes. Smaller bodies decode as fast
+# or faster through Python dicts, see benchmarks/bench_decoding.py
+JSON_BYTES_DECODE_MIN_SIZE: int = 512 * 1024
+
+# Connection pool of the shared HTTP client
+HTTP_MAX_CONNECTIONS: int = _env_number("BZM_API_TEST_MAX_CONNECTIONS", 20)
+HTTP_MAX_KEEPALIVE_CONNECTIONS: int = _env_number("BZM_API_TEST_MAX_KEEPALIVE_CONNECTIONS", 10)
+HTTP_KEEPALIVE_EXPIRY: float = _env_number("BZM_API_TEST_KEEPALIVE_EXPIRY", 60.0, float)
+HTTP2_ENABLED: bool = os.getenv("BZM_API_TEST_HTTP2", "false").lower() == "true"
+
+# Retries of idempotent requests on rate limiting and transient server errors
+RETRY_STATUS_CODES: tuple = (429, 502, 503, 504)
+RETRY_MAX_ATTEMPTS: int = _env_number("BZM_API_TEST_RETRY_MAX_ATTEMPTS", 4)
+RETRY_BACKOFF_BASE: float = 0.5
+RETRY_BACKOFF_MAX: float = 20.0
+RETRY_AFTER_MAX: float = 60.0
+
+# Upstream request budget shared by all concurrent tool calls (requests per second, 0 disables it)
+RATE_LIMIT_PER_SECOND: float = _env_number("BZM_API_TEST_RATE_LIMIT", 10.0, float)
+RATE_LIMIT_BURST: int = _env_number("BZM_API_TEST_RATE_LIMIT_BURST", 20)
+
+# Cache of read-mostly entities, with the time to live in seconds per entity type. Entities with a TTL
+# of 0 are only cached when the API sends an ETag, and are revalidated on every read
+CACHE_MAX_ENTRIES: int = _env_number("BZM_API_TEST_CACHE_MAX_ENTRIES", 512)
+CACHE_STALE_WHILE_REVALIDATE: float = _env_number("BZM_API_TEST_CACHE_STALE_WHILE_REVALIDATE", 30.0, float)
+CACHE_TTL_SECONDS: dict = {
+    "account": 300,
+    "teams": 300,
+    "people": 300,
+    "buckets": 120,
+    "tests": 60,
+    "environments": 120,
+    "schedules": 120,
+    "steps": 60,
+    "results": 0,
+    "metrics": 0,
+}
+
+# Requests the background prewarm may make when the server starts, to fill the cache with the account,
+# the bucket list and the first page of tests of each bucket (0 disables it). Kept below the rate limit
+# burst, so the first tool calls are not held back by it
+PREWARM_REQUEST_BUDGET: int = _env_number("BZM_API_TEST_PREWARM_BUDGET", 10)
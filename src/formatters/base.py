@@ -0,0 +1,157 @@
+from functools import lru_cache
+from types import UnionType
+from typing import Any, Callable, List, Optional, Tuple, Type, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter
+
+F = TypeVar("F", bound=Callable)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """
+    Validator of a whole list of the model, built once per model, so formatting a page of items is a
+    single pydantic-core call instead of one model instance and dump per item. This only pays off for
+    models without lists of models, see has_model_lists.
+    """
+    return TypeAdapter(List[model])
+
+
+@lru_cache(maxsize=None)
+def has_model_lists(model: Type[BaseModel]) -> bool:
+    """
+    Whether a field of the model is a list of models, like the requests of a TestResult. Lists of such
+    items validate and dump slower through list_adapter than one item at a time, see
+    benchmarks/bench_formatters.py, so format_models and dump_models keep them on the per-item path.
+    """
+    for field in model.model_fields.values():
+        field_model, is_list = _unwrap(field.annotation)
+        if field_model is not None and is_list:
+            return True
+    return False
+
+
+def formats(model: Type[BaseModel]) -> Callable[[F], F]:
+    """
+    Mark a formatter that only validates and dumps its items as the model, like format_models, so
+    api_request can validate the response body straight from its JSON bytes.
+    """
+
+    def decorator(formatter: F) -> F:
+        formatter.model = model
+        formatter.fields_model = model
+        return formatter
+
+    return decorator
+
+
+def projects(model: Type[BaseModel]) -> Callable[[F], F]:
+    """
+    Mark a formatter whose items are dumped as the model and projected on the `fields` in params, so
+    unknown fields can be rejected before the request is sent. Implied by formats.
+    """
+
+    def decorator(formatter: F) -> F:
+        formatter.fields_model = model
+        return formatter
+
+    return decorator
+
+
+def format_models(model: Type[BaseModel], items: List[Any], params: Optional[dict] = None) -> List[dict]:
+    """
+    Validate and dump the items as the model. A `fields` list in params, with dotted paths like
+    'last_run.status', limits the output to those fields.
+    """
+    if has_model_lists(model):
+        return dump_models(model, [model.model_validate(item) for item in items], params)
+    return dump_models(model, list_adapter(model).validate_python(items), params)
+
+
+def dump_models(
+    model: Type[BaseModel], instances: List[BaseModel], params: Optional[dict] = None
+) -> List[dict]:
+    """
+    Dump model instances that are already validated, projected on the `fields` in params like
+    format_models.
+    """
+    fields = (params or {}).get("fields")
+    include = include_spec(model, tuple(fields)) if fields else None
+    if has_model_lists(model):
+        return [instance.model_dump(by_alias=False, include=include) for instance in instances]
+    return list_adapter(model).dump_python(
+        instances, by_alias=False, include={"__all__": include} if include else None
+    )
+
+
+def fields_params(fields: Optional[List[str]]) -> Optional[dict]:
+    """
+    Formatter params projecting the result on the given fields, or None to return every field.
+    """
+    return {"fields": list(fields)} if fields else None
+
+
+def fields_error(formatter: Optional[Callable], params: Optional[dict]) -> Optional[str]:
+    """
+    The error for `fields` in params the model of the formatter does not have, if any.
+    """
+    model = getattr(formatter, "fields_model", None)
+    fields = (params or {}).get("fields")
+    if model is None or not fields:
+        return None
+    try:
+        include_spec(model, tuple(fields))
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+@lru_cache(maxsize=256)
+def include_spec(model: Optional[Type[BaseModel]], paths: Tuple[str, ...]) -> dict:
+    """
+    Turn dotted field paths into a pydantic include spec, e.g. ('name', 'requests.url') into
+    {'name': True, 'requests': {'__all__': {'url': True}}}. Paths are checked against the model; below
+    fields that are not models (like dicts) they are used as keys as is.
+    """
+    nested = {}
+    for path in paths:
+        name, _, rest = path.partition(".")
+        if model is not None and name not in model.model_fields:
+            raise ValueError(
+                f"Unknown field '{path}' for {model.__name__}. Available fields: "
+                f"{', '.join(model.model_fields)}"
+            )
+        nested.setdefault(name, []).append(rest)
+
+    spec = {}
+    for name, rests in nested.items():
+        if "" in rests:
+            spec[name] = True
+            continue
+        annotation = model.model_fields[name].annotation if model is not None else None
+        field_model, is_list = _unwrap(annotation)
+        sub_spec = include_spec(field_model, tuple(rests))
+        spec[name] = {"__all__": sub_spec} if is_list else sub_spec
+    return spec
+
+
+def _unwrap(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """
+    The model of a field annotation like Optional[List[Model]], and whether the field is a list.
+    """
+    is_list = False
+    while True:
+        origin = get_origin(annotation)
+        if origin in (Union, UnionType):
+            args = [arg for arg in get_args(annotation) if arg is not type(None)]
+            if len(args) != 1:
+                return None, is_list
+            annotation = args[0]
+        elif origin is list:
+            is_list = True
+            annotation = next(iter(get_args(annotation)), Any)
+        else:
+            break
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, is_list
+    return None, is_list
@@ -1,10 +1,9 @@
 from typing import Any, List, Optional
 
+from src.formatters.base import format_models, formats
 from src.models.bucket import Bucket
 
 
+@formats(Bucket)
 def format_buckets(buckets: List[Any], params: Optional[dict] = None) -> List[Bucket]:
-    formatted_buckets = []
-    for bucket in buckets:
-        formatted_buckets.append(Bucket(**bucket).model_dump(by_alias=False))
-    return formatted_buckets
+    return format_models(Bucket, buckets, params)
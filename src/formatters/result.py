@@ -1,26 +1,189 @@
 from typing import Any, List, Optional
 
-from src.models.result import BucketLevelTestResult, TestExecution, TestResult
+from src.config.defaults import RESULT_SUMMARY_MAX_FAILED_REQUESTS
+from src.formatters.base import dump_models, format_models, formats, projects
+from src.models.result import (
+    AssertionOutcome,
+    BucketLevelRunSummary,
+    BucketLevelTestResult,
+    FlakyTest,
+    RequestDetail,
+    RequestTiming,
+    ResultHistory,
+    StepLatency,
+    TestExecution,
+    TestResult,
+    TestResultSummary,
+)
 
+# Results of requests, assertions, scripts and subtests that are not failures
+PASSING_RESULTS = (None, "pass", "skipped")
+# Results of test runs that have not finished yet
+RUNNING_RESULTS = ("queued", "working", "running")
 
+
+@formats(TestExecution)
 def format_triggered_runs(runs: List[Any], params: Optional[dict] = None) -> List[TestExecution]:
-    formatted_runs = []
-    for run in runs:
-        formatted_runs.append(TestExecution(**run).model_dump(by_alias=False))
-    return formatted_runs
+    return format_models(TestExecution, runs, params)
 
 
+@formats(TestResult)
 def format_results(results: List[Any], params: Optional[dict] = None) -> List[TestResult]:
-    formatted_results = []
+    return format_models(TestResult, results, params)
+
+
+@projects(TestResultSummary)
+def format_result_summaries(results: List[Any], params: Optional[dict] = None) -> List[TestResultSummary]:
+    """
+    Summarize test results to their aggregates, failed subtests and the failed requests from the
+    `cursor` in params on. Passing requests are skipped without being validated.
+    """
+    cursor = (params or {}).get("cursor") or 0
+    summaries = [_summarize(result, cursor) for result in results]
+    return dump_models(TestResultSummary, summaries, params)
+
+
+@projects(RequestDetail)
+def format_result_requests(results: List[Any], params: Optional[dict] = None) -> List[RequestDetail]:
+    """
+    The request at `request_index` in params of each test result, or nothing if there is none.
+    """
+    index = params["request_index"]
+    details = []
     for result in results:
-        formatted_results.append(TestResult(**result).model_dump(by_alias=False))
-    return formatted_results
+        requests = result.get("requests") or []
+        if 0 <= index < len(requests):
+            details.append(RequestDetail.model_validate({**requests[index], "request_index": index}))
+    return dump_models(RequestDetail, details, params)
+
+
+def format_result_histories(histories: List[Any], params: Optional[dict] = None) -> List[ResultHistory]:
+    return format_models(ResultHistory, histories, params)
+
+
+def format_request_timings(results: List[Any], params: Optional[dict] = None) -> List[RequestTiming]:
+    """
+    The `metric` in params, a key of the request timings like 'response_time_ms', of every request of
+    the test results. Nothing else of the results is validated.
+    """
+    metric = params["metric"]
+    timings = [
+        {**request, "timing_ms": (request.get("timings") or {}).get(metric, request.get(metric))}
+        for result in results
+        for request in result.get("requests") or []
+    ]
+    return format_models(RequestTiming, timings, params)
+
+
+def format_step_latencies(latencies: List[Any], params: Optional[dict] = None) -> List[StepLatency]:
+    return format_models(StepLatency, latencies, params)
+
+
+def format_assertion_outcomes(results: List[Any], params: Optional[dict] = None) -> List[AssertionOutcome]:
+    """
+    Every assertion of every request of the test results, with the step and url of its request.
+    """
+    outcomes = [
+        {**assertion, "step_id": request.get("uuid"), "url": request.get("url")}
+        for result in results
+        for request in result.get("requests") or []
+        for assertion in request.get("assertions") or []
+    ]
+    return format_models(AssertionOutcome, outcomes, params)
+
 
+def format_flaky_tests(tests: List[Any], params: Optional[dict] = None) -> List[FlakyTest]:
+    return format_models(FlakyTest, tests, params)
 
+
+@formats(BucketLevelTestResult)
 def format_bucket_level_results(
     results: List[Any], params: Optional[dict] = None
 ) -> List[BucketLevelTestResult]:
-    formatted_results = []
-    for result in results:
-        formatted_results.append(BucketLevelTestResult(**result).model_dump(by_alias=False))
-    return formatted_results
+    return format_models(BucketLevelTestResult, results, params)
+
+
+def _summarize(result: dict, cursor: int) -> TestResultSummary:
+    requests = result.get("requests") or []
+    failed = [
+        index for index, request in enumerate(requests) if index >= cursor and _request_failed(request)
+    ]
+    shown, rest = failed[:RESULT_SUMMARY_MAX_FAILED_REQUESTS], failed[RESULT_SUMMARY_MAX_FAILED_REQUESTS:]
+    # Requests and subtests are not fields of the summary, so their raw results are not validated
+    return TestResultSummary.model_validate(
+        {
+            **result,
+            "requests_failed": sum(1 for request in requests if _request_failed(request)),
+            "failed_requests": [_failed_request(index, requests[index]) for index in shown],
+            "failed_subtests": [
+                subtest
+                for subtest in result.get("subtest_detail") or []
+                if subtest.get("result") not in PASSING_RESULTS
+            ],
+            "next_cursor": rest[0] if rest else None,
+        }
+    )
+
+
+def _request_failed(request: dict) -> bool:
+    return (
+        request.get("result") not in PASSING_RESULTS
+        or bool(request.get("assertions_failed"))
+        or bool(request.get("scripts_failed"))
+    )
+
+
+def _failed_request(index: int, request: dict) -> dict:
+    return {
+        **request,
+        "request_index": index,
+        "failed_assertions": [
+            assertion
+            for assertion in request.get("assertions") or []
+            if assertion.get("result") not in PASSING_RESULTS
+        ],
+        "failed_scripts": [
+            script for script in request.get("scripts") or [] if script.get("result") not in PASSING_RESULTS
+        ],
+    }
+
+
+def format_bucket_level_run_summaries(
+    runs: List[Any], params: Optional[dict] = None
+) -> List[BucketLevelRunSummary]:
+    """
+    Merge the tracked test runs of bucket-level runs into their pass, fail and running counts, result
+    and total duration.
+    """
+    return format_models(BucketLevelRunSummary, [_merge_test_runs(run) for run in runs], params)
+
+
+def _merge_test_runs(run: dict) -> dict:
+    test_runs = [
+        {**test_run, "duration_in_sec": _duration(test_run.get("started_at"), test_run.get("finished_at"))}
+        for test_run in run["test_runs"]
+    ]
+    results = [test_run.get("result") for test_run in test_runs]
+    passed = results.count("pass")
+    running = sum(1 for result in results if result in RUNNING_RESULTS)
+    failed = sum(1 for result in results if result is not None and result not in RUNNING_RESULTS) - passed
+    finished = [test_run for test_run in test_runs if test_run["duration_in_sec"] is not None]
+    return {
+        **run,
+        "status": "running" if running else "completed",
+        "result": "fail" if failed else "pass" if passed == len(test_runs) else None,
+        "total_test_runs": len(test_runs),
+        "test_runs_passed": passed,
+        "test_runs_failed": failed,
+        "test_runs_running": running,
+        "requests_failed": sum(test_run.get("requests_failed") or 0 for test_run in test_runs),
+        "total_duration_in_sec": _duration(
+            min((test_run["started_at"] for test_run in finished), default=None),
+            max((test_run["finished_at"] for test_run in finished), default=None),
+        ),
+        "test_runs": test_runs,
+    }
+
+
+def _duration(started_at: Optional[float], finished_at: Optional[float]) -> Optional[float]:
+    return finished_at - started_at if started_at is not None and finished_at is not None else None
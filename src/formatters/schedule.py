@@ -1,10 +1,9 @@
 from typing import Any, List, Optional
 
+from src.formatters.base import format_models, formats
 from src.models.schedule import Schedule
 
 
+@formats(Schedule)
 def format_schedules(schedules: List[Any], params: Optional[dict] = None) -> List[Schedule]:
-    formatted_schedules = []
-    for schedule in schedules:
-        formatted_schedules.append(Schedule(**schedule).model_dump(by_alias=False))
-    return formatted_schedules
+    return format_models(Schedule, schedules, params)
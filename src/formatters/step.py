@@ -1,10 +1,9 @@
 from typing import Any, List, Optional
 
+from src.formatters.base import format_models, formats
 from src.models.step import TestStep
 
 
+@formats(TestStep)
 def format_steps(steps: List[Any], params: Optional[dict] = None) -> TestStep:
-    formatted_steps = []
-    for step in steps:
-        formatted_steps.append(TestStep(**step).model_dump(by_alias=False))
-    return formatted_steps
+    return format_models(TestStep, steps, params)
@@ -1,24 +1,24 @@
 from typing import Any, List, Optional
 
-from src.models.team import Account, Team, TeamUsers
+from src.formatters.base import format_models, formats, projects
+from src.models.team import Account, SearchMatch, Team, TeamUsers
 
 
+@formats(Team)
 def format_teams(teams: List[Any], params: Optional[dict] = None) -> List[Team]:
-    formatted_teams = []
-    for team in teams:
-        formatted_teams.append(Team(**team).model_dump(by_alias=False))
-    return formatted_teams
+    return format_models(Team, teams, params)
 
 
+@formats(Account)
 def format_accounts(accounts: List[Any], params: Optional[dict] = None) -> List[Account]:
-    formatted_accounts = []
-    for account in accounts:
-        formatted_accounts.append(Account(**account).model_dump(by_alias=False))
-    return formatted_accounts
+    return format_models(Account, accounts, params)
 
 
+@formats(TeamUsers)
 def format_team_users(users: List[Any], params: Optional[dict] = None) -> List[TeamUsers]:
-    formatted_users = []
-    for user in users:
-        formatted_users.append(TeamUsers(**user).model_dump(by_alias=False))
-    return formatted_users
+    return format_models(TeamUsers, users, params)
+
+
+@projects(SearchMatch)
+def format_search_matches(matches: List[Any], params: Optional[dict] = None) -> List[SearchMatch]:
+    return format_models(SearchMatch, matches, params)
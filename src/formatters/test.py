@@ -1,17 +1,62 @@
 from typing import Any, List, Optional
 
-from src.models.test import Test, TestMetrics
+from src.config.defaults import METRICS_MIN_POINTS
+from src.formatters.base import format_models, formats, projects
+from src.models.test import BucketArchive, Test, TestMetricAnomalies, TestMetrics
 
 
+@formats(Test)
 def format_tests(tests: List[Any], params: Optional[dict] = None) -> List[Test]:
-    formatted_tests = []
-    for test in tests:
-        formatted_tests.append(Test(**test).model_dump(by_alias=False))
-    return formatted_tests
+    return format_models(Test, tests, params)
 
 
+@projects(TestMetrics)
 def format_test_metrics(metrics: List[Any], params: Optional[dict] = None) -> List[TestMetrics]:
-    formatted_metrics = []
-    for metric in metrics:
-        formatted_metrics.append(TestMetrics(**metric).model_dump(by_alias=False))
-    return formatted_metrics
+    """
+    Format test metrics, with their response times downsampled to about `max_points` in params, if
+    given.
+    """
+    max_points = (params or {}).get("max_points")
+    if max_points:
+        metrics = [
+            {**item, "response_times": downsample_points(item.get("response_times") or [], max_points)}
+            for item in metrics
+        ]
+    return format_models(TestMetrics, metrics, params)
+
+
+def downsample_points(points: List[dict], max_points: int) -> List[dict]:
+    """
+    Downsample a response time series to at most max(max_points, METRICS_MIN_POINTS) points, keeping
+    its shape: the first and last points are kept, and the points between them are split into buckets
+    of consecutive points, keeping from each the point with the highest average response time and the
+    one with the lowest success ratio. Every spike and dip therefore survives, in time order.
+    """
+    max_points = max(max_points, METRICS_MIN_POINTS)
+    if len(points) <= max_points:
+        return points
+    inner = points[1:-1]
+    buckets = (max_points - 2) // 2
+    kept = [points[0]]
+    for bucket in range(buckets):
+        start, end = bucket * len(inner) // buckets, (bucket + 1) * len(inner) // buckets
+        slowest = max(range(start, end), key=lambda i: inner[i].get("avg_response_time_ms") or 0)
+        worst = min(range(start, end), key=lambda i: _success_ratio(inner[i]))
+        kept.extend(inner[i] for i in sorted({slowest, worst}))
+    kept.append(points[-1])
+    return kept
+
+
+def _success_ratio(point: dict) -> float:
+    success_ratio = point.get("success_ratio")
+    return 1.0 if success_ratio is None else success_ratio
+
+
+def format_test_metric_anomalies(
+    anomalies: List[Any], params: Optional[dict] = None
+) -> List[TestMetricAnomalies]:
+    return format_models(TestMetricAnomalies, anomalies, params)
+
+
+def format_bucket_archives(archives: List[Any], params: Optional[dict] = None) -> List[BucketArchive]:
+    return format_models(BucketArchive, archives, params)
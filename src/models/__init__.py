@@ -1,7 +1,9 @@
-from typing import Any, List, Optional
+from typing import Any, Generic, List, Optional, TypeVar, Union
 
 from pydantic import BaseModel, Field
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
 
 class BaseResult(BaseModel):
     """
@@ -36,3 +38,16 @@ class BaseResult(BaseModel):
 
     def model_dump_json(self, **kwargs):
         return super().model_dump_json(exclude_none=True, **kwargs)
+
+
+class ApiResponse(BaseModel, Generic[ModelT]):
+    """
+    This is the schema of the APIM API responses, with data of either a list of items or a single one
+    """
+
+    # A list is tried first, so a list of items is never validated twice
+    data: Union[List[ModelT], ModelT, None] = Field(default=None, union_mode="left_to_right")
+    total: Optional[int] = None
+    skip: Optional[int] = None
+    limit: Optional[int] = None
+    error: Any = None
@@ -94,8 +94,8 @@ class RequestResult(BaseModel):
     )
 
 
-class TestResult(BaseModel):
-    """Test run result."""
+class TestRunAggregates(BaseModel):
+    """Test run result without the results of its individual requests and subtests."""
 
     test_run_id: str = Field(description="The unique identifier for the test run")
     bucket_key: str = Field(description="The bucket to which this test run belongs to")
@@ -133,9 +133,6 @@ class TestResult(BaseModel):
     environment_name: Optional[str] = Field(
         default=None, description="The environment name used for this test run"
     )
-    requests: Optional[List[RequestResult]] = Field(
-        default=None, description="List of individual request results within this test run"
-    )
 
     # Additional fields from the response
     agent: Optional[str] = Field(
@@ -153,11 +150,165 @@ class TestResult(BaseModel):
     agent_expired: Optional[bool] = Field(
         default=None, description="Whether agent(private location) expired"
     )
+
+
+class TestResult(TestRunAggregates):
+    """Test run result."""
+
+    requests: Optional[List[RequestResult]] = Field(
+        default=None, description="List of individual request results within this test run"
+    )
     subtest_detail: Optional[List[SubtestDetail]] = Field(
         default=None, description="Detailed subtest results"
     )
 
 
+class RequestDetail(RequestResult):
+    """Individual request result of a test run, read on its own by its position in the run."""
+
+    request_index: int = Field(description="Position of the request in the test run")
+
+
+class FailedRequest(BaseModel):
+    """A failed request of a test run, with only its failed assertions and scripts."""
+
+    request_index: int = Field(
+        description="Position of the request in the test run, used to read its details"
+    )
+    step_id: Optional[str] = Field(default=None, alias="uuid", description="The test step of this request")
+    url: Optional[str] = Field(default=None, description="Request URL")
+    method: Optional[str] = Field(default=None, description="HTTP method")
+    result: Optional[str] = Field(default=None, description="Result of the request")
+    response_message: Optional[str] = Field(default=None, description="Response message")
+    error_messages: Optional[List[Any]] = Field(default=None, description="Error messages for this request")
+    failed_assertions: List[AssertionResult] = Field(
+        default_factory=list, description="Assertions of this request that did not pass"
+    )
+    failed_scripts: List[ScriptResult] = Field(
+        default_factory=list, description="Scripts of this request that did not pass"
+    )
+
+
+class FailedSubtest(BaseModel):
+    """A failed subtest of a test run."""
+
+    name: str = Field(description="Subtest name")
+    result: str = Field(description="Subtest result")
+    test_id: str = Field(alias="test_uuid", description="Id of the test executed by the subtest step")
+    test_run_id: str = Field(alias="test_run_uuid", description="Id of the subtest run")
+
+
+class TestResultSummary(TestRunAggregates):
+    """Test run result summarized to its aggregates and failures."""
+
+    requests_failed: int = Field(description="Number of requests that failed during the test run")
+    failed_requests: List[FailedRequest] = Field(
+        default_factory=list, description="Failed requests, starting at the cursor of this read"
+    )
+    failed_subtests: List[FailedSubtest] = Field(default_factory=list, description="Failed subtests")
+    next_cursor: Optional[int] = Field(
+        default=None, description="Cursor to read the next failed requests, if there are more"
+    )
+
+
+class StoredTestRun(BaseModel):
+    """Finished test run kept in the local results store."""
+
+    test_run_id: str = Field(description="The unique identifier for the test run")
+    result: Optional[str] = Field(default=None, description="The result of the test run")
+    started_at: Optional[float] = Field(default=None, description="When the test run started")
+    finished_at: Optional[float] = Field(default=None, description="When the test run finished")
+    source: Optional[str] = Field(default=None, description="The source of the test run")
+    region: Optional[str] = Field(default=None, description="The region where the test run was executed")
+    agent: Optional[str] = Field(default=None, description="The private location of the test run")
+    environment_id: Optional[str] = Field(default=None, description="The environment used for the run")
+    environment_name: Optional[str] = Field(default=None, description="The environment name")
+    requests_executed: Optional[int] = Field(default=None, description="Number of requests executed")
+    assertions_failed: Optional[int] = Field(default=None, description="Number of assertions that failed")
+    scripts_failed: Optional[int] = Field(default=None, description="Number of scripts that failed")
+
+
+class ResultHistory(BaseModel):
+    """Finished runs of a test matching a history query, aggregated from the local results store."""
+
+    bucket_key: str = Field(description="The bucket of the test")
+    test_id: str = Field(description="The test whose history was queried")
+    test_name: Optional[str] = Field(default=None, description="The name of the test")
+    runs: int = Field(description="Number of matching finished runs")
+    passed: int = Field(description="Number of matching runs that passed")
+    failed: int = Field(description="Number of matching runs that did not pass")
+    pass_rate: Optional[float] = Field(default=None, description="Share of the matching runs that passed")
+    avg_duration_in_sec: Optional[float] = Field(default=None, description="Average run duration")
+    max_duration_in_sec: Optional[float] = Field(default=None, description="Longest run duration")
+    first_started_at: Optional[float] = Field(default=None, description="Start of the oldest matching run")
+    last_started_at: Optional[float] = Field(default=None, description="Start of the latest matching run")
+    test_runs: List[StoredTestRun] = Field(description="The latest matching runs, newest first")
+
+
+class RequestTiming(BaseModel):
+    """A timing of a request of a test run, keyed by its test step."""
+
+    step_id: Optional[str] = Field(default=None, alias="uuid", description="The test step of this request")
+    url: Optional[str] = Field(default=None, description="Request URL")
+    method: Optional[str] = Field(default=None, description="HTTP method")
+    timing_ms: Optional[float] = Field(default=None, description="The requested timing in milliseconds")
+
+
+class StepLatency(BaseModel):
+    """Latency percentiles of a test step over the runs of a test."""
+
+    step_id: Optional[str] = Field(default=None, description="The test step")
+    url: Optional[str] = Field(default=None, description="Request URL of the step")
+    method: Optional[str] = Field(default=None, description="HTTP method of the step")
+    samples: int = Field(description="Number of timings of the step")
+    p50_ms: float = Field(description="Median timing in milliseconds")
+    p95_ms: float = Field(description="95th percentile timing in milliseconds")
+    p99_ms: float = Field(description="99th percentile timing in milliseconds")
+    max_ms: float = Field(description="Maximum timing in milliseconds")
+
+
+class AssertionOutcome(BaseModel):
+    """An assertion of a request of a test run, keyed by its test step."""
+
+    step_id: Optional[str] = Field(default=None, description="The test step of the assertion")
+    url: Optional[str] = Field(default=None, description="Request URL of the step")
+    source: str = Field(description="Assertion source")
+    property: Optional[str] = Field(default=None, description="Property being asserted")
+    comparison: str = Field(description="Comparison type")
+    result: str = Field(description="Assertion result")
+
+
+class FlakyAssertion(BaseModel):
+    """The assertion of a test whose result flips most often between its runs."""
+
+    step_id: Optional[str] = Field(default=None, description="The test step of the assertion")
+    url: Optional[str] = Field(default=None, description="Request URL of the step")
+    source: str = Field(description="Assertion source")
+    property: Optional[str] = Field(default=None, description="Property being asserted")
+    comparison: str = Field(description="Comparison type")
+    flips: int = Field(description="Times the assertion changed between pass and fail")
+    failures: int = Field(description="Runs in which the assertion failed")
+
+
+class FlakyTest(BaseModel):
+    """Flakiness of a test over its latest finished runs."""
+
+    test_id: str = Field(description="The test")
+    test_name: Optional[str] = Field(default=None, description="The name of the test")
+    score: float = Field(description="Flakiness between 0 (steady) and 1 (flips on every run)")
+    runs: int = Field(description="Number of finished runs analyzed")
+    passed: int = Field(description="Number of runs that passed")
+    failed: int = Field(description="Number of runs that did not pass")
+    flips: int = Field(description="Times the result changed between pass and fail")
+    flip_rate: float = Field(description="Share of consecutive runs with a different result")
+    retry_passes: int = Field(description="Failures followed shortly by a passing run")
+    failing_regions: List[str] = Field(description="Regions with failed runs")
+    region_isolated: bool = Field(description="Whether the failures are isolated to one region")
+    flaky_assertion: Optional[FlakyAssertion] = Field(
+        default=None, description="The assertion that flips most often, if any"
+    )
+
+
 class FailureDetails(BaseModel):
     """Failure details for bucket-level test run."""
 
@@ -206,11 +357,58 @@ class BucketLevelTestResult(BaseModel):
     )
 
 
+class TrackedTestRun(BaseModel):
+    """Test run of a bucket-level run, with its result once it finished."""
+
+    test_run_id: str = Field(description="The unique identifier for the test run")
+    test_id: str = Field(description="The unique identifier for the executed test")
+    test_name: str = Field(description="The name of the test executed")
+    result: Optional[str] = Field(
+        default=None, description="Result of the test run, or its status while it is running"
+    )
+    duration_in_sec: Optional[float] = Field(
+        default=None, description="Execution time of the test run in seconds, once it finished"
+    )
+    requests_failed: Optional[int] = Field(
+        default=None, description="Number of requests that failed during the test run"
+    )
+    test_run_url: Optional[str] = Field(
+        default=None, description="The url of blazemeter dashboard(UI) to view the test run details"
+    )
+
+
+class BucketLevelRunSummary(BaseModel):
+    """Bucket-level test run tracked until its test runs finished, merged from their results."""
+
+    bucket_level_test_run_id: Optional[str] = Field(
+        default=None, description="Unique identifier for the bucket-level test run"
+    )
+    bucket_level_test_run_url: Optional[str] = Field(
+        default=None, description="The URL to view the consolidated results of the bucket-level test run"
+    )
+    bucket_key: str = Field(description="Key identifier for the bucket")
+    status: str = Field(description="'completed' when all test runs finished, 'running' otherwise")
+    result: Optional[str] = Field(
+        default=None, description="'fail' if any test run failed, 'pass' if all of them passed"
+    )
+    total_test_runs: int = Field(description="Total number of test runs in the bucket-level run")
+    test_runs_passed: int = Field(description="Number of test runs that passed")
+    test_runs_failed: int = Field(description="Number of test runs that failed")
+    test_runs_running: int = Field(description="Number of test runs that did not finish yet")
+    requests_failed: int = Field(description="Total number of requests that failed across all test runs")
+    total_duration_in_sec: Optional[float] = Field(
+        default=None,
+        description="Time from the start of the first to the end of the last finished test run",
+    )
+    test_runs: List[TrackedTestRun] = Field(description="Result and duration of each test run")
+
+
 class TestExecutionRuns(BaseModel):
     """Individual test run schema for trigger URL based test run."""
 
     test_run_id: str = Field(description="The unique identifier for the test run")
     test_id: str = Field(description="The unique identifier for the executed test")
+    bucket_key: Optional[str] = Field(default=None, description="The bucket of the executed test")
     test_name: str = Field(description="The name of the test executed")
     region: Optional[str] = Field(
         default=None, description="The region i.e. public location where the test was executed"
@@ -64,3 +64,22 @@ class Account(BaseModel):
     name: str = Field(description="The name of the user")
     email: str = Field(description="The email address of the user")
     teams: Optional[List[AccountTeamObj]] = Field(description="The list of teams this user has access to")
+
+
+class SearchMatch(BaseModel):
+    """A team, bucket or test whose names match a search query."""
+
+    kind: str = Field(description="'team', 'bucket' or 'test'")
+    score: float = Field(description="How well the names match the query, from 0 to 1")
+    team_id: Optional[str] = Field(default=None, description="The team of the match")
+    team_name: Optional[str] = Field(default=None, description="The name of the team")
+    bucket_key: Optional[str] = Field(default=None, description="The bucket of the match")
+    bucket_name: Optional[str] = Field(default=None, description="The name of the bucket")
+    test_id: Optional[str] = Field(default=None, description="The matched test")
+    test_name: Optional[str] = Field(default=None, description="The name of the test")
+    trigger_url: Optional[str] = Field(
+        default=None, description="The trigger URL of the matched test or bucket, to start runs via API"
+    )
+    default_environment_id: Optional[str] = Field(
+        default=None, description="The default environment of the matched test"
+    )
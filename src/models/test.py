@@ -119,3 +119,46 @@ class TestMetrics(BaseModel):
 
     class Config:
         extra = "ignore"
+
+
+class MetricAnomaly(BaseModel):
+    """A point of a response time series that deviates from the rolling baseline before it."""
+
+    timestamp: Optional[int] = Field(default=None, description="Unix timestamp of the point")
+    kind: str = Field(description="'latency_spike' or 'success_dip'")
+    value: float = Field(description="Average response time in milliseconds or success ratio of the point")
+    baseline: float = Field(description="Median of the points before it")
+    deviation: Optional[float] = Field(
+        default=None,
+        description="Distance from the baseline in median absolute deviations. Null when the points"
+        " before it did not vary at all",
+    )
+
+
+class TestMetricAnomalies(BaseModel):
+    """Anomalies of the response times of a test over a timeframe."""
+
+    test_id: str = Field(description="The test")
+    test_name: Optional[str] = Field(default=None, description="The name of the test")
+    timeframe: str = Field(description="The timeframe of the metrics")
+    points: int = Field(description="Number of points of the response time series")
+    latency_spikes: int = Field(description="Number of latency spikes")
+    success_dips: int = Field(description="Number of success ratio dips")
+    response_time_95th_percentile: Optional[float] = Field(
+        default=None, description="95th percentile response time of the timeframe in milliseconds"
+    )
+    response_time_95th_percentile_change: Optional[float] = Field(
+        default=None, description="Change of the 95th percentile response time from the previous timeframe"
+    )
+    anomalies: List[MetricAnomaly] = Field(description="The anomalous points, oldest first")
+
+
+class BucketArchive(BaseModel):
+    """A bucket archive written by an export, or replayed by an import."""
+
+    path: str = Field(description="The local archive file")
+    bucket_key: str = Field(description="The bucket exported, or imported into")
+    tests: int = Field(description="Number of tests written")
+    steps: int = Field(description="Number of steps written")
+    environments: int = Field(description="Number of environments written")
+    schedules: int = Field(description="Number of schedules written")
@@ -1,14 +1,22 @@
+import asyncio
+import logging
 from typing import Optional
 
+from src.config.defaults import LIST_BUCKETS_CONCURRENCY, LIST_PAGE_SIZE, PREWARM_REQUEST_BUDGET
 from src.config.token import BzmApimToken
+from src.tools.bucket_manager import BucketManager
 from src.tools.bucket_manager import register as register_bucket_manager
 from src.tools.environment_manager import register as register_environment_manager
 from src.tools.result_manager import register as register_result_manager
 from src.tools.schedule_manager import register as register_schedule_manager
 from src.tools.step_manager import register as register_step_manager
+from src.tools.team_manager import TeamManager
 from src.tools.team_manager import register as register_team_manager
+from src.tools.test_manager import TestManager
 from src.tools.test_manager import register as register_test_manager
 
+logger = logging.getLogger(__name__)
+
 
 def register_tools(mcp, token: Optional[BzmApimToken]):
     """
@@ -25,3 +33,34 @@ def register_tools(mcp, token: Optional[BzmApimToken]):
     register_schedule_manager(mcp, token)
     register_step_manager(mcp, token)
     register_environment_manager(mcp, token)
+
+
+async def prewarm_cache(token: Optional[BzmApimToken], budget: int = PREWARM_REQUEST_BUDGET) -> int:
+    """
+    Prefetch what agents nearly always ask first into the response cache, the way the list actions of
+    the tools request it: the account with its teams, the bucket list, and the first page of tests of
+    each bucket. Requests are made a few at a time, which also opens as many pooled connections, and
+    no more than `budget` of them are made. Returns the number of requests made.
+
+    Args:
+            token: BlazeMeter API Test token
+            budget: Largest number of requests to make
+    """
+    if not token or budget <= 0:
+        return 0
+    team_manager, test_manager = TeamManager(token, None), TestManager(token, None)
+    if budget == 1:
+        await team_manager.list()
+        return 1
+
+    _, buckets = await asyncio.gather(team_manager.list(), BucketManager(token, None).list())
+    bucket_keys = [bucket["bucket_key"] for bucket in buckets.result or []][: budget - 2]
+    semaphore = asyncio.Semaphore(LIST_BUCKETS_CONCURRENCY)
+
+    async def list_tests(bucket_key: str) -> None:
+        async with semaphore:
+            await test_manager.list(bucket_key, LIST_PAGE_SIZE, 0)
+
+    await asyncio.gather(*(list_tests(bucket_key) for bucket_key in bucket_keys))
+    logger.info("Prewarmed the cache with the account, buckets and tests of %d buckets", len(bucket_keys))
+    return 2 + len(bucket_keys)
@@ -1,13 +1,14 @@
 import logging
 import traceback
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import httpx
 from mcp.server.fastmcp import Context
 
-from src.common.api_client import api_request
-from src.config.defaults import BUCKETS_ENDPOINT, TOOLS_PREFIX
+from src.common.api_client import api_request, invalidate_cache
+from src.config.defaults import BUCKETS_ENDPOINT, TEAMS_ENDPOINT, TOOLS_PREFIX
 from src.config.token import BzmApimToken
+from src.formatters.base import fields_params
 from src.formatters.bucket import format_buckets
 from src.models import BaseResult
 
@@ -21,20 +22,33 @@ class BucketManager:
         self.token = token
         self.ctx = ctx
 
-    async def read(self, bucket_key: str) -> BaseResult:
+    async def read(self, bucket_key: str, fields: Optional[List[str]] = None) -> BaseResult:
         bucket_result = await api_request(
-            self.token, "GET", f"{BUCKETS_ENDPOINT}/{bucket_key}", result_formatter=format_buckets
+            self.token,
+            "GET",
+            f"{BUCKETS_ENDPOINT}/{bucket_key}",
+            result_formatter=format_buckets,
+            result_formatter_params=fields_params(fields),
         )
         return bucket_result
 
     async def create(self, bucket_name: str, team_id: int) -> BaseResult:
         parameters = {"name": bucket_name, "team_uuid": team_id}
-        return await api_request(
+        bucket_result = await api_request(
             self.token, "POST", f"{BUCKETS_ENDPOINT}", result_formatter=format_buckets, params=parameters
         )
+        # Teams list their buckets, so cached teams are outdated as well
+        invalidate_cache(TEAMS_ENDPOINT, descendants=True)
+        return bucket_result
 
-    async def list(self) -> BaseResult:
-        return await api_request(self.token, "GET", f"{BUCKETS_ENDPOINT}", result_formatter=format_buckets)
+    async def list(self, fields: Optional[List[str]] = None) -> BaseResult:
+        return await api_request(
+            self.token,
+            "GET",
+            f"{BUCKETS_ENDPOINT}",
+            result_formatter=format_buckets,
+            result_formatter_params=fields_params(fields),
+        )
 
 
 def register(mcp, token: Optional[BzmApimToken]):
@@ -43,6 +57,9 @@ def register(mcp, token: Optional[BzmApimToken]):
         description="""
         Operations on buckets. These buckets reside within teams which is represented by team_id and
         contains tests represented by test_id.
+        Read and list actions also accept an optional 'fields' arg (list[str]): the fields to return,
+        with dotted paths for nested fields, e.g. ["bucket_key", "name", "team.name"]. All fields are
+        returned when omitted.
         Actions:
         - read: Read a bucket. Get the detailed information of a bucket.
             args(dict): Dictionary with the following required parameters:
@@ -61,11 +78,11 @@ def register(mcp, token: Optional[BzmApimToken]):
         try:
             match action:
                 case "read":
-                    return await bucket_manager.read(args["bucket_key"])
+                    return await bucket_manager.read(args["bucket_key"], args.get("fields"))
                 case "create":
                     return await bucket_manager.create(args["bucket_name"], args["team_id"])
                 case "list":
-                    return await bucket_manager.list()
+                    return await bucket_manager.list(args.get("fields"))
                 case _:
                     return BaseResult(error=f"Action {action} not found in buckets manager tool")
         except httpx.HTTPStatusError:
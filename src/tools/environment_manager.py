@@ -1,6 +1,6 @@
 import logging
 import traceback
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import httpx
 from mcp.server.fastmcp import Context
@@ -8,6 +8,7 @@ from mcp.server.fastmcp import Context
 from src.common.api_client import api_request
 from src.config.defaults import TEST_ENVIRONMENT_ENDPOINT, TOOLS_PREFIX
 from src.config.token import BzmApimToken
+from src.formatters.base import fields_params
 from src.formatters.environment import format_environments
 from src.models import BaseResult
 
@@ -21,21 +22,25 @@ class EnvironmentManager:
         self.token = token
         self.ctx = ctx
 
-    async def read(self, bucket_key: str, test_id: str, environment_id: str) -> BaseResult:
+    async def read(
+        self, bucket_key: str, test_id: str, environment_id: str, fields: Optional[List[str]] = None
+    ) -> BaseResult:
         bucket_result = await api_request(
             self.token,
             "GET",
             f"{TEST_ENVIRONMENT_ENDPOINT.format(bucket_key, test_id)}/{environment_id}",
             result_formatter=format_environments,
+            result_formatter_params=fields_params(fields),
         )
         return bucket_result
 
-    async def list(self, bucket_key: str, test_id: str) -> BaseResult:
+    async def list(self, bucket_key: str, test_id: str, fields: Optional[List[str]] = None) -> BaseResult:
         return await api_request(
             self.token,
             "GET",
             f"{TEST_ENVIRONMENT_ENDPOINT.format(bucket_key, test_id)}",
             result_formatter=format_environments,
+            result_formatter_params=fields_params(fields),
         )
 
 
@@ -45,6 +50,9 @@ def register(mcp, token: Optional[BzmApimToken]):
         description="""
         Operations on buckets. These buckets reside within teams which is represented by team_id and
         contains tests represented by test_id.
+        Read and list actions also accept an optional 'fields' arg (list[str]): the fields to return,
+        with dotted paths for nested fields, e.g. ["environment_id", "name", "regions"]. All fields are
+        returned when omitted.
         Actions:
         - list: List all the environments for a given test.
             args(dict): Dictionary with the following required parameters:
@@ -64,10 +72,12 @@ def register(mcp, token: Optional[BzmApimToken]):
             match action:
                 case "read":
                     return await environment_manager.read(
-                        args["bucket_key"], args["test_id"], args["environment_id"]
+                        args["bucket_key"], args["test_id"], args["environment_id"], args.get("fields")
                     )
                 case "list":
-                    return await environment_manager.list(args["bucket_key"], args["test_id"])
+                    return await environment_manager.list(
+                        args["bucket_key"], args["test_id"], args.get("fields")
+                    )
                 case _:
                     return BaseResult(error=f"Action {action} not found in environments manager tool")
         except httpx.HTTPStatusError:
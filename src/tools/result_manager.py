@@ -1,23 +1,50 @@
+import asyncio
 import logging
+import statistics
+import time
 import traceback
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 from mcp.server.fastmcp import Context
 
 from src.common.api_client import api_request
+from src.common.flakiness import assertion_flips, flakiness
+from src.common.latency import step_percentiles
+from src.common.results_store import RUN_COLUMNS, get_results_store
 from src.config.defaults import (
     BUCKET_LEVEL_RESULTS_ENDPOINT,
+    FLAKY_RETRY_WINDOW,
+    POLL_CONCURRENCY,
+    POLL_HISTORY_RUNS,
+    POLL_INTERVAL_MAX,
+    POLL_INTERVAL_MIN,
     RESULTS_ENDPOINT,
+    RESULTS_FETCH_CONCURRENCY,
+    RESULTS_PAGE_SIZE,
+    RESULTS_SYNC_DAYS,
     TOOLS_PREFIX,
+    WAIT_TIMEOUT_DEFAULT,
+    WAIT_TIMEOUT_MAX,
 )
 from src.config.token import BzmApimToken
+from src.formatters.base import fields_params
 from src.formatters.result import (
+    RUNNING_RESULTS,
+    format_assertion_outcomes,
     format_bucket_level_results,
+    format_bucket_level_run_summaries,
+    format_flaky_tests,
+    format_request_timings,
+    format_result_histories,
+    format_result_requests,
+    format_result_summaries,
     format_results,
+    format_step_latencies,
     format_triggered_runs,
 )
 from src.models import BaseResult
+from src.tools.test_manager import TestManager
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -30,27 +57,304 @@ class ResultManager:
         self.ctx = ctx
 
     async def start(self, trigger_url: str) -> BaseResult:
-        return await api_request(self.token, "GET", trigger_url, result_formatter=format_triggered_runs)
+        # Every call of a trigger URL starts new runs, so concurrent starts must each reach the API
+        return await api_request(
+            self.token, "GET", trigger_url, result_formatter=format_triggered_runs, idempotent=False
+        )
+
+    async def start_and_wait(
+        self, trigger_url: str, timeout: Optional[float] = None, bucket_key: Optional[str] = None
+    ) -> BaseResult:
+        """
+        Start a test run and poll each of its test runs until it finishes or the deadline passes.
+        A run is first read when its test usually finishes, estimated from its past runs, and then with
+        a growing interval. Progress is reported as runs finish. Returns the summaries of the runs.
+        """
+        started_at = time.monotonic()
+        started, runs = await self._start_runs(trigger_url, bucket_key)
+        if not runs:
+            return started
+        timeout = min(WAIT_TIMEOUT_DEFAULT if timeout is None else timeout, WAIT_TIMEOUT_MAX)
+        polls = await self._wait_for_runs(runs, started_at + timeout)
+
+        summaries, warnings, running = [], [], []
+        for run, polled in zip(runs, polls):
+            if polled.error:
+                warnings.append(f"Test run {run['test_run_id']} of {run['test_name']}: {polled.error}")
+                continue
+            summaries.append(polled.result[0])
+            if not _run_finished(polled.result[0]):
+                running.append(run["test_run_id"])
+
+        waited = BaseResult(result=summaries, total=len(summaries), has_more=False)
+        waited.append_info(
+            [
+                f"{len(summaries) - len(running)} of {len(runs)} test runs finished in "
+                f"{time.monotonic() - started_at:.0f}s"
+            ]
+        )
+        if running:
+            warnings.append(f"{len(running)} test runs did not finish within {timeout:.0f}s")
+            waited.append_hints(
+                [f"Read the result of test runs {', '.join(running)} later to get their final result."]
+            )
+        if warnings:
+            waited.append_warnings(warnings)
+        if any(summary.get("failed_requests") for summary in summaries):
+            waited.append_hints(
+                ["Read the result with request_index of a failed request to get all its details."]
+            )
+        return waited
+
+    async def start_bucket_level_run_and_wait(
+        self, trigger_url: str, timeout: Optional[float] = None, bucket_key: Optional[str] = None
+    ) -> BaseResult:
+        """
+        Start a bucket-level test run and track all of its test runs concurrently until they finish or
+        the deadline passes, like start_and_wait. Returns one summary of the bucket-level run with the
+        result and duration of each test run.
+        """
+        started_at = time.monotonic()
+        started, runs = await self._start_runs(trigger_url, bucket_key)
+        if not runs:
+            return started
+        timeout = min(WAIT_TIMEOUT_DEFAULT if timeout is None else timeout, WAIT_TIMEOUT_MAX)
+        polls = await self._wait_for_runs(runs, started_at + timeout)
+
+        test_runs, warnings = [], []
+        for run, polled in zip(runs, polls):
+            summary = {} if polled.error else polled.result[0]
+            if polled.error:
+                warnings.append(f"Test run {run['test_run_id']} of {run['test_name']}: {polled.error}")
+            test_runs.append(
+                {
+                    **run,
+                    "result": summary.get("result"),
+                    "started_at": summary.get("started_at"),
+                    "finished_at": summary.get("finished_at"),
+                    "requests_failed": summary.get("requests_failed"),
+                }
+            )
+
+        execution = started.result[0]
+        tracked = BaseResult(
+            result=format_bucket_level_run_summaries(
+                [
+                    {
+                        "bucket_level_test_run_id": execution.get("bucket_level_test_run_id"),
+                        "bucket_level_test_run_url": execution.get("bucket_level_test_run_url"),
+                        "bucket_key": runs[0]["bucket_key"],
+                        "test_runs": test_runs,
+                    }
+                ]
+            ),
+            total=1,
+            has_more=False,
+        )
+        summary = tracked.result[0]
+        tracked.append_info(
+            [
+                f"{summary['test_runs_passed']} passed, {summary['test_runs_failed']} failed and "
+                f"{summary['test_runs_running']} running of {len(runs)} test runs after "
+                f"{time.monotonic() - started_at:.0f}s"
+            ]
+        )
+        if summary["test_runs_running"]:
+            warnings.append(
+                f"{summary['test_runs_running']} test runs did not finish within {timeout:.0f}s"
+            )
+            tracked.append_hints(
+                [
+                    "Read the bucket-level run or the result of its running test runs later to get their "
+                    "final result."
+                ]
+            )
+        if warnings:
+            tracked.append_warnings(warnings)
+        if summary["test_runs_failed"]:
+            tracked.append_hints(
+                ["Read the result of a failed test run with summary to see why its requests failed."]
+            )
+        return tracked
+
+    async def _start_runs(self, trigger_url: str, bucket_key: Optional[str]) -> Tuple[BaseResult, list]:
+        """
+        Trigger the runs and return them with their bucket, or no runs if they cannot be awaited.
+        """
+        started = await self.start(trigger_url)
+        if started.error or not started.result:
+            return started, []
+        runs = [
+            {**run, "bucket_key": run.get("bucket_key") or bucket_key}
+            for execution in started.result
+            for run in execution["test_results"]
+        ]
+        if any(not run["bucket_key"] for run in runs):
+            started.append_warnings(
+                ["The bucket of the started test runs is unknown, so they were not awaited"]
+            )
+            started.append_hints(["Pass the bucket_key of the test to wait for its runs."])
+            return started, []
+        return started, runs
+
+    async def _wait_for_runs(self, runs: List[dict], deadline: float) -> List[BaseResult]:
+        """
+        Poll all the runs concurrently, at most POLL_CONCURRENCY reads at a time, and report the number
+        of passed and failed runs as they finish. Returns the last read of each run.
+        """
+        tests = list({(run["bucket_key"], run["test_id"]) for run in runs})
+        durations = await asyncio.gather(*(self._expected_duration(*test) for test in tests))
+        expected = dict(zip(tests, durations))
+        semaphore = asyncio.Semaphore(POLL_CONCURRENCY)
+        counts = {"pass": 0, "fail": 0}
+        await self.ctx.report_progress(0, len(runs), f"Started {len(runs)} test runs")
+
+        async def wait(run: dict) -> BaseResult:
+            test = (run["bucket_key"], run["test_id"])
+            polled = await self._wait_for_run(run, expected[test], deadline, semaphore)
+            if not polled.error and _run_finished(polled.result[0]):
+                counts["pass" if polled.result[0]["result"] == "pass" else "fail"] += 1
+                await self.ctx.report_progress(
+                    counts["pass"] + counts["fail"],
+                    len(runs),
+                    f"{counts['pass']} passed, {counts['fail']} failed. Test run {run['test_run_id']} "
+                    f"of {run['test_name']}: {polled.result[0]['result']}",
+                )
+            return polled
 
-    async def read(self, bucket_key: str, test_id: str, test_run_id: str) -> BaseResult:
+        return await asyncio.gather(*(wait(run) for run in runs))
+
+    async def _expected_duration(self, bucket_key: str, test_id: str) -> Optional[float]:
+        """
+        The median duration in seconds of the last finished runs of the test, if it has any.
+        """
+        history = await self.list(
+            bucket_key, test_id, POLL_HISTORY_RUNS, ["started_at", "finished_at", "result"]
+        )
+        durations = [
+            run["finished_at"] - run["started_at"]
+            for run in history.result or []
+            if run.get("finished_at") and run.get("started_at") and _run_finished(run)
+        ]
+        return statistics.median(durations) if durations else None
+
+    async def _wait_for_run(
+        self, run: dict, expected: Optional[float], deadline: float, semaphore: asyncio.Semaphore
+    ) -> BaseResult:
+        """
+        Read the summary of the test run until it finishes, fails to be read or the deadline passes. A
+        run that is not found yet, as it was only just started, is polled again until the deadline.
+        """
+        endpoint = f"{RESULTS_ENDPOINT.format(run['bucket_key'], run['test_id'])}/{run['test_run_id']}"
+        started_at = time.monotonic()
+        late_polls = 0
+        while True:
+            elapsed = time.monotonic() - started_at
+            delay = min(poll_delay(expected, elapsed, late_polls), deadline - time.monotonic())
+            if expected is None or elapsed >= expected:
+                late_polls += 1
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with semaphore:
+                polled = await self._poll_run(endpoint)
+            if polled is None:
+                if time.monotonic() >= deadline:
+                    return BaseResult(error="The test run was not found before the deadline")
+                continue
+            if not polled.error and not polled.result:
+                return BaseResult(error="The test run has no result")
+            if polled.error or _run_finished(polled.result[0]) or time.monotonic() >= deadline:
+                return polled
+
+    async def _poll_run(self, endpoint: str) -> Optional[BaseResult]:
+        """
+        Read the summary of a running test run, or None while the API does not know the run yet.
+        """
+        try:
+            return await api_request(
+                self.token,
+                "GET",
+                endpoint,
+                result_formatter=format_result_summaries,
+                result_formatter_params={"cursor": 0},
+                use_cache=False,
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+
+    async def read(
+        self,
+        bucket_key: str,
+        test_id: str,
+        test_run_id: str,
+        fields: Optional[List[str]] = None,
+        summary: bool = False,
+        cursor: Optional[int] = None,
+        request_index: Optional[int] = None,
+    ) -> BaseResult:
+        endpoint = f"{RESULTS_ENDPOINT.format(bucket_key, test_id)}/{test_run_id}"
+        if request_index is not None:
+            return await self._read_request(endpoint, request_index, fields)
+        if summary or cursor is not None:
+            return await self._read_summary(endpoint, cursor or 0, fields)
         return await api_request(
             self.token,
             "GET",
-            f"{RESULTS_ENDPOINT.format(bucket_key, test_id)}/{test_run_id}",
+            endpoint,
             result_formatter=format_results,
+            result_formatter_params=fields_params(fields),
+        )
+
+    async def _read_summary(self, endpoint: str, cursor: int, fields: Optional[List[str]]) -> BaseResult:
+        summary_result = await api_request(
+            self.token,
+            "GET",
+            endpoint,
+            result_formatter=format_result_summaries,
+            result_formatter_params={"cursor": cursor, **(fields_params(fields) or {})},
         )
+        next_cursor = (summary_result.result or [{}])[0].get("next_cursor")
+        if next_cursor is not None:
+            summary_result.has_more = True
+            summary_result.append_hints(
+                [f"More requests failed. Read the summary again with cursor={next_cursor} to list them."]
+            )
+        if summary_result.result and summary_result.result[0].get("failed_requests"):
+            summary_result.append_hints(
+                ["Read the result with request_index of a failed request to get all its details."]
+            )
+        return summary_result
+
+    async def _read_request(
+        self, endpoint: str, request_index: int, fields: Optional[List[str]]
+    ) -> BaseResult:
+        request_result = await api_request(
+            self.token,
+            "GET",
+            endpoint,
+            result_formatter=format_result_requests,
+            result_formatter_params={"request_index": request_index, **(fields_params(fields) or {})},
+        )
+        if not request_result.error and not request_result.result:
+            return BaseResult(error=f"The test run has no request at request_index {request_index}")
+        return request_result
 
     async def read_bucket_level_test_run(
-        self, bucket_key: str, bucket_level_test_run_id: str
+        self, bucket_key: str, bucket_level_test_run_id: str, fields: Optional[List[str]] = None
     ) -> BaseResult:
         return await api_request(
             self.token,
             "GET",
             f"/v1{BUCKET_LEVEL_RESULTS_ENDPOINT.format(bucket_key)}/{bucket_level_test_run_id}",
             result_formatter=format_bucket_level_results,
+            result_formatter_params=fields_params(fields),
         )
 
-    async def list(self, bucket_key: str, test_id: str, limit: int) -> BaseResult:
+    async def list(
+        self, bucket_key: str, test_id: str, limit: int, fields: Optional[List[str]] = None
+    ) -> BaseResult:
         parameters = {"count": limit}
 
         return await api_request(
@@ -58,9 +362,286 @@ class ResultManager:
             "GET",
             f"{RESULTS_ENDPOINT.format(bucket_key, test_id)}",
             result_formatter=format_results,
+            result_formatter_params=fields_params(fields),
             params=parameters,
         )
 
+    async def latency_stats(
+        self, bucket_key: str, test_id: str, runs: int = 20, metric: str = "response_time_ms"
+    ) -> BaseResult:
+        """
+        The p50, p95, p99 and maximum of a request timing per test step over the latest finished runs of
+        the test, slowest p95 first. The runs are read concurrently, keeping only their request timings.
+        Requests are grouped by the uuid of their step, or by method and url when it is missing.
+        """
+        history = await self.list(
+            bucket_key, test_id, min(runs, RESULTS_PAGE_SIZE), ["test_run_id", "result"]
+        )
+        if history.error:
+            return history
+        run_ids = [run["test_run_id"] for run in history.result or [] if _run_finished(run)]
+        semaphore = asyncio.Semaphore(RESULTS_FETCH_CONCURRENCY)
+
+        async def read_timings(test_run_id: str) -> BaseResult:
+            async with semaphore:
+                return await api_request(
+                    self.token,
+                    "GET",
+                    f"{RESULTS_ENDPOINT.format(bucket_key, test_id)}/{test_run_id}",
+                    result_formatter=format_request_timings,
+                    result_formatter_params={"metric": metric},
+                )
+
+        reads = await asyncio.gather(*(read_timings(test_run_id) for test_run_id in run_ids))
+        steps: Dict[str, dict] = {}
+        samples: Dict[str, List[float]] = {}
+        for read in reads:
+            for timing in read.result or []:
+                step = timing["step_id"] or f"{timing['method']} {timing['url']}"
+                steps.setdefault(step, timing)
+                if timing["timing_ms"] is not None:
+                    samples.setdefault(step, []).append(timing["timing_ms"])
+
+        latencies = [
+            {
+                "step_id": steps[step]["step_id"],
+                "url": steps[step]["url"],
+                "method": steps[step]["method"],
+                "samples": len(samples[step]),
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+                "max_ms": max_ms,
+            }
+            for step, (p50, p95, p99, max_ms) in step_percentiles(samples).items()
+        ]
+        latencies.sort(key=lambda latency: latency["p95_ms"], reverse=True)
+        stats = BaseResult(result=format_step_latencies(latencies), total=len(latencies))
+        stats.append_info([f"Percentiles of {metric} over {len(run_ids)} finished runs"])
+        failed = [read.error for read in reads if read.error]
+        if failed:
+            stats.append_warnings([f"{len(failed)} runs could not be read and were left out: {failed[0]}"])
+        return stats
+
+    async def flaky_tests(self, bucket_key: str, runs: int = 20, limit: int = 10) -> BaseResult:
+        """
+        Rank the tests of the bucket by the flakiness of their latest finished runs, and point at the
+        assertion of each flaky test that flips most often. The results of all tests are listed
+        concurrently; only the failed runs of the flaky tests are read in full, as every assertion of a
+        passed run passed.
+        """
+        tests = await TestManager(self.token, self.ctx).list_all(bucket_key, fields=["test_id", "name"])
+        if tests.error:
+            return tests
+        semaphore = asyncio.Semaphore(RESULTS_FETCH_CONCURRENCY)
+
+        async def list_runs(test: dict) -> BaseResult:
+            async with semaphore:
+                return await self.list(
+                    bucket_key,
+                    test["test_id"],
+                    min(runs, RESULTS_PAGE_SIZE),
+                    ["test_run_id", "result", "region", "agent", "started_at"],
+                )
+
+        listings = await asyncio.gather(*(list_runs(test) for test in tests.result or []))
+        scored, warnings = [], []
+        for test, listing in zip(tests.result or [], listings):
+            if listing.error:
+                warnings.append(f"Test {test['test_id']}: {listing.error}")
+                continue
+            flaky = _score_flakiness(test, listing.result or [])
+            if flaky:
+                scored.append(flaky)
+        scored.sort(key=lambda entry: entry[0]["score"], reverse=True)
+        scored = scored[:limit]
+
+        await asyncio.gather(
+            *(
+                self._find_flaky_assertion(bucket_key, flaky, finished, semaphore, warnings)
+                for flaky, finished in scored
+            )
+        )
+        ranked = BaseResult(result=format_flaky_tests([flaky for flaky, _ in scored]), total=len(scored))
+        ranked.append_info(
+            [f"Scored the latest {min(runs, RESULTS_PAGE_SIZE)} runs of {len(tests.result or [])} tests"]
+        )
+        if warnings:
+            ranked.append_warnings(warnings)
+        return ranked
+
+    async def _find_flaky_assertion(
+        self,
+        bucket_key: str,
+        flaky: dict,
+        finished: List[dict],
+        semaphore: asyncio.Semaphore,
+        warnings: List[str],
+    ) -> None:
+        """
+        Set the assertion of a flaky test that flips most often across its finished runs, if any flips.
+        """
+        outcomes = await asyncio.gather(
+            *(self._read_assertions(bucket_key, flaky["test_id"], run, semaphore) for run in finished),
+            return_exceptions=True,
+        )
+        errors = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+        if errors:
+            warnings.append(f"Test {flaky['test_id']}: {len(errors)} runs could not be read: {errors[0]}")
+        assertions = assertion_flips(
+            [outcome for outcome in outcomes if not isinstance(outcome, Exception)]
+        )
+        if assertions and assertions[0]["flips"]:
+            flaky["flaky_assertion"] = assertions[0]
+
+    async def _read_assertions(
+        self, bucket_key: str, test_id: str, run: dict, semaphore: asyncio.Semaphore
+    ) -> Optional[List[dict]]:
+        """
+        The assertion outcomes of a failed run, or None for a passed run, whose assertions all passed.
+        """
+        if run["result"] == "pass":
+            return None
+        async with semaphore:
+            read = await api_request(
+                self.token,
+                "GET",
+                f"{RESULTS_ENDPOINT.format(bucket_key, test_id)}/{run['test_run_id']}",
+                result_formatter=format_assertion_outcomes,
+            )
+        if read.error:
+            raise RuntimeError(read.error)
+        return read.result or []
+
+    async def query(
+        self,
+        bucket_key: str,
+        test_id: str,
+        days: Optional[float] = None,
+        result: Optional[str] = None,
+        region: Optional[str] = None,
+        environment_id: Optional[str] = None,
+        limit: int = 20,
+        sync: bool = True,
+    ) -> BaseResult:
+        """
+        Answer a history question about the test from the local results store: the pass rate and
+        durations of its finished runs matching the filters, with the latest of them. The runs started
+        since the last sync are fetched first, unless sync is false.
+        """
+        synced = await self.sync_history(bucket_key, test_id) if sync else None
+        since = time.time() - days * 86400 if days else None
+        stats, runs = await asyncio.to_thread(
+            get_results_store().query,
+            bucket_key,
+            test_id,
+            since,
+            limit,
+            result=result,
+            region=region,
+            environment_id=environment_id,
+        )
+        history = BaseResult(
+            result=format_result_histories(
+                [
+                    {
+                        **stats,
+                        "bucket_key": bucket_key,
+                        "test_id": test_id,
+                        "test_name": runs[0]["test_name"] if runs else None,
+                        "pass_rate": stats["passed"] / stats["runs"] if stats["runs"] else None,
+                        "test_runs": runs,
+                    }
+                ]
+            ),
+            total=1,
+            has_more=stats["runs"] > len(runs),
+        )
+        if synced is not None and synced.error:
+            history.append_warnings(
+                [f"Sync of the latest runs failed, answering from the stored runs: {synced.error}"]
+            )
+        elif synced is not None:
+            history.append_info(synced.info or [])
+        return history
+
+    async def sync_history(self, bucket_key: str, test_id: str) -> BaseResult:
+        """
+        Fetch the finished runs of the test started since its last sync into the results store, newest
+        page first. A test never synced is fetched back RESULTS_SYNC_DAYS. Runs still running are not
+        stored, the next sync starts from the oldest of them. The sync cursor only moves when every page
+        was fetched, so a failed sync leaves no gap.
+        """
+        store = get_results_store()
+        since = await asyncio.to_thread(store.synced_until, bucket_key, test_id)
+        first_sync = since is None
+        if first_sync:
+            since = time.time() - RESULTS_SYNC_DAYS * 86400
+
+        runs, before, error = [], None, None
+        while True:
+            params = {"count": RESULTS_PAGE_SIZE, "since": since}
+            if before is not None:
+                params["before"] = before
+            page = await api_request(
+                self.token,
+                "GET",
+                RESULTS_ENDPOINT.format(bucket_key, test_id),
+                result_formatter=format_results,
+                result_formatter_params=fields_params(RUN_COLUMNS),
+                use_cache=False,
+                params=params,
+            )
+            if page.error:
+                error = page.error
+                break
+            runs.extend(page.result or [])
+            started = [run["started_at"] for run in page.result or [] if run.get("started_at")]
+            if len(page.result or []) < RESULTS_PAGE_SIZE or not started or min(started) == before:
+                break
+            before = min(started)
+
+        finished = [run for run in runs if _run_finished(run)]
+        running = [run["started_at"] for run in runs if not _run_finished(run) and run.get("started_at")]
+        if error:
+            synced_until = None if first_sync else since
+        elif running:
+            synced_until = min(running)
+        else:
+            synced_until = max([since, *(run["started_at"] for run in finished)])
+        stored = await asyncio.to_thread(store.add_runs, bucket_key, test_id, finished, synced_until)
+
+        synced = BaseResult(result=[], total=stored, error=error)
+        synced.append_info([f"Synced {stored} finished runs of test {test_id} from the API"])
+        return synced
+
+
+def poll_delay(expected: Optional[float], elapsed: float, late_polls: int) -> float:
+    """
+    Seconds to wait before the next read of a running test run. Until the run is expected to finish
+    it is read when it should be done, at least every POLL_INTERVAL_MAX; after that, or without an
+    expected duration, the interval doubles from POLL_INTERVAL_MIN with every late poll.
+    """
+    if expected is not None and elapsed < expected:
+        return min(max(expected - elapsed, POLL_INTERVAL_MIN), POLL_INTERVAL_MAX)
+    return min(POLL_INTERVAL_MIN * 2**late_polls, POLL_INTERVAL_MAX)
+
+
+def _run_finished(run: dict) -> bool:
+    return run.get("result") not in RUNNING_RESULTS
+
+
+def _score_flakiness(test: dict, runs: List[dict]) -> Optional[Tuple[dict, List[dict]]]:
+    """
+    The flakiness of a test over its finished runs, oldest first, with those runs. None when it is not
+    flaky.
+    """
+    finished = sorted((run for run in runs if _run_finished(run)), key=lambda run: run["started_at"])
+    score = flakiness(finished, FLAKY_RETRY_WINDOW)
+    if score["score"] <= 0:
+        return None
+    return {**score, "test_id": test["test_id"], "test_name": test.get("name")}, finished
+
 
 def register(mcp, token: Optional[BzmApimToken]):
     @mcp.tool(
@@ -69,6 +650,9 @@ def register(mcp, token: Optional[BzmApimToken]):
         Operations on the results(executions). Results could be an individual test result or a
         bucket-level test result. A bucket-level test run is like a test-suite run which executes all the
         tests present in the bucket via a single API call.
+        Read and list actions also accept an optional 'fields' arg (list[str]): the fields to return,
+        with dotted paths for nested fields, e.g. ["test_run_id", "result", "requests.url",
+        "requests.result"]. All fields are returned when omitted.
         Actions:
         - start: Start a test run. This will trigger a new test run for the specified test via API.
             args(dict): Dictionary with the following required parameters:
@@ -79,17 +663,78 @@ def register(mcp, token: Optional[BzmApimToken]):
             args(dict): Dictionary with the following required parameters:
                 trigger_url(str): The required parameter. The trigger URL of the bucket, present in bucket
                  details, to start the bucket-level run.
+        - start_and_wait: Start a test run and wait for it to finish, instead of reading its result
+         repeatedly. Returns the summary of each run, like read with summary. Runs still running at the
+         deadline are returned as they are.
+            args(dict): Dictionary with the following parameters:
+                trigger_url(str): The required parameter. The trigger URL of the test, present in test
+                 details, to start the run.
+                timeout(float): Optional parameter. Seconds to wait for the runs to finish. Default is 300,
+                 maximum is 1800.
+                bucket_key(str): Optional parameter. The id of the bucket where the test resides, in case
+                 the started runs do not report it.
+        - start_bucket_level_run_and_wait: Start a bucket-level test run and wait for all its test runs to
+         finish. Returns one summary of the bucket-level run with the pass, fail and running counts and the
+         result and duration of each test run.
+            args(dict): Dictionary with the following parameters:
+                trigger_url(str): The required parameter. The trigger URL of the bucket, present in bucket
+                 details, to start the bucket-level run.
+                timeout(float): Optional parameter. Seconds to wait for the runs to finish. Default is 300,
+                 maximum is 1800.
+                bucket_key(str): Optional parameter. The id of the bucket, in case the started runs do not
+                 report it.
         - read: Read an individual test run's result. Get the detailed information of a result.
             args(dict): Dictionary with the following required parameters:
                 bucket_key(str): The required parameter. The id of the bucket where the test resides.
                 test_id(str): The required parameter. The id of the test whose result is to be read.
                 test_run_id(str): The required parameter. The id of the test run whose result is to be read.
+                summary(bool): Optional parameter. Return only the run totals with the failed requests,
+                 their failed assertions and scripts, and the failed subtests. Recommended for tests with
+                 many steps. Default is false.
+                cursor(int): Optional parameter. The next_cursor of a previous summary, to list the
+                 next failed requests. Implies summary.
+                request_index(int): Optional parameter. Return only the full result of the request at
+                 this position in the run, e.g. the request_index of a failed request in the summary.
         - read_bucket_level_run: Read a bucket-level test run's result. Get the detailed information of a
          result.
             args(dict): Dictionary with the following required parameters:
                 bucket_key(str): The required parameter. The id of the bucket where the test resides.
                 bucket_level_test_run_id(str): The required parameter. The id of the bucket-level run whose
                  result is to be read.
+        - query: Answer history questions about a test, like its pass rate in the last 7 days or its runs
+         in a region that failed, from a local store of its finished runs instead of listing results.
+         Returns the number of matching runs, how many passed and failed, the pass rate, the average and
+         maximum duration, and the latest matching runs. Runs started since the last query are synced
+         from the API first.
+            args(dict): Dictionary with the following parameters:
+                bucket_key(str): The required parameter. The id of the bucket where the test resides.
+                test_id(str): The required parameter. The id of the test whose history is queried.
+                days(float): Optional parameter. Only runs started in the last days, e.g. 7.
+                result(str): Optional parameter. Only runs with this result, 'pass' or 'fail'.
+                region(str): Optional parameter. Only runs executed in this region, e.g. 'us1'.
+                environment_id(str): Optional parameter. Only runs executed with this environment.
+                limit(int): Optional parameter. Number of latest matching runs to return. Default is 20.
+                sync(bool): Optional parameter. Sync the latest runs from the API first. Default is true.
+        - latency_stats: Latency percentiles of each step of a test over its latest finished runs, to find
+         its slow or regressing steps. Returns per step the number of samples and the p50, p95, p99 and
+         maximum in milliseconds, slowest p95 first.
+            args(dict): Dictionary with the following parameters:
+                bucket_key(str): The required parameter. The id of the bucket where the test resides.
+                test_id(str): The required parameter. The id of the test whose runs are measured.
+                runs(int): Optional parameter. Number of latest runs to measure. Default is 20, maximum
+                 is 50.
+                metric(str): Optional parameter. The request timing to measure, e.g. 'response_time_ms',
+                 'dial_ms', 'dns_lookup_ms' or 'receive_response_ms'. Default is 'response_time_ms'.
+        - flaky_tests: Rank the tests of a bucket by flakiness, to tell tests that fail without a real
+         regression from real failures. A test is flaky when its result flips between pass and fail, its
+         failures pass when run again shortly after, or it only fails in one region. Returns the flaky
+         tests, most flaky first, with their score between 0 and 1, these signals, and the assertion
+         (step, source, property and comparison) that flips most often.
+            args(dict): Dictionary with the following parameters:
+                bucket_key(str): The required parameter. The id of the bucket whose tests are analyzed.
+                runs(int): Optional parameter. Number of latest runs of each test to analyze. Default is 20,
+                 maximum is 50.
+                limit(int): Optional parameter. Number of flaky tests to return. Default is 10.
         - list: List all the test runs. This will list all the test runs for the specified test.
             args(dict): Dictionary with the following required parameters:
                 bucket_key(str): The required parameter. The id of the bucket where the test resides.
@@ -103,17 +748,53 @@ def register(mcp, token: Optional[BzmApimToken]):
             match action:
                 case "start" | "start_bucket_level_run":
                     return await result_manager.start(args["trigger_url"])
+                case "start_and_wait":
+                    return await result_manager.start_and_wait(
+                        args["trigger_url"], args.get("timeout"), args.get("bucket_key")
+                    )
+                case "start_bucket_level_run_and_wait":
+                    return await result_manager.start_bucket_level_run_and_wait(
+                        args["trigger_url"], args.get("timeout"), args.get("bucket_key")
+                    )
                 case "read":
                     return await result_manager.read(
-                        args["bucket_key"], args["test_id"], args["test_run_id"]
+                        args["bucket_key"],
+                        args["test_id"],
+                        args["test_run_id"],
+                        args.get("fields"),
+                        args.get("summary", False),
+                        args.get("cursor"),
+                        args.get("request_index"),
+                    )
+                case "query":
+                    return await result_manager.query(
+                        args["bucket_key"],
+                        args["test_id"],
+                        args.get("days"),
+                        args.get("result"),
+                        args.get("region"),
+                        args.get("environment_id"),
+                        args.get("limit", 20),
+                        args.get("sync", True),
+                    )
+                case "latency_stats":
+                    return await result_manager.latency_stats(
+                        args["bucket_key"],
+                        args["test_id"],
+                        args.get("runs", 20),
+                        args.get("metric", "response_time_ms"),
+                    )
+                case "flaky_tests":
+                    return await result_manager.flaky_tests(
+                        args["bucket_key"], args.get("runs", 20), args.get("limit", 10)
                     )
                 case "read_bucket_level_run":
                     return await result_manager.read_bucket_level_test_run(
-                        args["bucket_key"], args["bucket_level_test_run_id"]
+                        args["bucket_key"], args["bucket_level_test_run_id"], args.get("fields")
                     )
                 case "list":
                     return await result_manager.list(
-                        args["bucket_key"], args["test_id"], args.get("limit", 10)
+                        args["bucket_key"], args["test_id"], args.get("limit", 10), args.get("fields")
                     )
                 case _:
                     return BaseResult(error=f"Action {action} not found in results manager tool")
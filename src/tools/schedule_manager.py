@@ -1,6 +1,6 @@
 import logging
 import traceback
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import httpx
 from mcp.server.fastmcp import Context
@@ -8,6 +8,7 @@ from mcp.server.fastmcp import Context
 from src.common.api_client import api_request
 from src.config.defaults import SCHEDULES_ENDPOINT, TOOLS_PREFIX
 from src.config.token import BzmApimToken
+from src.formatters.base import fields_params
 from src.formatters.schedule import format_schedules
 from src.models import BaseResult
 from src.models.schedule import CreateSchedule
@@ -22,12 +23,15 @@ class ScheduleManager:
         self.token = token
         self.ctx = ctx
 
-    async def read(self, bucket_key: str, test_id: str, schedule_id: str) -> BaseResult:
+    async def read(
+        self, bucket_key: str, test_id: str, schedule_id: str, fields: Optional[List[str]] = None
+    ) -> BaseResult:
         schedule_result = await api_request(
             self.token,
             "GET",
             f"{SCHEDULES_ENDPOINT.format(bucket_key, test_id)}/{schedule_id}",
             result_formatter=format_schedules,
+            result_formatter_params=fields_params(fields),
         )
         return schedule_result
 
@@ -46,12 +50,13 @@ class ScheduleManager:
             json=body,
         )
 
-    async def list(self, bucket_key: str, test_id: str) -> BaseResult:
+    async def list(self, bucket_key: str, test_id: str, fields: Optional[List[str]] = None) -> BaseResult:
         return await api_request(
             self.token,
             "GET",
             f"{SCHEDULES_ENDPOINT.format(bucket_key, test_id)}",
             result_formatter=format_schedules,
+            result_formatter_params=fields_params(fields),
         )
 
 
@@ -60,6 +65,9 @@ def register(mcp, token: Optional[BzmApimToken]):
         name=f"{TOOLS_PREFIX}_schedules",
         description="""
         Operations on test schedules. Schedules allow to run tests periodically at defined intervals.
+        Read and list actions also accept an optional 'fields' arg (list[str]): the fields to return,
+        with dotted paths for nested fields, e.g. ["schedule_id", "interval"]. All fields are
+        returned when omitted.
         Actions:
         - read: Read a schedule. Get the detailed information of a schedule.
             args(dict): Dictionary with the following required parameters:
@@ -93,14 +101,16 @@ def register(mcp, token: Optional[BzmApimToken]):
             match action:
                 case "read":
                     return await schedule_manager.read(
-                        args["bucket_key"], args["test_id"], args["schedule_id"]
+                        args["bucket_key"], args["test_id"], args["schedule_id"], args.get("fields")
                     )
                 case "create":
                     return await schedule_manager.create(
                         args["bucket_key"], args["test_id"], args["environment_id"], args["interval"]
                     )
                 case "list":
-                    return await schedule_manager.list(args["bucket_key"], args["test_id"])
+                    return await schedule_manager.list(
+                        args["bucket_key"], args["test_id"], args.get("fields")
+                    )
                 case _:
                     return BaseResult(error=f"Action {action} not found in schedules manager tool")
         except httpx.HTTPStatusError:
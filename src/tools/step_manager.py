@@ -1,16 +1,18 @@
+import copy
 import json
 import logging
 import traceback
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import defusedxml.ElementTree as DET
 import httpx
 import nh3
 from mcp.server.fastmcp import Context
 
-from src.common.api_client import api_request
-from src.config.defaults import STEPS_ENDPOINT, TOOLS_PREFIX
+from src.common.api_client import api_request, status_error_message
+from src.config.defaults import STEPS_BATCH_MAX, STEPS_ENDPOINT, TOOLS_PREFIX
 from src.config.token import BzmApimToken
+from src.formatters.base import fields_params
 from src.formatters.step import format_steps
 from src.models import BaseResult
 
@@ -25,21 +27,33 @@ class StepManager:
         self.ctx = ctx
 
     async def read(
-        self, bucket_key: str, test_id: str, step_id: str, result_formatter=format_steps
+        self,
+        bucket_key: str,
+        test_id: str,
+        step_id: str,
+        result_formatter=format_steps,
+        fields: Optional[List[str]] = None,
     ) -> Union[BaseResult, dict]:
         step_result = await api_request(
             self.token,
             "GET",
             f"{STEPS_ENDPOINT.format(bucket_key, test_id)}/{step_id}",
             result_formatter=result_formatter,
+            result_formatter_params=fields_params(fields),
+            # The raw step is read to be modified and written back, so it must not be stale
+            use_cache=result_formatter is not None,
         )
         if result_formatter:
             return step_result
         return step_result.result[0] if step_result else {}
 
-    async def list(self, bucket_key: str, test_id: str) -> BaseResult:
+    async def list(self, bucket_key: str, test_id: str, fields: Optional[List[str]] = None) -> BaseResult:
         steps_result = await api_request(
-            self.token, "GET", STEPS_ENDPOINT.format(bucket_key, test_id), result_formatter=format_steps
+            self.token,
+            "GET",
+            STEPS_ENDPOINT.format(bucket_key, test_id),
+            result_formatter=format_steps,
+            result_formatter_params=fields_params(fields),
         )
         return steps_result
 
@@ -70,55 +84,9 @@ class StepManager:
     async def add_body_to_step(
         self, bucket_key: str, test_id: str, step_id: str, body_type: str, body_content: str
     ) -> BaseResult:
-        request_step_body = {"body": ""}
-        request_headers = {}
-
-        match body_type:
-            case "json":
-                try:
-                    parsed_json = json.loads(body_content)
-                    safe_json = json.dumps(parsed_json)
-                    request_step_body["body"] = safe_json
-                except json.JSONDecodeError as e:
-                    return BaseResult(error=f"Invalid JSON content provided for body_content: {str(e)}")
-                request_headers["Content-Type"] = "application/json"
-
-            case "xml":
-                try:
-                    parsed_xml = DET.fromstring(
-                        body_content
-                    )  # Validate XML content using defusedxml (prevents XXE)
-                    safe_xml = DET.tostring(parsed_xml, encoding="unicode")
-                    request_step_body["body"] = safe_xml
-                except DET.ParseError as e:
-                    return BaseResult(error=f"Invalid XML content provided for body_content: {str(e)}")
-                except Exception as e:
-                    return BaseResult(error=f"Error processing XML content: {str(e)}")
-                request_headers["Content-Type"] = "application/xml"
-
-            case "html":
-                try:
-                    # Sanitize HTML content (prevents XSS)
-                    safe_html = nh3.clean(body_content)
-                    request_step_body["body"] = safe_html
-                except Exception as e:
-                    return BaseResult(error=f"Error processing HTML content: {str(e)}")
-                request_headers["Content-Type"] = "text/html"
-
-            case "text":
-                # Remove any null bytes and control characters except newlines/tabs
-                try:
-                    safe_text = "".join(
-                        char for char in body_content if char.isprintable() or char in "\n\r\t"
-                    )
-                    request_step_body["body"] = safe_text
-                except Exception as e:
-                    return BaseResult(error=f"Error processing text content: {str(e)}")
-                request_headers["Content-Type"] = "text/plain"
-            case _:
-                BaseResult(
-                    error=f"Unsupported body_type {body_type}. Supported types are: json, xml, html, text"
-                )
+        request_step_body, error = prepare_body(body_type, body_content)
+        if error:
+            return BaseResult(error=error)
 
         request_result = await self.read(bucket_key, test_id, step_id, result_formatter=None)
         if not request_result or request_result.get("step_type") != "request":
@@ -127,7 +95,7 @@ class StepManager:
         request_result["body"] = request_step_body["body"]
         if "headers" not in request_result or not isinstance(request_result["headers"], dict):
             request_result["headers"] = {}
-        request_result["headers"].update(request_headers)
+        request_result["headers"].update(request_step_body["headers"])
 
         return await api_request(
             self.token,
@@ -152,12 +120,9 @@ class StepManager:
             return BaseResult(error=f"Step {step_id} is not a request step and cannot have a body added.")
         if "assertions" not in request_result or not isinstance(request_result["assertions"], list):
             request_result["assertions"] = []
-        new_assertion = {"source": assertion_source, "comparison": assertion_comparison}
-        if assertion_property is not None:
-            new_assertion["property"] = assertion_property
-        if assertion_value is not None:
-            new_assertion["value"] = assertion_value
-        request_result["assertions"].append(new_assertion)
+        request_result["assertions"].append(
+            build_assertion(assertion_source, assertion_comparison, assertion_property, assertion_value)
+        )
 
         return await api_request(
             self.token,
@@ -167,12 +132,291 @@ class StepManager:
             json=request_result,
         )
 
+    async def patch_step(
+        self, bucket_key: str, test_id: str, step_id: str, mutations: List[dict]
+    ) -> BaseResult:
+        """
+        Apply many changes to a request step with a single read and write: the step is read once, every
+        mutation is applied to it locally, and it is written back once. Nothing is written when a
+        mutation is invalid, or when the changes leave the step as it was stored, e.g. when its
+        assertions were already added.
+        """
+        stored = await self.read(bucket_key, test_id, step_id, result_formatter=None)
+        if not stored or stored.get("step_type") != "request":
+            return BaseResult(error=f"Step {step_id} is not a request step and cannot be patched.")
+
+        step = copy.deepcopy(stored)
+        for index, mutation in enumerate(mutations):
+            error = apply_mutation(step, mutation)
+            if error:
+                return BaseResult(error=f"Mutation {index} is invalid, the step was not changed: {error}")
+
+        if _canonical(step) == _canonical(stored):
+            unchanged = BaseResult(result=format_steps([stored]), total=1)
+            unchanged.append_info([f"Step {step_id} already has these changes, it was not written"])
+            return unchanged
+        return await api_request(
+            self.token,
+            "PUT",
+            f"{STEPS_ENDPOINT.format(bucket_key, test_id)}/{step_id}",
+            result_formatter=format_steps,
+            json=step,
+        )
+
+    async def add_steps(self, bucket_key: str, test_id: str, steps: List[dict]) -> BaseResult:
+        """
+        Add request and pause steps to the end of a test in the given order, each with its body, headers,
+        assertions, variables and scripts created in a single request. Every spec is validated before
+        anything is created, and invalid specs are reported without being created. The steps API appends
+        each created step to the test, so the steps are created one after the other to keep their order;
+        a step that fails to be created is reported and the next ones are still created.
+        """
+        if len(steps) > STEPS_BATCH_MAX:
+            return BaseResult(
+                error=f"At most {STEPS_BATCH_MAX} steps can be added at once, got {len(steps)}"
+            )
+
+        bodies, failures = [], []
+        for index, spec in enumerate(steps):
+            step_body, error = build_step(spec)
+            if error:
+                failures.append(f"Step {index} was not created: {error}")
+            bodies.append(step_body)
+
+        created = []
+        for index, step_body in enumerate(bodies):
+            if step_body is None:
+                continue
+            try:
+                step_result = await api_request(
+                    self.token,
+                    "POST",
+                    STEPS_ENDPOINT.format(bucket_key, test_id),
+                    result_formatter=format_steps,
+                    json=step_body,
+                )
+            except httpx.HTTPStatusError as e:
+                failures.append(f"Step {index} was not created: {status_error_message(e)}")
+                continue
+            if step_result.error or not step_result.result:
+                failures.append(f"Step {index} was not created: {step_result.error or 'empty response'}")
+                continue
+            # The new step is the last one of the test, whether the API returns it alone or all steps
+            created.append({**step_result.result[-1], "index": index})
+
+        added = BaseResult(
+            result=created,
+            total=len(created),
+            error=None if created or not steps else "No step was created",
+        )
+        added.append_info([f"Created {len(created)} of {len(steps)} steps, in the given order"])
+        if failures:
+            added.append_warnings(failures)
+        return added
+
+
+def build_step(spec: dict) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    The request body creating the step described by a spec of add_steps, or the reason it is invalid.
+    """
+    step_type = spec.get("step_type", "request")
+    if step_type == "pause":
+        return {"step_type": "pause", "duration": spec.get("duration") or 5}, None
+    if step_type != "request":
+        return None, f"Unsupported step_type {step_type}. Supported types are: request, pause"
+
+    step_body = {
+        "step_type": "request",
+        "method": spec.get("method") or "GET",
+        "url": spec.get("url") or "https://yourapihere.com",
+        "headers": dict(spec.get("headers") or {}),
+    }
+    if spec.get("note"):
+        step_body["note"] = spec["note"]
+    for add_part in _STEP_PARTS:
+        error = add_part(step_body, spec)
+        if error:
+            return None, error
+    return step_body, None
+
+
+def _step_body(step_body: dict, spec: dict) -> Optional[str]:
+    if spec.get("body_content") is None:
+        return None
+    request_body, error = prepare_body(spec.get("body_type") or "json", spec["body_content"])
+    if error:
+        return error
+    step_body["body"] = request_body["body"]
+    step_body["headers"].update(request_body["headers"])
+    return None
+
+
+def _step_assertions(step_body: dict, spec: dict) -> Optional[str]:
+    assertions = []
+    for assertion in spec.get("assertions") or []:
+        if not assertion.get("source") or not assertion.get("comparison"):
+            return "Every assertion needs a source and a comparison"
+        assertions.append(
+            build_assertion(
+                assertion["source"],
+                assertion["comparison"],
+                assertion.get("property"),
+                assertion.get("value"),
+            )
+        )
+    if assertions:
+        step_body["assertions"] = assertions
+    return None
+
+
+def _step_extractions(step_body: dict, spec: dict) -> Optional[str]:
+    for field in ("variables", "scripts", "before_scripts"):
+        if spec.get(field):
+            step_body[field] = list(spec[field])
+    return None
+
+
+# Parts of a request step spec of add_steps, each copied to the step body or returning why it is invalid
+_STEP_PARTS = (_step_body, _step_assertions, _step_extractions)
+
+
+def apply_mutation(step: dict, mutation: dict) -> Optional[str]:
+    """
+    Apply a mutation of patch_step to the raw step in place. Returns the reason it is invalid, if so.
+    Additions already present on the step are skipped, so patching again changes nothing.
+    """
+    # A mutation that is not a dict has no op, and is rejected like an unknown op
+    match mutation.get("op") if isinstance(mutation, dict) else None:
+        case "set_body":
+            body_type, body_content = mutation.get("body_type"), mutation.get("body_content") or ""
+            request_body, error = prepare_body(body_type, body_content)
+            if error:
+                return error
+            step["body"] = request_body["body"]
+            _headers(step).update(request_body["headers"])
+        case "set_headers":
+            headers = _headers(step)
+            for name, value in (mutation.get("headers") or {}).items():
+                if value is None:
+                    headers.pop(name, None)
+                else:
+                    headers[name] = value
+        case "add_assertion":
+            if not mutation.get("source") or not mutation.get("comparison"):
+                return "An assertion needs a source and a comparison"
+            assertion = build_assertion(
+                mutation["source"], mutation["comparison"], mutation.get("property"), mutation.get("value")
+            )
+            _add_once(step, "assertions", assertion)
+        case "add_variable":
+            if not mutation.get("name") or not mutation.get("source"):
+                return "A variable needs a name and a source"
+            variable = {"name": mutation["name"], "source": mutation["source"]}
+            if mutation.get("property") is not None:
+                variable["property"] = mutation["property"]
+            _add_once(step, "variables", variable)
+        case "add_script":
+            if not mutation.get("script"):
+                return "A script needs its source in script"
+            _add_once(step, "before_scripts" if mutation.get("before") else "scripts", mutation["script"])
+        case op:
+            return (
+                f"Unsupported op {op}. Supported ops are: set_body, set_headers, add_assertion,"
+                " add_variable, add_script"
+            )
+    return None
+
+
+def _headers(step: dict) -> dict:
+    if not isinstance(step.get("headers"), dict):
+        step["headers"] = {}
+    return step["headers"]
+
+
+def _add_once(step: dict, field: str, item: Any) -> None:
+    if not isinstance(step.get(field), list):
+        step[field] = []
+    if item not in step[field]:
+        step[field].append(item)
+
+
+def _canonical(step: dict) -> bytes:
+    return json.dumps(step, sort_keys=True, separators=(",", ":")).encode()
+
+
+def build_assertion(
+    source: str, comparison: str, property: Optional[str] = None, value: Optional[str] = None
+) -> dict:
+    assertion = {"source": source, "comparison": comparison}
+    if property is not None:
+        assertion["property"] = property
+    if value is not None:
+        assertion["value"] = value
+    return assertion
+
+
+def prepare_body(body_type: str, body_content: str) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Validate and sanitize a request body of the given type. Returns the body with the Content-Type
+    header it needs, or the reason it is invalid.
+    """
+    request_step_body = {"body": "", "headers": {}}
+    request_headers = request_step_body["headers"]
+
+    match body_type:
+        case "json":
+            try:
+                parsed_json = json.loads(body_content)
+                safe_json = json.dumps(parsed_json)
+                request_step_body["body"] = safe_json
+            except json.JSONDecodeError as e:
+                return None, f"Invalid JSON content provided for body_content: {str(e)}"
+            request_headers["Content-Type"] = "application/json"
+
+        case "xml":
+            try:
+                parsed_xml = DET.fromstring(
+                    body_content
+                )  # Validate XML content using defusedxml (prevents XXE)
+                safe_xml = DET.tostring(parsed_xml, encoding="unicode")
+                request_step_body["body"] = safe_xml
+            except DET.ParseError as e:
+                return None, f"Invalid XML content provided for body_content: {str(e)}"
+            except Exception as e:
+                return None, f"Error processing XML content: {str(e)}"
+            request_headers["Content-Type"] = "application/xml"
+
+        case "html":
+            try:
+                # Sanitize HTML content (prevents XSS)
+                safe_html = nh3.clean(body_content)
+                request_step_body["body"] = safe_html
+            except Exception as e:
+                return None, f"Error processing HTML content: {str(e)}"
+            request_headers["Content-Type"] = "text/html"
+
+        case "text":
+            # Remove any null bytes and control characters except newlines/tabs
+            try:
+                safe_text = "".join(char for char in body_content if char.isprintable() or char in "\n\r\t")
+                request_step_body["body"] = safe_text
+            except Exception as e:
+                return None, f"Error processing text content: {str(e)}"
+            request_headers["Content-Type"] = "text/plain"
+        case _:
+            return None, f"Unsupported body_type {body_type}. Supported types are: json, xml, html, text"
+
+    return request_step_body, None
+
 
 def register(mcp, token: Optional[BzmApimToken]):
     @mcp.tool(
         name=f"{TOOLS_PREFIX}_steps",
         description="""
         Operations on test steps. Test steps are always associated with a test.
+        Read and list actions also accept an optional 'fields' arg (list[str]): the fields to return,
+        with dotted paths for nested fields, e.g. ["step_id", "step_type", "method", "url"]. All fields are
+        returned when omitted.
         Actions:
         - read: Read a test step. Get the detailed information of a step.
             args(dict): Dictionary with the following required parameters:
@@ -197,6 +441,41 @@ def register(mcp, token: Optional[BzmApimToken]):
                 method (str): The optional parameter. HTTP method for the request step.
                 url (str): The optional parameter. URL for the request step. If not provided, use the
                  default value: "https://yourapihere.com".
+        - patch_step: Make many changes to an existing request step in one call, e.g. set its body and add
+           several assertions, instead of calling add_body_to_step and add_assertion_to_step for each. The
+           step is read and written once, and not written at all when it already has the changes.
+            args(dict): Dictionary with the following required parameters:
+                bucket_key(str): The required parameter. The id of the bucket where the test resides.
+                test_id (str): The required parameter. The id of the test where the step resides.
+                step_id (str): The required parameter. The id of the request step to change.
+                mutations (list[dict]): The required parameter. The changes, applied in order, each with an
+                 'op':
+                    - set_body: Set the body, with body_type and body_content like add_body_to_step.
+                    - set_headers: Set headers, with headers (dict[str, list[str]]). A null value removes
+                       the header.
+                    - add_assertion: Add an assertion, with source, comparison, property and value like
+                       add_assertion_to_step.
+                    - add_variable: Add a variable to extract, with name, source and property.
+                    - add_script: Add a script, with script (str) and before (bool) to run it before the
+                       request instead of after the response.
+        - add_steps: Add many request and pause steps to a test in one call, e.g. to build a whole test from
+           a spec, instead of adding them and their bodies and assertions one by one. The steps are added
+           to the end of the test in the given order. Returns the created steps with the index of their
+           spec; specs that are invalid or fail to be created are reported as warnings.
+            args(dict): Dictionary with the following required parameters:
+                bucket_key(str): The required parameter. The id of the bucket where the test resides.
+                test_id (str): The required parameter. The id of the test to which the steps will be added.
+                steps (list[dict]): The required parameter. Up to 100 step specs, each with:
+                    - step_type (str): 'request' or 'pause'. Default is 'request'.
+                    - duration (int): Pause duration in seconds, for pause steps.
+                    - method (str), url (str), note (str): The request, like add_request_step.
+                    - body_type (str), body_content (str): The body, like add_body_to_step.
+                    - headers (dict[str, list[str]]): Request headers.
+                    - assertions (list[dict]): Assertions with source, comparison, property and value, like
+                       add_assertion_to_step.
+                    - variables (list[dict]): Variables to extract, with name, source and property.
+                    - scripts (list[str]), before_scripts (list[str]): Scripts after the response and before
+                       the request.
         - add_body_to_step: Add body to an existing request step in a test.
             args(dict): Dictionary with the following required parameters:
                 bucket_key(str): The required parameter. The id of the bucket where the test resides.
@@ -279,9 +558,11 @@ def register(mcp, token: Optional[BzmApimToken]):
         try:
             match action:
                 case "read":
-                    return await step_manager.read(args["bucket_key"], args["test_id"], args["step_id"])
+                    return await step_manager.read(
+                        args["bucket_key"], args["test_id"], args["step_id"], fields=args.get("fields")
+                    )
                 case "list":
-                    return await step_manager.list(args["bucket_key"], args["test_id"])
+                    return await step_manager.list(args["bucket_key"], args["test_id"], args.get("fields"))
                 case "add_pause_step":
                     return await step_manager.add_pause_step(
                         args["bucket_key"], args["test_id"], args["duration"]
@@ -308,6 +589,12 @@ def register(mcp, token: Optional[BzmApimToken]):
                         args.get("assertion_property"),
                         args.get("assertion_value"),
                     )
+                case "patch_step":
+                    return await step_manager.patch_step(
+                        args["bucket_key"], args["test_id"], args["step_id"], args["mutations"]
+                    )
+                case "add_steps":
+                    return await step_manager.add_steps(args["bucket_key"], args["test_id"], args["steps"])
                 case _:
                     return BaseResult(error=f"Action {action} not found in steps manager tool")
         except httpx.HTTPStatusError:
@@ -1,15 +1,29 @@
+import asyncio
 import logging
 import traceback
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import httpx
 from mcp.server.fastmcp import Context
 
 from src.common.api_client import api_request
-from src.config.defaults import ACCOUNTS_ENDPOINT, TEAMS_ENDPOINT, TOOLS_PREFIX
+from src.common.entity_index import get_entity_index
+from src.config.defaults import (
+    ACCOUNTS_ENDPOINT,
+    ENTITY_INDEX_DIRECTORY_TTL,
+    ENTITY_INDEX_TESTS_TTL,
+    LIST_BUCKETS_CONCURRENCY,
+    SEARCH_LIMIT_DEFAULT,
+    SEARCH_MIN_SCORE,
+    TEAMS_ENDPOINT,
+    TOOLS_PREFIX,
+)
 from src.config.token import BzmApimToken
-from src.formatters.team import format_accounts, format_team_users, format_teams
+from src.formatters.base import fields_error, fields_params
+from src.formatters.team import format_accounts, format_search_matches, format_team_users, format_teams
 from src.models import BaseResult
+from src.tools.bucket_manager import BucketManager
+from src.tools.test_manager import TestManager
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -21,24 +35,121 @@ class TeamManager:
         self.token = token
         self.ctx = ctx
 
-    async def list(self) -> BaseResult:
+    async def list(self, fields: Optional[List[str]] = None) -> BaseResult:
         return await api_request(
             self.token,
             "GET",
             f"{ACCOUNTS_ENDPOINT}",
             result_formatter=format_accounts,
+            result_formatter_params=fields_params(fields),
             params={"include_owner": True},
         )
 
-    async def read(self, team_id: str) -> BaseResult:
+    async def read(self, team_id: str, fields: Optional[List[str]] = None) -> BaseResult:
         return await api_request(
-            self.token, "GET", f"{TEAMS_ENDPOINT}/{team_id}", result_formatter=format_teams
+            self.token,
+            "GET",
+            f"{TEAMS_ENDPOINT}/{team_id}",
+            result_formatter=format_teams,
+            result_formatter_params=fields_params(fields),
         )
 
-    async def get_team_users(self, team_id: str) -> BaseResult:
+    async def get_team_users(self, team_id: str, fields: Optional[List[str]] = None) -> BaseResult:
         return await api_request(
-            self.token, "GET", f"{TEAMS_ENDPOINT}/{team_id}/people", result_formatter=format_team_users
+            self.token,
+            "GET",
+            f"{TEAMS_ENDPOINT}/{team_id}/people",
+            result_formatter=format_team_users,
+            result_formatter_params=fields_params(fields),
+        )
+
+    async def search(
+        self,
+        query: str,
+        kinds: Optional[List[str]] = None,
+        limit: int = SEARCH_LIMIT_DEFAULT,
+        refresh: bool = False,
+        fields: Optional[List[str]] = None,
+    ) -> BaseResult:
+        """
+        Find the teams, buckets and tests whose names best match a free-form query, e.g. "checkout smoke
+        test in payments team", from the in-process entity index. The index is refreshed first: the
+        teams and buckets once they are older than their TTL, and then the tests of the buckets listed
+        longest ago, a few buckets at a time. `refresh` re-lists everything.
+        """
+        error = fields_error(format_search_matches, fields_params(fields))
+        if error:
+            return BaseResult(error=error)
+        index = get_entity_index()
+        if refresh:
+            index.clear()
+        warnings = []
+        if index.directory_stale(ENTITY_INDEX_DIRECTORY_TTL):
+            error = await self._refresh_directory()
+            if error:
+                return BaseResult(error=error)
+
+        semaphore = asyncio.Semaphore(LIST_BUCKETS_CONCURRENCY)
+        test_manager = TestManager(self.token, self.ctx)
+
+        async def list_tests(bucket_key: str) -> Optional[str]:
+            async with semaphore:
+                tests = await test_manager.list_all(
+                    bucket_key, fields=["test_id", "name", "trigger_url", "default_environment_id"]
+                )
+            if tests.error:
+                return f"Bucket {bucket_key}: {tests.error}"
+            index.set_tests(bucket_key, tests.result or [])
+            return None
+
+        stale = index.stale_buckets(ENTITY_INDEX_TESTS_TTL)
+        warnings.extend(filter(None, await asyncio.gather(*(list_tests(key) for key in stale))))
+
+        matches = index.search(query, kinds, SEARCH_MIN_SCORE)
+        found = BaseResult(
+            result=format_search_matches(matches[:limit], fields_params(fields)),
+            total=len(matches),
+            has_more=len(matches) > limit,
+        )
+        found.append_info(
+            [f"Searched {len(index)} teams, buckets and tests, re-listing tests of {len(stale)} buckets"]
+        )
+        if warnings:
+            # Buckets that failed to list keep the tests of their last listing
+            found.append_warnings(warnings)
+        if not matches:
+            found.append_hints(["Nothing matched, try fewer or other words, or list the teams and buckets"])
+        return found
+
+    async def _refresh_directory(self) -> Optional[str]:
+        """
+        List the teams of the account and all buckets at once into the entity index.
+        """
+        account, buckets = await asyncio.gather(
+            self.list(fields=["teams.team_id", "teams.name"]),
+            BucketManager(self.token, self.ctx).list(fields=["bucket_key", "name", "trigger_url", "team"]),
+        )
+        if account.error or buckets.error:
+            return account.error or buckets.error
+        teams = {
+            team["team_id"]: team["name"]
+            for item in account.result or []
+            for team in item.get("teams") or []
+        }
+        get_entity_index().set_directory(
+            teams,
+            [
+                {
+                    "bucket_key": bucket["bucket_key"],
+                    "name": bucket.get("name"),
+                    "trigger_url": bucket.get("trigger_url"),
+                    "team_id": (bucket.get("team") or {}).get("team_id"),
+                    "team_name": (bucket.get("team") or {}).get("name"),
+                }
+                for bucket in buckets.result or []
+            ],
         )
+        return None
 
 
 def register(mcp, token: Optional[BzmApimToken]):
@@ -47,6 +158,9 @@ def register(mcp, token: Optional[BzmApimToken]):
         description="""
         Operations on teams. A user can be part of multiple teams, and each team can have multiple buckets
         and buckets can have multiple tests.
+        Read and list actions also accept an optional 'fields' arg (list[str]): the fields to return,
+        with dotted paths for nested fields, e.g. ["name", "teams.team_id", "teams.name"]. All fields are
+        returned when omitted.
         Actions:
         - list: List all the teams user is part of. User is determined from the provided API token.
             args(dict): '{}' empty dictionary as no arguments are required.
@@ -56,6 +170,15 @@ def register(mcp, token: Optional[BzmApimToken]):
         - get_team_users: List all users in a specific team.
             args(dict): Dictionary with the following required parameters:
                 - team_id (str): The ID of the team to get users for.
+        - search: Find teams, buckets and tests by fuzzy names in one call, instead of walking teams,
+            buckets and tests by hand, e.g. "checkout smoke test in payments team". Each match has its
+            kind ('team', 'bucket' or 'test'), score (0 to 1, best first), team_id, bucket_key, test_id
+            and trigger_url where they apply. Names are indexed in memory and re-listed once stale.
+            args(dict): Dictionary with the following parameters:
+                - query (str, required): Words of the names of the test, bucket and/or team.
+                - kinds (list[str], optional): Only return these kinds of matches, e.g. ["test"].
+                - limit (int, optional): Maximum number of matches to return. Default: 5.
+                - refresh (bool, optional): Re-list all teams, buckets and tests first. Default: false.
         """,
     )
     async def teams(action: str, args: Dict[str, Any], ctx: Context) -> BaseResult:
@@ -63,11 +186,19 @@ def register(mcp, token: Optional[BzmApimToken]):
         try:
             match action:
                 case "list":
-                    return await team_manager.list()
+                    return await team_manager.list(args.get("fields"))
                 case "read":
-                    return await team_manager.read(args["team_id"])
+                    return await team_manager.read(args["team_id"], args.get("fields"))
                 case "get_team_users":
-                    return await team_manager.get_team_users(args["team_id"])
+                    return await team_manager.get_team_users(args["team_id"], args.get("fields"))
+                case "search":
+                    return await team_manager.search(
+                        args["query"],
+                        args.get("kinds"),
+                        args.get("limit", SEARCH_LIMIT_DEFAULT),
+                        args.get("refresh", False),
+                        args.get("fields"),
+                    )
                 case _:
                     return BaseResult(error=f"Action {action} not found in teams manager tool")
         except httpx.HTTPStatusError:
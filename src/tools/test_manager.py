@@ -1,19 +1,47 @@
+import asyncio
 import logging
+import time
 import traceback
-from typing import Any, Dict, Optional
+from collections import deque
+from itertools import count
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 import httpx
 from mcp.server.fastmcp import Context
 
-from src.common.api_client import api_request
-from src.config.defaults import TESTS_ENDPOINT, TOOLS_PREFIX
+from src.common.anomaly import detect_anomalies
+from src.common.api_client import api_request, status_error_message
+from src.common.bucket_archive import ARCHIVE_VERSION, ArchiveWriter, check_archive_path, read_archive
+from src.config.defaults import (
+    ARCHIVE_CONCURRENCY,
+    CLONE_WRITE_CONCURRENCY,
+    LIST_ALL_CONCURRENCY,
+    LIST_BUCKETS_CONCURRENCY,
+    LIST_PAGE_SIZE,
+    METRICS_FETCH_CONCURRENCY,
+    SCHEDULES_ENDPOINT,
+    STEPS_ENDPOINT,
+    TEST_ENVIRONMENT_ENDPOINT,
+    TESTS_ENDPOINT,
+    TOOLS_PREFIX,
+)
 from src.config.token import BzmApimToken
-from src.formatters.test import format_test_metrics, format_tests
+from src.formatters.base import fields_error, fields_params
+from src.formatters.test import (
+    format_bucket_archives,
+    format_test_metric_anomalies,
+    format_test_metrics,
+    format_tests,
+)
 from src.models import BaseResult
+from src.tools.bucket_manager import BucketManager
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Parts of a test copied along with it, counted in the totals of archives
+_TEST_PARTS = ("steps", "environments", "schedules")
+
 
 class TestManager:
 
@@ -21,12 +49,13 @@ class TestManager:
         self.token = token
         self.ctx = ctx
 
-    async def read(self, bucket_key: str, test_id: int) -> BaseResult:
+    async def read(self, bucket_key: str, test_id: int, fields: Optional[List[str]] = None) -> BaseResult:
         test_result = await api_request(
             self.token,
             "GET",
             f"{TESTS_ENDPOINT.format(bucket_key)}/{test_id}",
             result_formatter=format_tests,
+            result_formatter_params=fields_params(fields),
         )
         return test_result
 
@@ -44,7 +73,371 @@ class TestManager:
             ],
         )
 
-    async def list(self, bucket_key: str, limit: int, offset: int) -> BaseResult:
+    async def clone(
+        self,
+        bucket_key: str,
+        test_id: str,
+        target_bucket_key: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> BaseResult:
+        """
+        Copy a test with its steps, environments and schedules into the target bucket, or into the same
+        bucket under a new name. The test, its steps, environments and schedules are read concurrently,
+        then written as by _copy_test. Once the test is created it is always returned, with warnings
+        about the parts the API failed or rejected.
+        """
+        target_bucket_key = target_bucket_key or bucket_key
+        same_bucket = target_bucket_key == bucket_key
+        parts, error = await self._read_test_parts(bucket_key, test_id)
+        if error:
+            return BaseResult(error=error)
+        source_name = parts["test"]["name"]
+        name = name or (source_name if not same_bucket else f"{source_name} (copy)")
+
+        clone, copied, warnings = await self._copy_test(parts, target_bucket_key, name, same_bucket)
+        if clone is None:
+            return BaseResult(error=warnings[0])
+        try:
+            cloned = await self.read(target_bucket_key, clone["id"])
+        except httpx.HTTPStatusError as e:
+            cloned = BaseResult(error=status_error_message(e))
+        if cloned.error or not cloned.result:
+            warnings.append(f"Test {clone['id']} was created but could not be read back: {cloned.error}")
+            cloned = BaseResult(result=[{"test_id": clone["id"], "name": name}], total=1)
+        cloned.append_info(
+            [
+                f"Copied {copied['steps']} of {len(parts['steps'])} steps, {copied['environments']} of "
+                f"{len(parts['environments'])} environments and {copied['schedules']} of "
+                f"{len(parts['schedules'])} schedules"
+            ]
+        )
+        if warnings:
+            cloned.append_warnings(warnings)
+        return cloned
+
+    async def _read_test_parts(self, bucket_key: str, test_id: str) -> Tuple[Optional[dict], Optional[str]]:
+        """
+        Read the raw test with its steps, environments and schedules concurrently, or the reason it
+        could not be read.
+        """
+        endpoints = [
+            f"{TESTS_ENDPOINT.format(bucket_key)}/{test_id}",
+            STEPS_ENDPOINT.format(bucket_key, test_id),
+            TEST_ENVIRONMENT_ENDPOINT.format(bucket_key, test_id),
+            SCHEDULES_ENDPOINT.format(bucket_key, test_id),
+        ]
+        reads = await asyncio.gather(
+            *(api_request(self.token, "GET", endpoint, use_cache=False) for endpoint in endpoints)
+        )
+        for read in reads:
+            if read.error or read.result is None:
+                return None, f"Test {test_id} could not be read: {read.error or 'empty response'}"
+        test, steps, environments, schedules = reads
+        return {
+            "test": test.result[0],
+            "steps": steps.result,
+            "environments": environments.result,
+            "schedules": schedules.result,
+        }, None
+
+    async def _copy_test(
+        self, parts: dict, target_bucket_key: str, name: str, keep_shared: bool
+    ) -> Tuple[Optional[dict], Dict[str, int], List[str]]:
+        """
+        Create a test from its parts as read by _read_test_parts. The steps are created one after the
+        other to keep their order, as the steps API appends each one, while the environments are created
+        alongside them and the schedules once their environments exist. The default environment of the
+        parts is written onto the default environment of the new test.
+        Shared environments are not part of a test: unless keep_shared, i.e. the new test is in the bucket
+        of the parts, environments inherited from them lose their parent and their schedules are skipped.
+        Returns the raw new test, or None if it could not be created, the number of parts copied, and the
+        warnings about parts that were not.
+        """
+        source, warnings = parts["test"], []
+        clone = await self._write_part(
+            "POST",
+            TESTS_ENDPOINT.format(target_bucket_key),
+            {"name": name, "description": source.get("description") or ""},
+            "The test could not be created",
+            warnings,
+        )
+        if not clone or not clone.get("id"):
+            return None, {}, warnings or ["The test could not be created: empty response"]
+
+        copied_steps, (copied_environments, copied_schedules) = await asyncio.gather(
+            self._copy_steps(
+                parts["steps"], STEPS_ENDPOINT.format(target_bucket_key, clone["id"]), warnings
+            ),
+            self._copy_environments_and_schedules(parts, target_bucket_key, clone, keep_shared, warnings),
+        )
+        copied = {"steps": copied_steps, "environments": copied_environments, "schedules": copied_schedules}
+        return clone, copied, warnings
+
+    async def _write_part(
+        self, method: str, endpoint: str, body: dict, failure: str, warnings: List[str]
+    ) -> Optional[dict]:
+        """
+        Write one part of a copied test and return the raw entity the API answered with. A write the API
+        fails or rejects is added to the warnings, as the failure with its reason, and returns None so the
+        other parts are still copied.
+        """
+        try:
+            written = await api_request(self.token, method, endpoint, json=body)
+        except httpx.HTTPStatusError as e:
+            warnings.append(f"{failure}: {status_error_message(e)}")
+            return None
+        if written.error:
+            warnings.append(f"{failure}: {written.error}")
+            return None
+        return (written.result or [{}])[0]
+
+    async def _copy_steps(self, steps: List[dict], endpoint: str, warnings: List[str]) -> int:
+        copied = 0
+        for index, step in enumerate(steps):
+            step_copy = await self._write_part(
+                "POST", endpoint, _without_ids(step), f"Step {index} was not copied", warnings
+            )
+            copied += step_copy is not None
+        return copied
+
+    async def _copy_environments_and_schedules(
+        self, parts: dict, target_bucket_key: str, clone: dict, keep_shared: bool, warnings: List[str]
+    ) -> Tuple[int, int]:
+        environments = TEST_ENVIRONMENT_ENDPOINT.format(target_bucket_key, clone["id"])
+        schedules = f"/v1{SCHEDULES_ENDPOINT.format(target_bucket_key, clone['id'])}"
+        # The default environment of the parts is written onto the one the new test was created with
+        writes = {}
+        if clone.get("default_environment_id"):
+            default_copy = f"{environments}/{clone['default_environment_id']}"
+            writes[parts["test"].get("default_environment_id")] = ("PUT", default_copy)
+        semaphore = asyncio.Semaphore(CLONE_WRITE_CONCURRENCY)
+
+        copied = await asyncio.gather(
+            *(
+                self._copy_environment(
+                    environment,
+                    writes.get(environment["id"], ("POST", environments)),
+                    keep_shared,
+                    semaphore,
+                    warnings,
+                )
+                for environment in parts["environments"]
+            )
+        )
+        environment_ids = dict(copied)
+        scheduled = await asyncio.gather(
+            *(
+                self._copy_schedule(schedule, environment_ids, schedules, keep_shared, semaphore, warnings)
+                for schedule in parts["schedules"]
+            )
+        )
+        return sum(new_id is not None for _, new_id in copied), sum(scheduled)
+
+    async def _copy_environment(
+        self,
+        environment: dict,
+        write: Tuple[str, str],
+        keep_shared: bool,
+        semaphore: asyncio.Semaphore,
+        warnings: List[str],
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Write an environment of the parts with the given method and endpoint. Returns its id and the id
+        of its copy, None when it was not copied.
+        """
+        body = {key: value for key, value in environment.items() if key not in ("id", "test_id")}
+        if not keep_shared and body.get("parent_environment_id"):
+            body.pop("parent_environment_id")
+            warnings.append(f"Environment {environment.get('name')} lost its shared parent environment")
+        async with semaphore:
+            copied = await self._write_part(
+                *write, body, f"Environment {environment.get('name')} was not copied", warnings
+            )
+        return environment["id"], (copied or {}).get("id")
+
+    async def _copy_schedule(
+        self,
+        schedule: dict,
+        environment_ids: Dict[str, Optional[str]],
+        endpoint: str,
+        keep_shared: bool,
+        semaphore: asyncio.Semaphore,
+        warnings: List[str],
+    ) -> bool:
+        environment_id = environment_ids.get(schedule["environment_id"])
+        if environment_id is None and keep_shared and schedule["environment_id"] not in environment_ids:
+            environment_id = schedule["environment_id"]  # A shared environment of the bucket
+        if environment_id is None:
+            warnings.append(f"Schedule {schedule['id']} was skipped, its environment was not copied")
+            return False
+        body = {"environment_id": environment_id, "interval": schedule["interval"]}
+        if schedule.get("note"):
+            body["note"] = schedule["note"]
+        async with semaphore:
+            copied = await self._write_part(
+                "POST", endpoint, body, f"Schedule {schedule['id']} was not copied", warnings
+            )
+        return copied is not None
+
+    async def export_bucket(self, bucket_key: str, path: str, overwrite: bool = False) -> BaseResult:
+        """
+        Write every test of the bucket with its steps, environments and schedules to a gzip'd JSON Lines
+        archive on local disk: a header line with the bucket, then one line per test. The tests are
+        listed page by page and ARCHIVE_CONCURRENCY of them are read at once, each written as soon as it
+        and the tests before it are read, so memory is bounded by the tests in flight.
+        """
+        error = check_archive_path(path, writing=True, overwrite=overwrite)
+        if error:
+            return BaseResult(error=error)
+        bucket = await BucketManager(self.token, self.ctx).read(bucket_key)
+        if bucket.error or not bucket.result:
+            return BaseResult(error=bucket.error or f"Bucket {bucket_key} not found")
+
+        archive = await ArchiveWriter(path).open()
+        totals = {"tests": 0, "steps": 0, "environments": 0, "schedules": 0}
+        warnings = []
+        try:
+            await archive.write(
+                {
+                    "type": "bucket",
+                    "version": ARCHIVE_VERSION,
+                    "bucket_key": bucket_key,
+                    "name": bucket.result[0]["name"],
+                    "exported_at": time.time(),
+                }
+            )
+            await self._export_tests(bucket_key, archive, totals, warnings)
+        finally:
+            await archive.close()
+
+        exported = BaseResult(
+            result=format_bucket_archives([{"path": path, "bucket_key": bucket_key, **totals}]), total=1
+        )
+        if warnings:
+            exported.append_warnings(warnings)
+        return exported
+
+    async def _export_tests(
+        self, bucket_key: str, archive: ArchiveWriter, totals: Dict[str, int], warnings: List[str]
+    ) -> None:
+        pending = deque()
+
+        async def write_next() -> None:
+            parts, error = await pending.popleft()
+            if error:
+                warnings.append(error)
+                return
+            await archive.write({"type": "test", **parts})
+            _add_totals(totals, {"tests": 1, **{part: len(parts[part]) for part in _TEST_PARTS}})
+
+        try:
+            async for page in self.iter_all(bucket_key, fields=["test_id"]):
+                if page.error:
+                    warnings.append(f"Listing the tests stopped early: {page.error}")
+                    break
+                for test in page.result or []:
+                    read = self._read_test_parts(bucket_key, test["test_id"])
+                    pending.append(asyncio.ensure_future(read))
+                    if len(pending) >= ARCHIVE_CONCURRENCY:
+                        await write_next()
+            while pending:
+                await write_next()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def import_bucket(
+        self,
+        path: str,
+        target_bucket_key: Optional[str] = None,
+        team_id: Optional[str] = None,
+        bucket_name: Optional[str] = None,
+    ) -> BaseResult:
+        """
+        Create the tests of an archive written by export_bucket in the target bucket, or in a new bucket
+        of the team. The archive is read as a stream and ARCHIVE_CONCURRENCY tests are created at once,
+        each as by _copy_test, so memory is bounded by the tests in flight. A test that fails to be
+        created is reported as a warning and the next ones are still imported.
+        """
+        error = check_archive_path(path, writing=False)
+        if error or bool(target_bucket_key) == bool(team_id):
+            return BaseResult(error=error or "Pass either target_bucket_key or team_id to import into")
+
+        records = read_archive(path)
+        totals = {"tests": 0, "steps": 0, "environments": 0, "schedules": 0}
+        warnings = []
+        try:
+            header = await anext(records, None)
+            if not header or header.get("type") != "bucket" or header.get("version") != ARCHIVE_VERSION:
+                return BaseResult(error=f"{path} is not a bucket archive of version {ARCHIVE_VERSION}")
+            if team_id:
+                buckets = BucketManager(self.token, self.ctx)
+                bucket = await buckets.create(bucket_name or header["name"], team_id)
+                if bucket.error or not bucket.result:
+                    return BaseResult(error=f"The bucket could not be created: {bucket.error}")
+                target_bucket_key = bucket.result[0]["bucket_key"]
+            keep_shared = target_bucket_key == header["bucket_key"]
+            await self._import_tests(records, target_bucket_key, keep_shared, totals, warnings)
+        finally:
+            await records.aclose()
+
+        imported = BaseResult(
+            result=format_bucket_archives([{"path": path, "bucket_key": target_bucket_key, **totals}]),
+            total=1,
+        )
+        if warnings:
+            imported.append_warnings(warnings)
+        return imported
+
+    async def _import_tests(
+        self,
+        records: AsyncIterator[dict],
+        target_bucket_key: str,
+        keep_shared: bool,
+        totals: Dict[str, int],
+        warnings: List[str],
+    ) -> None:
+        pending = deque()
+
+        async def create_next() -> None:
+            label, (clone, copied, test_warnings) = await pending.popleft()
+            warnings.extend(f"{label}: {warning}" for warning in test_warnings)
+            if clone is not None:
+                _add_totals(totals, {"tests": 1, **copied})
+
+        try:
+            tests = 0
+            async for record in records:
+                if record.get("type") != "test":
+                    continue
+                tests += 1
+                create = self._import_test(record, tests, target_bucket_key, keep_shared)
+                pending.append(asyncio.ensure_future(create))
+                if len(pending) >= ARCHIVE_CONCURRENCY:
+                    await create_next()
+            while pending:
+                await create_next()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _import_test(
+        self, parts: dict, position: int, target_bucket_key: str, keep_shared: bool
+    ) -> Tuple[str, Tuple[Optional[dict], Dict[str, int], List[str]]]:
+        """
+        Create a test of an archive as by _copy_test. Returns its label for warnings, and the result of
+        _copy_test, where a test that could not be created at all has the reason as its only warning.
+        """
+        name = (parts.get("test") or {}).get("name")
+        label = f"Test {name}" if name else f"Test #{position} of the archive"
+        try:
+            return label, await self._copy_test(parts, target_bucket_key, name, keep_shared)
+        except Exception as e:
+            return label, (None, {}, [f"It was not imported: {e!r}"])
+
+    async def list(
+        self, bucket_key: str, limit: int, offset: int, fields: Optional[List[str]] = None
+    ) -> BaseResult:
         parameters = {"count": limit, "offset": offset}
 
         return await api_request(
@@ -52,11 +445,135 @@ class TestManager:
             "GET",
             f"{TESTS_ENDPOINT.format(bucket_key)}",
             result_formatter=format_tests,
+            result_formatter_params=fields_params(fields),
             params=parameters,
         )
 
+    async def iter_all(
+        self,
+        bucket_key: str,
+        page_size: int = LIST_PAGE_SIZE,
+        concurrency: int = LIST_ALL_CONCURRENCY,
+        fields: Optional[List[str]] = None,
+    ) -> AsyncIterator[BaseResult]:
+        """
+        Yield every page of tests in the bucket, in order. The `total` of the first page plans the
+        remaining offsets, which are fetched `concurrency` pages at a time; when the API does not report
+        a total, pages are fetched ahead the same way until a short page ends the listing.
+        Stops after the first page with an error.
+        """
+        first = await self.list(bucket_key, page_size, 0, fields)
+        yield first
+        if first.error or len(first.result or []) < page_size:
+            return
+
+        if first.total and first.total > page_size:
+            offsets = iter(range(page_size, first.total, page_size))
+        else:
+            offsets = count(page_size, page_size)
+        pending = deque()
+
+        def prefetch() -> None:
+            offset = next(offsets, None)
+            if offset is not None:
+                pending.append(asyncio.ensure_future(self.list(bucket_key, page_size, offset, fields)))
+
+        for _ in range(max(concurrency, 1)):
+            prefetch()
+        try:
+            while pending:
+                page = await pending.popleft()
+                yield page
+                if page.error or len(page.result or []) < page_size:
+                    return
+                prefetch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def list_all(
+        self, bucket_key: str, page_size: int = LIST_PAGE_SIZE, fields: Optional[List[str]] = None
+    ) -> BaseResult:
+        tests, seen = [], set()
+        total = None
+        async for page in self.iter_all(bucket_key, page_size, fields=fields):
+            if page.error:
+                return BaseResult(result=tests, total=total, has_more=True, error=page.error)
+            total = total if total is not None else page.total
+            for test in page.result or []:
+                # Tests created or deleted while listing shift the pages, skip the ones seen twice
+                test_id = test.get("test_id")
+                if test_id is None or test_id not in seen:
+                    seen.add(test_id)
+                    tests.append(test)
+        return BaseResult(result=tests, total=len(tests), has_more=False)
+
+    async def list_across_buckets(
+        self,
+        name_contains: Optional[str] = None,
+        last_run_status: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> BaseResult:
+        """
+        List the tests of every bucket the user has access to, a few buckets at a time. Each test is
+        tagged with its bucket_key and bucket_name. Buckets that fail to list are reported as warnings
+        and the tests of the other buckets are still returned.
+        """
+        fields = _with_filter_fields(fields, name_contains, last_run_status)
+        error = fields_error(format_tests, fields_params(fields))
+        if error:
+            return BaseResult(error=error)
+        buckets = await BucketManager(self.token, self.ctx).list(fields=["bucket_key", "name"])
+        if buckets.error:
+            return buckets
+
+        semaphore = asyncio.Semaphore(LIST_BUCKETS_CONCURRENCY)
+        listings = await asyncio.gather(
+            *(self._list_bucket(bucket, fields, semaphore) for bucket in buckets.result or [])
+        )
+
+        tests, warnings, info = [], [], []
+        for bucket, (result, elapsed) in zip(buckets.result or [], listings):
+            label = f"Bucket {bucket['bucket_key']} ({bucket['name']})"
+            if result.error:
+                warnings.append(f"{label}: {result.error}")
+            info.append(f"{label}: {len(result.result or [])} tests in {elapsed * 1000:.0f}ms")
+            tests.extend(
+                {**test, "bucket_key": bucket["bucket_key"], "bucket_name": bucket["name"]}
+                for test in result.result or []
+                if _test_matches(test, name_contains, last_run_status)
+            )
+
+        merged = BaseResult(result=tests, total=len(tests), has_more=False)
+        merged.append_info(info)
+        if warnings:
+            merged.append_warnings(warnings)
+        return merged
+
+    async def _list_bucket(
+        self, bucket: dict, fields: Optional[List[str]], semaphore: asyncio.Semaphore
+    ) -> Tuple[BaseResult, float]:
+        """
+        List every test of a bucket of list_across_buckets, with the seconds it took. A bucket that fails
+        to list returns the error instead of raising, so the other buckets are still listed.
+        """
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await self.list_all(bucket["bucket_key"], fields=fields)
+            except Exception as e:
+                result = BaseResult(error=repr(e))
+            return result, time.perf_counter() - start
+
     async def get_test_metrics(
-        self, bucket_key: str, test_id: str, timeframe: str, environment_uuid: str, region: str
+        self,
+        bucket_key: str,
+        test_id: str,
+        timeframe: str,
+        environment_uuid: str,
+        region: str,
+        fields: Optional[List[str]] = None,
+        max_points: Optional[int] = None,
     ) -> BaseResult:
         parameters = {
             "timeframe": timeframe,
@@ -70,15 +587,126 @@ class TestManager:
             "GET",
             f"{TESTS_ENDPOINT.format(bucket_key)}/{test_id}/metrics",
             result_formatter=format_test_metrics,
+            result_formatter_params={**(fields_params(fields) or {}), "max_points": max_points},
             params=parameters,
         )
 
+    async def detect_anomalies(
+        self,
+        bucket_key: str,
+        timeframes: Optional[List[str]] = None,
+        environment_uuid: str = "all",
+        region: str = "all",
+        test_ids: Optional[List[str]] = None,
+    ) -> BaseResult:
+        """
+        Flag the latency spikes and success ratio dips in the response times of the tests of the bucket,
+        or of the given tests, over each timeframe. The metrics of all tests and timeframes are read
+        concurrently. Only the tests and timeframes with anomalies are returned, the most deviating first.
+        """
+        timeframes = timeframes or ["day", "week"]
+        if test_ids:
+            tests = [{"test_id": test_id} for test_id in test_ids]
+        else:
+            listing = await self.list_all(bucket_key, fields=["test_id", "name"])
+            if listing.error:
+                return listing
+            tests = listing.result or []
+        semaphore = asyncio.Semaphore(METRICS_FETCH_CONCURRENCY)
+
+        async def read_metrics(test: dict, timeframe: str) -> BaseResult:
+            async with semaphore:
+                return await self.get_test_metrics(
+                    bucket_key, test["test_id"], timeframe, environment_uuid, region
+                )
+
+        pairs = [(test, timeframe) for test in tests for timeframe in timeframes]
+        readings = await asyncio.gather(*(read_metrics(test, timeframe) for test, timeframe in pairs))
+
+        found, warnings = [], []
+        for (test, timeframe), metrics in zip(pairs, readings):
+            if metrics.error or not metrics.result:
+                warnings.append(f"Test {test['test_id']} ({timeframe}): {metrics.error or 'no metrics'}")
+                continue
+            series = metrics.result[0]
+            anomalies = detect_anomalies(series.get("response_times") or [])
+            if not anomalies:
+                continue
+            found.append(
+                {
+                    "test_id": test["test_id"],
+                    "test_name": test.get("name"),
+                    "timeframe": timeframe,
+                    "points": len(series.get("response_times") or []),
+                    "latency_spikes": sum(anomaly["kind"] == "latency_spike" for anomaly in anomalies),
+                    "success_dips": sum(anomaly["kind"] == "success_dip" for anomaly in anomalies),
+                    "response_time_95th_percentile": (series.get("this_time_period") or {}).get(
+                        "response_time_95th_percentile"
+                    ),
+                    "response_time_95th_percentile_change": (
+                        series.get("change_from_last_period") or {}
+                    ).get("response_time_95th_percentile"),
+                    "anomalies": anomalies,
+                }
+            )
+        found.sort(key=_worst_deviation, reverse=True)
+
+        detected = BaseResult(result=format_test_metric_anomalies(found), total=len(found))
+        detected.append_info([f"Checked {len(tests)} tests over the timeframes {', '.join(timeframes)}"])
+        if warnings:
+            detected.append_warnings(warnings)
+        return detected
+
+
+def _add_totals(totals: Dict[str, int], counts: Dict[str, int]) -> None:
+    for part, part_count in counts.items():
+        totals[part] += part_count
+
+
+def _without_ids(step: dict) -> dict:
+    # The ids of a step and of its nested steps belong to the copied test
+    copied = {key: value for key, value in step.items() if key != "id"}
+    if isinstance(copied.get("steps"), list):
+        copied["steps"] = [_without_ids(nested) for nested in copied["steps"]]
+    return copied
+
+
+def _with_filter_fields(
+    fields: Optional[List[str]], name_contains: Optional[str], last_run_status: Optional[str]
+) -> Optional[List[str]]:
+    # The filters need these fields even when the caller does not ask for them
+    if not fields:
+        return fields
+    return [
+        *fields,
+        *(["name"] if name_contains else []),
+        *(["last_run.status"] if last_run_status else []),
+    ]
+
+
+def _worst_deviation(found: dict) -> float:
+    # Anomalies of series that did not vary at all have no deviation, they rank first
+    deviations = [anomaly["deviation"] for anomaly in found["anomalies"]]
+    return max(float("inf") if deviation is None else deviation for deviation in deviations)
+
+
+def _test_matches(test: dict, name_contains: Optional[str], last_run_status: Optional[str]) -> bool:
+    if name_contains and name_contains.lower() not in (test.get("name") or "").lower():
+        return False
+    if last_run_status:
+        last_run = test.get("last_run") or {}
+        return (last_run.get("status") or "").lower() == last_run_status.lower()
+    return True
+
 
 def register(mcp, token: Optional[BzmApimToken]):
     @mcp.tool(
         name=f"{TOOLS_PREFIX}_tests",
         description="""
         Operations on tests. These tests reside within buckets which is represented by bucket_key.
+        Read and list actions also accept an optional 'fields' arg (list[str]): the fields to return,
+        with dotted paths for nested fields, e.g. ["test_id", "name", "last_run.status"]. All fields are
+        returned when omitted.
         Actions:
         - read: Read a test. Get the detailed information of a test.
             args(dict): Dictionary with the following required parameters:
@@ -88,11 +716,46 @@ def register(mcp, token: Optional[BzmApimToken]):
             args(dict): Dictionary with the following required parameters:
                 test_name (str): The required name of the test to create.
                 bucket_key (str): The key of the bucket where the test will be created.
+        - clone: Copy a test with its steps, environments and schedules into another bucket, or into the
+        same bucket under a new name, e.g. to run a test per environment or region. Returns the new test.
+            args(dict): Dictionary with the following parameters:
+                bucket_key (str): The required parameter. The key of the bucket where the test resides.
+                test_id (str): The required parameter. The id of the test to copy.
+                target_bucket_key (str): The optional parameter. The key of the bucket to copy the test
+                 into. Default is the same bucket.
+                name (str): The optional parameter. The name of the new test. Default is the name of the
+                 test, with " (copy)" appended in the same bucket.
+        - export_bucket: Back up every test of a bucket with its steps, environments and schedules to a
+        gzip'd JSON Lines file on the local disk, in a single call. Returns the number of tests, steps,
+        environments and schedules written.
+            args(dict): Dictionary with the following parameters:
+                bucket_key (str): The required parameter. The key of the bucket to export.
+                path (str): The required parameter. The local file to write, ending with .jsonl.gz.
+                overwrite (bool): The optional parameter. Replace the file if it exists. Default is false.
+        - import_bucket: Create the tests of a file written by export_bucket in another bucket, or in a new
+        bucket of a team, e.g. to promote tests from a staging to a production account. Returns the number
+        of tests, steps, environments and schedules created.
+            args(dict): Dictionary with the following parameters:
+                path (str): The required parameter. The local file written by export_bucket.
+                target_bucket_key (str): The key of the bucket to import into. Either this or team_id is
+                 required.
+                team_id (str): The id of the team in which to create a new bucket to import into.
+                bucket_name (str): The optional parameter. The name of the new bucket. Default is the name
+                 of the exported bucket.
         - list: List all tests.
             args(dict): Dictionary with the following required parameters:
                 bucket_key (str): The key of the bucket to list tests from.
                 limit (int, default=10, valid=[1 to 50]): The number of tests to list.
                 offset (int, default=0): Number of tests to skip.
+        - list_all: List every test of a bucket in a single call, fetching all pages.
+            args(dict): Dictionary with the following required parameters:
+                bucket_key (str): The key of the bucket to list tests from.
+        - list_across_buckets: List every test of every bucket the user has access to in a single call.
+        Each test includes the bucket_key and bucket_name of its bucket.
+            args(dict): Dictionary with the following optional parameters:
+                name_contains (str): Only tests whose name contains this text (case insensitive).
+                last_run_status (str): Only tests whose last run has this status. Possible values:
+                 'completed', 'error', 'expired', 'canceled'.
         - get_test_metrics: Get metrics for a specific test.
             args(dict): Dictionary with the following required parameters:
                 bucket_key(str): The bucket key where the test resides.
@@ -103,6 +766,22 @@ def register(mcp, token: Optional[BzmApimToken]):
                  test executions in a specific environment. Default value is "all".
                 region(str): The optional parameter: The region to filter metrics for test executions in a
                  specific region. Default value is "all".
+                max_points(int): The optional parameter: Downsample the response times to at most this many
+                 points (at least 10), keeping the slowest and least successful point of each interval so
+                 spikes and dips are not lost. Recommended for the "week" and "month" timeframes. Default
+                 is to return every point.
+        - detect_anomalies: Find what got slower or started failing, e.g. this week, across the tests of a
+         bucket in one call, instead of reading the metrics of each test. Flags the latency spikes and
+         success ratio dips in the response times of each test against the rolling median of the points
+         before them. Returns only the tests and timeframes with anomalies, the most deviating first.
+            args(dict): Dictionary with the following parameters:
+                bucket_key(str): The required parameter. The bucket key whose tests are checked.
+                timeframes(list[str]): The optional parameter: The timeframes to check. Possible values are
+                 "hour", "day", "week", "month". Default is ["day", "week"].
+                test_ids(list[str]): The optional parameter: Only check these tests of the bucket.
+                environment_uuid(str): The optional parameter: Only metrics of this environment. Default
+                 value is "all".
+                region(str): The optional parameter: Only metrics of this region. Default value is "all".
         """,
     )
     async def tests(action: str, args: Dict[str, Any], ctx: Context) -> BaseResult:
@@ -110,12 +789,33 @@ def register(mcp, token: Optional[BzmApimToken]):
         try:
             match action:
                 case "read":
-                    return await test_manager.read(args["bucket_key"], args["test_id"])
+                    return await test_manager.read(args["bucket_key"], args["test_id"], args.get("fields"))
                 case "create":
                     return await test_manager.create(args["test_name"], args["bucket_key"])
+                case "clone":
+                    return await test_manager.clone(
+                        args["bucket_key"], args["test_id"], args.get("target_bucket_key"), args.get("name")
+                    )
+                case "export_bucket":
+                    return await test_manager.export_bucket(
+                        args["bucket_key"], args["path"], args.get("overwrite", False)
+                    )
+                case "import_bucket":
+                    return await test_manager.import_bucket(
+                        args["path"],
+                        args.get("target_bucket_key"),
+                        args.get("team_id"),
+                        args.get("bucket_name"),
+                    )
                 case "list":
                     return await test_manager.list(
-                        args["bucket_key"], args.get("limit", 50), args.get("offset", 0)
+                        args["bucket_key"], args.get("limit", 50), args.get("offset", 0), args.get("fields")
+                    )
+                case "list_all":
+                    return await test_manager.list_all(args["bucket_key"], fields=args.get("fields"))
+                case "list_across_buckets":
+                    return await test_manager.list_across_buckets(
+                        args.get("name_contains"), args.get("last_run_status"), args.get("fields")
                     )
                 case "get_test_metrics":
                     return await test_manager.get_test_metrics(
@@ -124,6 +824,16 @@ def register(mcp, token: Optional[BzmApimToken]):
                         args.get("timeframe", "day"),
                         args.get("environment_uuid", "all"),
                         args.get("region", "all"),
+                        args.get("fields"),
+                        args.get("max_points"),
+                    )
+                case "detect_anomalies":
+                    return await test_manager.detect_anomalies(
+                        args["bucket_key"],
+                        args.get("timeframes"),
+                        args.get("environment_uuid", "all"),
+                        args.get("region", "all"),
+                        args.get("test_ids"),
                     )
                 case _:
                     return BaseResult(error=f"Action {action} not found in tests manager tool")
@@ -1,6 +1,7 @@
 """
 Pytest configuration and fixtures for MCP BlazeMeter API Test server
 """
+import json
 import pytest
 from unittest.mock import Mock, AsyncMock
 from mcp.server.fastmcp import Context
@@ -106,10 +107,10 @@ def mock_httpx_response():
     def _create_response(status_code=200, json_data=None):
         mock_response = Mock()
         mock_response.status_code = status_code
-        mock_response.json.return_value = {
+        mock_response.content = json.dumps({
             "data": json_data or [],
             "error": None
-        }
+        }).encode()
         mock_response.raise_for_status = Mock()
         return mock_response
     return _create_response
@@ -129,3 +130,23 @@ def mock_api_request(monkeypatch):
     monkeypatch.setattr(api_client, "api_request", _mock_api_request)
     return _mock_api_request
 
+
+
+@pytest.fixture(autouse=True)
+def reset_api_client_state(monkeypatch):
+    """Start every test with an empty response cache and without the shared rate limit"""
+    from src.common import api_client
+    monkeypatch.setattr(api_client.rate_limiter, "rate", 0)
+    api_client.response_cache.clear()
+    yield
+    api_client.response_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def results_store(monkeypatch):
+    """Give every test its own in-memory results store"""
+    from src.common import results_store as results_store_module
+    store = results_store_module.ResultsStore(":memory:")
+    monkeypatch.setattr(results_store_module, "_store", store)
+    yield store
+    store.close()
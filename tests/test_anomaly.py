@@ -0,0 +1,63 @@
+"""
+Unit tests for anomaly detection over response time series
+"""
+import pytest
+
+from src.common.anomaly import RollingMedian, detect_anomalies
+
+
+def _series(latencies, successes=None):
+    successes = successes or [1.0] * len(latencies)
+    return [
+        {"timestamp": 1000 + i * 60, "avg_response_time_ms": latency, "success_ratio": success}
+        for i, (latency, success) in enumerate(zip(latencies, successes))
+    ]
+
+
+class TestRollingMedian:
+    """Test cases for RollingMedian"""
+
+    def test_median_of_last_window_values(self):
+        """Test only the last window values are kept"""
+        rolling = RollingMedian(3)
+        for value in [100, 1, 2, 3]:
+            rolling.push(value)
+
+        assert len(rolling) == 3
+        assert rolling.median() == 2
+        assert rolling.mad() == pytest.approx(1.4826)
+
+
+class TestDetectAnomalies:
+    """Test cases for detect_anomalies"""
+
+    def test_latency_spike(self):
+        """Test a spike well above the noisy baseline is flagged"""
+        series = _series([100, 104, 98, 102, 101, 99, 103, 400, 100, 102])
+
+        anomalies = detect_anomalies(series)
+
+        assert [(a["kind"], a["timestamp"]) for a in anomalies] == [("latency_spike", 1420)]
+        assert anomalies[0]["baseline"] == 101
+
+    def test_noise_is_not_flagged(self):
+        """Test small variations and faster responses are not anomalies"""
+        series = _series([100, 110, 95, 105, 100, 112, 90, 108, 40, 104])
+
+        assert detect_anomalies(series) == []
+
+    def test_small_change_in_flat_series_is_not_flagged(self):
+        """Test a latency increase below the minimum ratio is ignored even without any deviation"""
+        assert detect_anomalies(_series([100] * 8 + [110])) == []
+
+    def test_success_dip(self):
+        """Test a drop of the success ratio in a flat series is flagged without deviation"""
+        series = _series([100] * 8, [1.0] * 6 + [0.5, 1.0])
+
+        anomalies = detect_anomalies(series)
+
+        assert [(a["kind"], a["value"], a["deviation"]) for a in anomalies] == [("success_dip", 0.5, None)]
+
+    def test_needs_min_points(self):
+        """Test points are not judged before there is a baseline"""
+        assert detect_anomalies(_series([100, 100, 900])) == []
@@ -1,11 +1,17 @@
 """
 Unit tests for API client
 """
+import asyncio
+import json
 import pytest
 import httpx
 from unittest.mock import Mock, AsyncMock, patch
-from src.common.api_client import api_request
+from src.common import api_client
+from src.common.api_client import api_request, client_lifespan, close_client, get_client
 from src.config.token import BzmApimToken
+from benchmarks.bench_decoding import make_environment
+from src.formatters.bucket import format_buckets
+from src.formatters.environment import format_environments
 from src.models import BaseResult
 
 
@@ -25,14 +31,14 @@ class TestApiClient:
         token = BzmApimToken("test_token")
 
         mock_response = Mock()
-        mock_response.json.return_value = {
+        mock_response.content = json.dumps({
             "data": [{"id": "1", "name": "test"}],
             "error": None
-        }
+        }).encode()
         mock_response.raise_for_status = Mock()
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.request = AsyncMock(
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_client.return_value.request = AsyncMock(
                 return_value=mock_response
             )
 
@@ -50,14 +56,14 @@ class TestApiClient:
             return [{"formatted": True, **item} for item in data]
 
         mock_response = Mock()
-        mock_response.json.return_value = {
+        mock_response.content = json.dumps({
             "data": [{"id": "1"}],
             "error": None
-        }
+        }).encode()
         mock_response.raise_for_status = Mock()
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.request = AsyncMock(
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_client.return_value.request = AsyncMock(
                 return_value=mock_response
             )
 
@@ -78,13 +84,13 @@ class TestApiClient:
             "error": {"message": "Invalid Credentials"}
         }
 
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch("src.common.api_client.get_client") as mock_client:
             mock_exception = httpx.HTTPStatusError(
                 "403 Forbidden",
                 request=Mock(),
                 response=mock_response
             )
-            mock_client.return_value.__aenter__.return_value.request = AsyncMock(
+            mock_client.return_value.request = AsyncMock(
                 side_effect=mock_exception
             )
 
@@ -101,13 +107,13 @@ class TestApiClient:
         mock_response.status_code = 401
         mock_response.json.return_value = {"error": {}}
 
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch("src.common.api_client.get_client") as mock_client:
             mock_exception = httpx.HTTPStatusError(
                 "401 Unauthorized",
                 request=Mock(),
                 response=mock_response
             )
-            mock_client.return_value.__aenter__.return_value.request = AsyncMock(
+            mock_client.return_value.request = AsyncMock(
                 side_effect=mock_exception
             )
 
@@ -121,12 +127,12 @@ class TestApiClient:
         token = BzmApimToken("test_token")
 
         mock_response = Mock()
-        mock_response.json.return_value = {"data": [], "error": None}
+        mock_response.content = json.dumps({"data": [], "error": None}).encode()
         mock_response.raise_for_status = Mock()
 
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch("src.common.api_client.get_client") as mock_client:
             mock_request = AsyncMock(return_value=mock_response)
-            mock_client.return_value.__aenter__.return_value.request = mock_request
+            mock_client.return_value.request = mock_request
 
             await api_request(token, "GET", "/test/endpoint")
 
@@ -142,12 +148,12 @@ class TestApiClient:
         token = BzmApimToken("test_token")
 
         mock_response = Mock()
-        mock_response.json.return_value = {"data": [], "error": None}
+        mock_response.content = json.dumps({"data": [], "error": None}).encode()
         mock_response.raise_for_status = Mock()
 
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch("src.common.api_client.get_client") as mock_client:
             mock_request = AsyncMock(return_value=mock_response)
-            mock_client.return_value.__aenter__.return_value.request = mock_request
+            mock_client.return_value.request = mock_request
 
             params = {"limit": 10, "offset": 0}
             await api_request(token, "GET", "/test/endpoint", params=params)
@@ -161,15 +167,15 @@ class TestApiClient:
         token = BzmApimToken("test_token")
 
         mock_response = Mock()
-        mock_response.json.return_value = {
+        mock_response.content = json.dumps({
             "data": {"id": "new_123", "name": "Created"},
             "error": None
-        }
+        }).encode()
         mock_response.raise_for_status = Mock()
 
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch("src.common.api_client.get_client") as mock_client:
             mock_request = AsyncMock(return_value=mock_response)
-            mock_client.return_value.__aenter__.return_value.request = mock_request
+            mock_client.return_value.request = mock_request
 
             json_body = {"name": "Test", "description": "Test description"}
             await api_request(token, "POST", "/test/endpoint", json=json_body)
@@ -183,11 +189,11 @@ class TestApiClient:
         token = BzmApimToken("test_token")
 
         mock_response = Mock()
-        mock_response.json.return_value = {"data": [{"id": "1"}], "error": None}
+        mock_response.content = json.dumps({"data": [{"id": "1"}], "error": None}).encode()
         mock_response.raise_for_status = Mock()
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.request = AsyncMock(
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_client.return_value.request = AsyncMock(
                 return_value=mock_response
             )
 
@@ -196,22 +202,38 @@ class TestApiClient:
 
             assert result.hint == hints
 
+    async def test_api_request_rejects_unknown_fields_before_sending(self):
+        """Test unknown fields are returned as an error without calling the API"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            result = await api_request(
+                token,
+                "GET",
+                "/buckets",
+                result_formatter=format_buckets,
+                result_formatter_params={"fields": ["nope"]},
+            )
+
+            mock_client.assert_not_called()
+            assert result.error.startswith("Unknown field 'nope' for Bucket. Available fields: bucket_key")
+
     async def test_api_request_pagination_has_more(self):
         """Test API request correctly calculates has_more flag"""
         token = BzmApimToken("test_token")
 
         mock_response = Mock()
-        mock_response.json.return_value = {
+        mock_response.content = json.dumps({
             "data": [{"id": "1"}],
             "error": None,
             "total": 100,
             "skip": 0,
             "limit": 10
-        }
+        }).encode()
         mock_response.raise_for_status = Mock()
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.request = AsyncMock(
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_client.return_value.request = AsyncMock(
                 return_value=mock_response
             )
 
@@ -220,3 +242,771 @@ class TestApiClient:
             assert result.has_more is True
             assert result.total == 100
 
+
+
+@pytest.mark.asyncio
+class TestSharedClient:
+    """Test cases for the process-wide pooled client"""
+
+    async def test_get_client_reuses_instance(self):
+        """Test the shared client is created once and reused"""
+        await close_client()
+        client = get_client()
+        try:
+            assert get_client() is client
+            assert str(client.base_url).startswith("https://api.runscope.com")
+        finally:
+            await close_client()
+
+    async def test_close_client_recreates_on_next_use(self):
+        """Test a closed client is replaced on the next call"""
+        client = get_client()
+        await close_client()
+
+        assert client.is_closed
+        assert api_client._client is None
+        new_client = get_client()
+        assert new_client is not client
+        await close_client()
+
+    async def test_client_lifespan_opens_and_closes(self):
+        """Test the FastMCP lifespan manages the shared client"""
+        await close_client()
+        async with client_lifespan(Mock()):
+            client = api_client._client
+            assert client is not None
+            assert not client.is_closed
+
+        assert client.is_closed
+        assert api_client._client is None
+
+    async def test_client_lifespan_starts_jobs_in_background(self, monkeypatch):
+        """Test startup jobs do not delay the lifespan and are cancelled at shutdown"""
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def job():
+            started.set()
+            await release.wait()
+
+        monkeypatch.setattr(api_client, "_startup_jobs", [])
+        api_client.on_startup(job)
+        async with client_lifespan(Mock()):
+            assert not started.is_set()
+            await asyncio.wait_for(started.wait(), 1)
+
+        assert not release.is_set()
+        assert api_client._client is None
+
+    async def test_invalid_pool_settings_fall_back_to_defaults(self, monkeypatch):
+        """Test a pool setting that is not a number keeps its default instead of failing the import"""
+        from src.config import defaults
+
+        monkeypatch.setenv("BZM_API_TEST_MAX_CONNECTIONS", "twenty")
+        monkeypatch.setenv("BZM_API_TEST_KEEPALIVE_EXPIRY", "30.5")
+
+        assert defaults._env_number("BZM_API_TEST_MAX_CONNECTIONS", 20) == 20
+        assert defaults._env_number("BZM_API_TEST_KEEPALIVE_EXPIRY", 60.0, float) == 30.5
+        assert defaults._env_number("BZM_API_TEST_UNSET_SETTING", 4) == 4
+
+    async def test_api_requests_share_client(self, monkeypatch):
+        """Test consecutive requests go through the same client instance"""
+        token = BzmApimToken("test_token")
+        await close_client()
+        built, sent = [], []
+
+        def _build_client(*args, **kwargs):
+            client = httpx.AsyncClient(
+                base_url="https://api.runscope.com",
+                transport=httpx.MockTransport(
+                    lambda request: sent.append((client, request.url.path))
+                    or httpx.Response(200, json={"data": [], "error": None})
+                ),
+            )
+            built.append(client)
+            return client
+
+        monkeypatch.setattr(api_client, "build_client", _build_client)
+
+        await api_request(token, "GET", "/account", use_cache=False)
+        await api_request(token, "GET", "/buckets", use_cache=False)
+
+        assert len(built) == 1
+        assert [path for _, path in sent] == ["/account", "/buckets"]
+        assert all(client is built[0] for client, _ in sent)
+        assert api_client._client is built[0] and not built[0].is_closed
+        await close_client()
+
+
+@pytest.mark.asyncio
+class TestHttp2Transport:
+    """Test cases for the opt-in HTTP/2 transport"""
+
+    async def test_build_client_without_h2_package_uses_http1(self):
+        """Test HTTP/2 mode degrades to HTTP/1.1 when h2 is not installed"""
+        with patch("src.common.api_client.http2_available", return_value=False):
+            client = api_client.build_client(http2=True)
+
+        assert client not in api_client._http2_clients
+
+    async def test_build_client_http2_is_tracked(self):
+        """Test clients built in HTTP/2 mode are tracked for fallback"""
+        client = api_client.build_client(http2=True)
+
+        assert client in api_client._http2_clients
+
+    async def test_protocol_error_falls_back_to_http1_and_retries_get(self, monkeypatch):
+        """Test a failed HTTP/2 negotiation replays an idempotent request over HTTP/1.1"""
+        h2_client = Mock()
+        h2_client.request = AsyncMock(side_effect=httpx.RemoteProtocolError("h2 negotiation failed"))
+        h2_client.aclose = AsyncMock()
+        api_client._http2_clients.add(h2_client)
+        h1_client = Mock()
+        h1_client.request = AsyncMock(return_value="response")
+        monkeypatch.setattr(api_client, "_client", h2_client)
+        monkeypatch.setattr(api_client, "_http2_fallback", False)
+
+        with patch("src.common.api_client.get_client", side_effect=[h2_client, h1_client]):
+            response = await api_client._send("GET", "/account")
+
+        assert response == "response"
+        assert api_client._http2_fallback is True
+        h2_client.aclose.assert_awaited_once()
+
+    async def test_protocol_error_does_not_retry_post(self, monkeypatch):
+        """Test non-idempotent requests are not replayed after the fallback"""
+        h2_client = Mock()
+        h2_client.request = AsyncMock(side_effect=httpx.RemoteProtocolError("h2 negotiation failed"))
+        h2_client.aclose = AsyncMock()
+        api_client._http2_clients.add(h2_client)
+        monkeypatch.setattr(api_client, "_client", h2_client)
+        monkeypatch.setattr(api_client, "_http2_fallback", False)
+
+        with patch("src.common.api_client.get_client", return_value=h2_client):
+            with pytest.raises(httpx.RemoteProtocolError):
+                await api_client._send("POST", "/buckets")
+
+        assert api_client._http2_fallback is True
+
+    async def test_protocol_error_does_not_replay_trigger(self, monkeypatch):
+        """Test GET requests marked as not idempotent are not replayed after the fallback"""
+        h2_client = Mock()
+        h2_client.request = AsyncMock(side_effect=httpx.RemoteProtocolError("h2 negotiation failed"))
+        h2_client.aclose = AsyncMock()
+        api_client._http2_clients.add(h2_client)
+        monkeypatch.setattr(api_client, "_client", h2_client)
+        monkeypatch.setattr(api_client, "_http2_fallback", False)
+
+        with patch("src.common.api_client.get_client", return_value=h2_client):
+            with pytest.raises(httpx.RemoteProtocolError):
+                await api_client._send("GET", "/radar/abc/trigger", idempotent=False)
+
+        assert h2_client.request.call_count == 1
+
+    async def test_protocol_error_on_established_http2_client_is_raised(self, monkeypatch):
+        """Test a GOAWAY or reset stream after responses were received keeps HTTP/2"""
+        h2_client = Mock()
+        h2_client.request = AsyncMock(side_effect=["response", httpx.RemoteProtocolError("GOAWAY")])
+        h2_client.aclose = AsyncMock()
+        api_client._http2_clients.add(h2_client)
+        monkeypatch.setattr(api_client, "_client", h2_client)
+        monkeypatch.setattr(api_client, "_http2_fallback", False)
+
+        with patch("src.common.api_client.get_client", return_value=h2_client):
+            assert await api_client._send("GET", "/account") == "response"
+            with pytest.raises(httpx.RemoteProtocolError):
+                await api_client._send("GET", "/account")
+
+        assert api_client._http2_fallback is False
+        assert api_client._client is h2_client
+        h2_client.aclose.assert_not_called()
+
+    async def test_fallback_closes_http2_client_once_idle(self, monkeypatch):
+        """Test requests still in flight on the replaced HTTP/2 client are not aborted"""
+        release = asyncio.Event()
+
+        async def _request(method, endpoint, **kwargs):
+            if method == "PUT":
+                await release.wait()
+                return "updated"
+            raise httpx.RemoteProtocolError("h2 negotiation failed")
+
+        h2_client = Mock()
+        h2_client.request = AsyncMock(side_effect=_request)
+        h2_client.aclose = AsyncMock()
+        api_client._http2_clients.add(h2_client)
+        h1_client = Mock()
+        h1_client.request = AsyncMock(return_value="response")
+        monkeypatch.setattr(api_client, "_client", h2_client)
+        monkeypatch.setattr(api_client, "_http2_fallback", False)
+
+        with patch("src.common.api_client.get_client", side_effect=[h2_client, h2_client, h1_client]):
+            put = asyncio.ensure_future(api_client._send("PUT", "/buckets/abc/tests/t1"))
+            await asyncio.sleep(0)
+            assert await api_client._send("GET", "/account") == "response"
+            h2_client.aclose.assert_not_called()
+
+            release.set()
+            assert await put == "updated"
+
+        h2_client.aclose.assert_awaited_once()
+
+    async def test_protocol_error_on_http1_client_is_raised(self):
+        """Test protocol errors are not swallowed when HTTP/2 is not in use"""
+        h1_client = Mock()
+        h1_client.request = AsyncMock(side_effect=httpx.RemoteProtocolError("server disconnected"))
+
+        with patch("src.common.api_client.get_client", return_value=h1_client):
+            with pytest.raises(httpx.RemoteProtocolError):
+                await api_client._send("GET", "/account")
+
+
+def _response(status_code, json_data=None, headers=None, method="GET"):
+    return httpx.Response(
+        status_code,
+        json=json_data if json_data is not None else {"data": [], "error": None},
+        headers=headers,
+        request=httpx.Request(method, "https://api.runscope.com/test/endpoint"),
+    )
+
+
+@pytest.mark.asyncio
+class TestRetries:
+    """Test cases for retry and backoff of rate limited and failed requests"""
+
+    @pytest.fixture(autouse=True)
+    def no_backoff(self, monkeypatch):
+        monkeypatch.setattr(api_client, "_backoff_delay", lambda attempt: 0)
+
+    async def test_get_retried_after_429(self):
+        """Test a rate limited GET is retried and succeeds"""
+        token = BzmApimToken("test_token")
+        responses = [
+            _response(429, {"error": "rate limited"}, headers={"Retry-After": "0"}),
+            _response(200, {"data": [{"id": "1"}], "error": None}),
+        ]
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(side_effect=responses)
+            mock_client.return_value.request = mock_request
+
+            result = await api_request(token, "GET", "/test/endpoint")
+
+            assert result.error is None
+            assert result.result[0]["id"] == "1"
+            assert mock_request.call_count == 2
+
+    async def test_get_retried_on_server_error(self):
+        """Test a GET failing with 503 is retried"""
+        token = BzmApimToken("test_token")
+        responses = [_response(503), _response(502), _response(200, {"data": [{"id": "1"}]})]
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(side_effect=responses)
+            mock_client.return_value.request = mock_request
+
+            result = await api_request(token, "GET", "/test/endpoint")
+
+            assert result.error is None
+            assert mock_request.call_count == 3
+
+    async def test_get_retried_on_transport_error(self):
+        """Test a GET failing with a connection error is retried"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(side_effect=[httpx.ConnectError("reset"), _response(200)])
+            mock_client.return_value.request = mock_request
+
+            result = await api_request(token, "GET", "/test/endpoint")
+
+            assert result.error is None
+            assert mock_request.call_count == 2
+
+    async def test_post_is_never_retried(self):
+        """Test non-idempotent requests are sent only once"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(return_value=_response(503, method="POST"))
+            mock_client.return_value.request = mock_request
+
+            result = await api_request(token, "POST", "/test/endpoint", json={"step_type": "request"})
+
+            assert mock_request.call_count == 1
+            assert "HTTP 503" in result.error
+            assert any("not retried" in hint for hint in result.hint)
+
+    async def test_non_idempotent_get_is_never_retried(self):
+        """Test a trigger request failing with 503 is sent only once"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(side_effect=[_response(503), httpx.ReadTimeout("timed out")])
+            mock_client.return_value.request = mock_request
+
+            result = await api_request(token, "GET", "/radar/abc/trigger", idempotent=False)
+            with pytest.raises(httpx.ReadTimeout):
+                await api_request(token, "GET", "/radar/abc/trigger", idempotent=False)
+
+            assert mock_request.call_count == 2
+            assert "HTTP 503" in result.error
+            assert any("Verify whether it took effect" in hint for hint in result.hint)
+
+    async def test_server_errors_return_error_result(self):
+        """Test 5xx responses that are not retried still become error results"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(return_value=_response(500))
+            mock_client.return_value.request = mock_request
+
+            result = await api_request(token, "GET", "/test/endpoint")
+
+            assert mock_request.call_count == 1
+            assert result.error == "BlazeMeter API failed to process the request (HTTP 500)"
+
+    async def test_retries_exhausted_returns_error(self):
+        """Test exhausted retries return an error result instead of raising"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(return_value=_response(429, headers={"Retry-After": "0"}))
+            mock_client.return_value.request = mock_request
+
+            result = await api_request(token, "GET", "/test/endpoint")
+
+            assert mock_request.call_count == api_client.RETRY_MAX_ATTEMPTS
+            assert "Rate limit" in result.error
+            assert result.hint == ["Retry after 0 seconds."]
+
+    async def test_long_retry_after_is_not_waited(self):
+        """Test a Retry-After beyond the limit is reported instead of waited for"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(return_value=_response(429, headers={"Retry-After": "3600"}))
+            mock_client.return_value.request = mock_request
+
+            result = await api_request(token, "GET", "/test/endpoint")
+
+            assert mock_request.call_count == 1
+            assert result.hint == ["Retry after 3600 seconds."]
+        api_client.rate_limiter._blocked_until = 0.0
+
+    async def test_client_errors_are_not_retried(self):
+        """Test 4xx responses other than 429 are raised as before"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(return_value=_response(404))
+            mock_client.return_value.request = mock_request
+
+            with pytest.raises(httpx.HTTPStatusError):
+                await api_request(token, "GET", "/test/endpoint")
+
+            assert mock_request.call_count == 1
+
+    async def test_retry_after_http_date(self):
+        """Test Retry-After given as an HTTP date is parsed"""
+        resp = _response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+
+        assert api_client._retry_after_seconds(resp) == 0.0
+        assert api_client._retry_after_seconds(_response(429, headers={"Retry-After": "7"})) == 7.0
+        assert api_client._retry_after_seconds(_response(429)) is None
+
+
+BUCKETS = [
+    {
+        "key": f"bucket_{i}",
+        "name": f"Bucket {i}",
+        "created_at": 1700000000,
+        "default": i == 0,
+        "is_private": False,
+        "trigger_url": f"https://api.runscope.com/radar/bucket/{i}/trigger",
+        "team": None,
+    }
+    for i in range(3)
+]
+
+
+@pytest.mark.asyncio
+class TestResponseDecoding:
+    """Test cases for decoding responses straight into the formatter's model"""
+
+    async def test_model_formatter_matches_formatting_dicts(self):
+        """Test data validated from the response bytes is formatted as from parsed dicts"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_client.return_value.request = AsyncMock(
+                return_value=_response(200, {"data": BUCKETS, "total": 10, "skip": 0, "limit": 3})
+            )
+
+            result = await api_request(token, "GET", "/buckets", result_formatter=format_buckets)
+
+            assert result.result == format_buckets(BUCKETS)
+            assert result.total == 10
+            assert result.has_more is True
+
+    async def test_model_formatter_single_item_and_projection(self):
+        """Test a single data object is returned as a list and projected on the requested fields"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_client.return_value.request = AsyncMock(return_value=_response(200, {"data": BUCKETS[1]}))
+
+            result = await api_request(
+                token,
+                "GET",
+                "/buckets/bucket_1",
+                result_formatter=format_buckets,
+                result_formatter_params={"fields": ["bucket_key"]},
+            )
+
+            assert result.result == [{"bucket_key": "bucket_1"}]
+            assert result.total == 1
+
+    async def test_model_with_before_validator_is_formatted_from_dicts(self):
+        """Test a model needing dicts in its validator is parsed to dicts and formatted by its formatter"""
+        token = BzmApimToken("test_token")
+        environments = [make_environment(i) for i in range(2)]
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_client.return_value.request = AsyncMock(return_value=_response(200, {"data": environments}))
+
+            result = await api_request(
+                token, "GET", "/buckets/abc/environments", result_formatter=format_environments
+            )
+
+            assert not api_client.validates_json(format_environments.model)
+            assert result.result == format_environments([make_environment(i) for i in range(2)])
+            assert result.result[0]["auth_type"] == "basic"
+
+    async def test_only_large_bodies_are_validated_from_json_bytes(self, monkeypatch):
+        """Test bodies below the size threshold are formatted from dicts, larger ones from their bytes"""
+        body = json.dumps({"data": BUCKETS, "total": 3}).encode()
+
+        with patch.object(api_client, "response_model", wraps=api_client.response_model) as spy:
+            small = api_client._decode(body, format_buckets, None)
+            monkeypatch.setattr(api_client, "JSON_BYTES_DECODE_MIN_SIZE", len(body))
+            large = api_client._decode(body, format_buckets, None)
+
+        spy.assert_called_once()
+        assert small[0] == large[0] == format_buckets(BUCKETS)
+        assert small[1]["total"] == large[1]["total"] == 3
+
+    async def test_model_formatter_without_data(self):
+        """Test a response without data gives an empty result and keeps its error"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_client.return_value.request = AsyncMock(return_value=_response(200, {"error": "Not found"}))
+
+            result = await api_request(token, "GET", "/buckets/none", result_formatter=format_buckets)
+
+            assert result.result == []
+            assert result.total == 0
+            assert result.error == "Not found"
+
+
+@pytest.mark.asyncio
+class TestRequestCoalescing:
+    """Test cases for coalescing identical concurrent GET requests"""
+
+    @staticmethod
+    def _slow_request(response_factory):
+        async def _request(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return response_factory()
+
+        return AsyncMock(side_effect=_request)
+
+    async def test_identical_gets_share_one_request(self):
+        """Test concurrent identical GETs are sent upstream once"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = self._slow_request(lambda: _response(200, {"data": {"id": "test_123"}}))
+            mock_client.return_value.request = mock_request
+
+            results = await asyncio.gather(
+                *(api_request(token, "GET", "/buckets/abc/tests/test_123") for _ in range(5))
+            )
+
+            assert mock_request.call_count == 1
+            assert all(result.result == [{"id": "test_123"}] for result in results)
+            # Every caller gets its own copy of the shared result
+            assert len({id(result.result[0]) for result in results}) == 5
+
+    async def test_different_params_are_not_coalesced(self):
+        """Test GETs with different query parameters are sent separately"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = self._slow_request(lambda: _response(200))
+            mock_client.return_value.request = mock_request
+
+            await asyncio.gather(
+                api_request(token, "GET", "/buckets/abc/tests", params={"offset": 0}),
+                api_request(token, "GET", "/buckets/abc/tests", params={"offset": 50}),
+            )
+
+            assert mock_request.call_count == 2
+
+    async def test_different_tokens_are_not_coalesced(self):
+        """Test identical GETs issued with different tokens are sent separately"""
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = self._slow_request(lambda: _response(200))
+            mock_client.return_value.request = mock_request
+
+            await asyncio.gather(
+                api_request(BzmApimToken("token_a"), "GET", "/account"),
+                api_request(BzmApimToken("token_b"), "GET", "/account"),
+            )
+
+            assert mock_request.call_count == 2
+
+    async def test_posts_are_not_coalesced(self):
+        """Test concurrent POSTs are all sent"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = self._slow_request(lambda: _response(200, method="POST"))
+            mock_client.return_value.request = mock_request
+
+            await asyncio.gather(
+                *(api_request(token, "POST", "/buckets/abc/tests", json={"name": "t"}) for _ in range(3))
+            )
+
+            assert mock_request.call_count == 3
+
+    async def test_non_idempotent_gets_are_not_coalesced(self):
+        """Test concurrent calls of a trigger URL each start a run upstream"""
+        token = BzmApimToken("test_token")
+        trigger_url = "https://api.runscope.com/radar/abc/trigger"
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = self._slow_request(lambda: _response(200, {"data": {"runs_started": 1}}))
+            mock_client.return_value.request = mock_request
+
+            await asyncio.gather(
+                *(api_request(token, "GET", trigger_url, idempotent=False) for _ in range(3))
+            )
+            await api_request(token, "GET", trigger_url, idempotent=False)
+
+            assert mock_request.call_count == 4
+
+    async def test_errors_propagate_to_every_waiter(self):
+        """Test an upstream error is raised to every coalesced caller"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = self._slow_request(lambda: _response(404))
+            mock_client.return_value.request = mock_request
+
+            results = await asyncio.gather(
+                *(api_request(token, "GET", "/buckets/abc/tests/missing") for _ in range(3)),
+                return_exceptions=True,
+            )
+
+            assert mock_request.call_count == 1
+            assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+
+
+@pytest.mark.asyncio
+class TestResponseCaching:
+    """Test cases for caching of read-mostly entities"""
+
+    async def test_repeated_read_is_served_from_cache(self):
+        """Test a second read of a cacheable entity does not hit the API"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(side_effect=lambda *a, **kw: _response(200, {"data": [{"key": "abc"}]}))
+            mock_client.return_value.request = mock_request
+
+            first = await api_request(token, "GET", "/buckets")
+            first.result[0]["key"] = "modified by caller"
+            second = await api_request(token, "GET", "/buckets")
+
+            assert mock_request.call_count == 1
+            assert second.result == [{"key": "abc"}]
+
+    async def test_uncacheable_entities_are_always_fetched(self):
+        """Test results are not cached"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(side_effect=lambda *a, **kw: _response(200))
+            mock_client.return_value.request = mock_request
+
+            await api_request(token, "GET", "/buckets/abc/tests/t1/results")
+            await api_request(token, "GET", "/buckets/abc/tests/t1/results")
+
+            assert mock_request.call_count == 2
+
+    async def test_use_cache_false_bypasses_cache(self):
+        """Test use_cache=False always reads the current state"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(side_effect=lambda *a, **kw: _response(200))
+            mock_client.return_value.request = mock_request
+
+            await api_request(token, "GET", "/buckets/abc/tests/t1/steps/s1")
+            await api_request(token, "GET", "/buckets/abc/tests/t1/steps/s1", use_cache=False)
+
+            assert mock_request.call_count == 2
+
+    async def test_cache_is_keyed_by_token_and_params(self):
+        """Test different tokens and query parameters are cached separately"""
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(side_effect=lambda *a, **kw: _response(200))
+            mock_client.return_value.request = mock_request
+
+            await api_request(BzmApimToken("token_a"), "GET", "/buckets/abc/tests", params={"offset": 0})
+            await api_request(BzmApimToken("token_b"), "GET", "/buckets/abc/tests", params={"offset": 0})
+            await api_request(BzmApimToken("token_a"), "GET", "/buckets/abc/tests", params={"offset": 50})
+            await api_request(BzmApimToken("token_a"), "GET", "/buckets/abc/tests", params={"offset": 0})
+
+            assert mock_request.call_count == 3
+
+    async def test_errors_are_not_cached(self):
+        """Test error results are fetched again"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(side_effect=lambda *a, **kw: _response(200, {"data": [], "error": "x"}))
+            mock_client.return_value.request = mock_request
+
+            await api_request(token, "GET", "/buckets")
+            await api_request(token, "GET", "/buckets")
+
+            assert mock_request.call_count == 2
+
+    async def test_write_invalidates_cached_reads(self):
+        """Test adding a step invalidates the cached steps and test detail"""
+        token = BzmApimToken("test_token")
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(side_effect=lambda *a, **kw: _response(200))
+            mock_client.return_value.request = mock_request
+
+            await api_request(token, "GET", "/buckets/abc/tests/t1/steps")
+            await api_request(token, "GET", "/buckets/abc/tests/t1")
+            await api_request(token, "POST", "/buckets/abc/tests/t1/steps", json={"step_type": "pause"})
+            await api_request(token, "GET", "/buckets/abc/tests/t1/steps")
+            await api_request(token, "GET", "/buckets/abc/tests/t1")
+
+            assert mock_request.call_count == 5
+
+    async def test_stale_entry_is_served_while_revalidating(self):
+        """Test a stale entry is returned immediately and refreshed in the background"""
+        token = BzmApimToken("test_token")
+        responses = iter([_response(200, {"data": [{"v": 1}]}), _response(200, {"data": [{"v": 2}]})])
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(side_effect=lambda *a, **kw: next(responses))
+            mock_client.return_value.request = mock_request
+
+            await api_request(token, "GET", "/buckets")
+            for entry in api_client.response_cache._entries.values():
+                entry.stored_at -= entry.ttl + 1
+
+            stale = await api_request(token, "GET", "/buckets")
+            await asyncio.gather(*api_client._revalidations)
+            fresh = await api_request(token, "GET", "/buckets")
+
+            assert stale.result == [{"v": 1}]
+            assert fresh.result == [{"v": 2}]
+            assert mock_request.call_count == 2
+
+    async def test_read_racing_a_write_is_not_cached(self):
+        """Test a response fetched before a write is not stored after it"""
+        token = BzmApimToken("test_token")
+
+        async def _request(method, *args, **kwargs):
+            if method == "GET":
+                await api_request(token, "PUT", "/buckets/abc/tests/t1", json={})
+            return _response(200)
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_client.return_value.request = AsyncMock(side_effect=_request)
+
+            await api_request(token, "GET", "/buckets/abc/tests/t1")
+
+            assert len(api_client.response_cache) == 0
+
+    async def test_not_modified_reuses_cached_result(self):
+        """Test an expired entry is revalidated with If-None-Match and a 304 skips decoding and formatting"""
+        token = BzmApimToken("test_token")
+        formatted = []
+
+        def formatter(result, params):
+            formatted.append(result)
+            return result
+
+        responses = iter(
+            [
+                _response(200, {"data": [{"id": "r1"}], "error": None}, headers={"ETag": '"v1"'}),
+                httpx.Response(304, request=httpx.Request("GET", "https://api.runscope.com/test/endpoint")),
+            ]
+        )
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(side_effect=lambda *a, **kw: next(responses))
+            mock_client.return_value.request = mock_request
+
+            first = await api_request(token, "GET", "/buckets/abc/tests/t1/results", result_formatter=formatter)
+            second = await api_request(token, "GET", "/buckets/abc/tests/t1/results", result_formatter=formatter)
+
+            assert mock_request.call_count == 2
+            assert "If-None-Match" not in mock_request.call_args_list[0][1]["headers"]
+            assert mock_request.call_args_list[1][1]["headers"]["If-None-Match"] == '"v1"'
+            assert len(formatted) == 1
+            assert second.result == first.result == [{"id": "r1"}]
+
+    async def test_changed_resource_replaces_cached_result(self):
+        """Test a 200 to a conditional request stores the new result and ETag"""
+        token = BzmApimToken("test_token")
+        responses = iter(
+            [
+                _response(200, {"data": [{"v": 1}], "error": None}, headers={"ETag": '"v1"'}),
+                _response(200, {"data": [{"v": 2}], "error": None}, headers={"ETag": '"v2"'}),
+            ]
+        )
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(side_effect=lambda *a, **kw: next(responses))
+            mock_client.return_value.request = mock_request
+
+            await api_request(token, "GET", "/buckets/abc/tests/t1/metrics")
+            result = await api_request(token, "GET", "/buckets/abc/tests/t1/metrics")
+
+            assert result.result == [{"v": 2}]
+            assert [entry.etag for entry in api_client.response_cache._entries.values()] == ['"v2"']
+
+    async def test_expired_entry_with_etag_is_revalidated_in_foreground(self):
+        """Test an entry past its stale window is revalidated before it is returned"""
+        token = BzmApimToken("test_token")
+        responses = iter(
+            [
+                _response(200, {"data": [{"key": "abc"}], "error": None}, headers={"ETag": '"v1"'}),
+                httpx.Response(304, request=httpx.Request("GET", "https://api.runscope.com/test/endpoint")),
+            ]
+        )
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_request = AsyncMock(side_effect=lambda *a, **kw: next(responses))
+            mock_client.return_value.request = mock_request
+
+            await api_request(token, "GET", "/buckets")
+            for entry in api_client.response_cache._entries.values():
+                entry.stored_at -= 3600
+
+            result = await api_request(token, "GET", "/buckets")
+
+            assert mock_request.call_count == 2
+            assert not api_client._revalidations
+            assert result.result == [{"key": "abc"}]
+            assert all(entry.age < 1 for entry in api_client.response_cache._entries.values())
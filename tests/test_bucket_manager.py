@@ -72,3 +72,17 @@ class TestBucketManager:
             assert result.error is None
             assert len(result.result) == 2
 
+
+    async def test_create_bucket_invalidates_cached_teams(self, mock_token, mock_context):
+        """Test creating a bucket drops cached team details listing buckets"""
+        from src.common.api_client import response_cache
+
+        manager = BucketManager(mock_token, mock_context)
+        response_cache.set("team", "/teams/team_123", BaseResult(result=[]), 300)
+
+        with patch("src.tools.bucket_manager.api_request") as mock_api:
+            mock_api.return_value = BaseResult(result=[{"key": "new_bucket"}], total=1)
+
+            await manager.create("New Bucket", "team_123")
+
+        assert response_cache.get("team") is None
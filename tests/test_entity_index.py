@@ -0,0 +1,79 @@
+"""
+Unit tests for the entity index and its fuzzy name matching
+"""
+from src.common.entity_index import EntityIndex, match_score, query_tokens, word_similarity
+
+
+def _index():
+    index = EntityIndex()
+    index.set_directory(
+        {"team_pay": "Payments", "team_web": "Web"},
+        [
+            {"bucket_key": "b_pay", "name": "Payments API", "team_id": "team_pay"},
+            {"bucket_key": "b_web", "name": "Storefront", "team_id": "team_web"},
+        ],
+    )
+    index.set_tests(
+        "b_pay",
+        [
+            {"test_id": "t1", "name": "Checkout smoke test", "trigger_url": "https://t/t1"},
+            {"test_id": "t2", "name": "Refunds regression", "trigger_url": "https://t/t2"},
+        ],
+    )
+    index.set_tests(
+        "b_web", [{"test_id": "t3", "name": "Checkout smoke test", "trigger_url": "https://t/t3"}]
+    )
+    return index
+
+
+class TestNameMatching:
+    """Test cases for scoring names against a query"""
+
+    def test_query_tokens_drop_stop_words(self):
+        assert query_tokens("Checkout smoke test in the Payments team") == (
+            "checkout",
+            "smoke",
+            "test",
+            "payments",
+            "team",
+        )
+
+    def test_word_similarity(self):
+        assert word_similarity("checkout", ("checkout",)) == 1.0
+        assert word_similarity("pay", ("payments",)) == 0.9
+        assert 0.72 <= word_similarity("chekout", ("checkout",)) < 0.9
+        assert word_similarity("refund", ("checkout", "smoke")) == 0.0
+
+    def test_unmatched_kind_words_are_ignored(self):
+        assert match_score(("checkout", "test"), [(("checkout",), 1.0)]) == 1.0
+        assert match_score(("checkout", "smoke"), [(("checkout",), 1.0)]) == 0.5
+
+
+class TestEntityIndex:
+    """Test cases for EntityIndex"""
+
+    def test_search_ranks_test_of_named_team_first(self):
+        matches = _index().search("checkout smoke test in payments team")
+
+        assert matches[0]["kind"] == "test"
+        assert matches[0]["test_id"] == "t1"
+        assert matches[0]["bucket_key"] == "b_pay"
+        assert matches[0]["team_name"] == "Payments"
+        assert matches[0]["trigger_url"] == "https://t/t1"
+        assert matches[1]["test_id"] == "t3"
+
+    def test_search_filters_kinds_and_min_score(self):
+        matches = _index().search("payments", kinds=["bucket", "team"], min_score=0.8)
+
+        assert [(match["kind"], match["score"]) for match in matches] == [("team", 1.0), ("bucket", 1.0)]
+
+    def test_stale_buckets_and_dropped_buckets(self):
+        index = _index()
+        assert index.stale_buckets(ttl=60) == []
+        assert index.stale_buckets(ttl=0) == ["b_pay", "b_web"]
+
+        index.set_directory({"team_pay": "Payments"}, [{"bucket_key": "b_pay", "name": "Payments API"}])
+
+        assert set(index.tests) == {"b_pay"}
+        assert index.stale_buckets(ttl=60) == []
+        assert len(index) == 4
@@ -0,0 +1,70 @@
+"""
+Unit tests for the flakiness of tests
+"""
+from src.common.flakiness import assertion_flips, flakiness
+
+
+def _runs(results: str, region: str = "us1", gap: float = 3600) -> list:
+    return [
+        {"result": "pass" if result == "P" else "fail", "region": region, "started_at": i * gap}
+        for i, result in enumerate(results)
+    ]
+
+
+def _assertion(result: str, property: str = "$.status") -> dict:
+    return {"step_id": "s1", "url": "https://x", "source": "response_json", "property": property,
+            "comparison": "equal", "result": result}
+
+
+class TestFlakiness:
+    """Test cases for flakiness"""
+
+    def test_steady_tests_are_not_flaky(self):
+        """Test tests that always pass or always fail score 0"""
+        assert flakiness(_runs("PPPP"), 900)["score"] == 0
+        assert flakiness(_runs("FFFF"), 900)["score"] == 0
+        assert flakiness([], 900)["score"] == 0
+
+    def test_alternating_results_score_higher(self):
+        """Test a test alternating between pass and fail scores above one that broke once"""
+        alternating = flakiness(_runs("PFPFPF"), 900)
+        broke = flakiness(_runs("PPPFFF"), 900)
+
+        assert alternating["flips"] == 5 and alternating["flip_rate"] == 1.0
+        assert alternating["score"] > broke["score"] > 0
+
+    def test_failures_passing_on_retry(self):
+        """Test a failure followed by a pass within the retry window counts as passing on retry"""
+        runs = _runs("PFP", gap=60)
+        runs[2]["started_at"] = 10000
+
+        assert flakiness(_runs("PFP", gap=60), 900)["retry_passes"] == 1
+        assert flakiness(runs, 900)["retry_passes"] == 0
+
+    def test_failures_isolated_to_one_region(self):
+        """Test failures only in one region while other regions pass are flagged"""
+        runs = _runs("PFPF", "eu1") + _runs("PPPP", "us1")
+        runs.sort(key=lambda run: run["started_at"])
+
+        score = flakiness(runs, 900)
+
+        assert score["failing_regions"] == ["eu1"]
+        assert score["region_isolated"] is True
+
+
+class TestAssertionFlips:
+    """Test cases for assertion_flips"""
+
+    def test_passed_runs_count_as_passing_assertions(self):
+        """Test passed runs are not read, their assertions count as passing"""
+        flips = assertion_flips(
+            [None, [_assertion("fail"), _assertion("pass", "$.id")], None, [_assertion("fail")]]
+        )
+
+        assert flips[0]["property"] == "$.status"
+        assert (flips[0]["flips"], flips[0]["failures"]) == (3, 2)
+        assert (flips[1]["flips"], flips[1]["failures"]) == (0, 0)
+
+    def test_no_runs(self):
+        """Test no assertions are returned without failed runs"""
+        assert assertion_flips([None, None]) == []
@@ -0,0 +1,291 @@
+"""
+Unit tests for the shared formatting engine
+"""
+import pytest
+from pydantic import ValidationError
+
+from benchmarks.bench_formatters import make_result
+from src.formatters.base import (
+    fields_error,
+    fields_params,
+    format_models,
+    has_model_lists,
+    include_spec,
+    list_adapter,
+)
+from src.formatters.bucket import format_buckets
+from src.formatters.result import (
+    format_bucket_level_run_summaries,
+    format_result_requests,
+    format_result_summaries,
+    format_results,
+    format_triggered_runs,
+)
+from src.formatters.test import downsample_points, format_test_metrics, format_tests
+from src.models.bucket import Bucket
+from src.models import result as result_models
+from src.config.defaults import RESULT_SUMMARY_MAX_FAILED_REQUESTS
+
+
+class TestFormatModels:
+    """Test cases for format_models"""
+
+    def test_matches_per_item_formatting(self):
+        """Test formatting of nested results matches formatting them one by one"""
+        results = [make_result(i, 3) for i in range(5)]
+
+        assert format_results(results) == [result_models.TestResult(**r).model_dump(by_alias=False) for r in results]
+
+    def test_dumps_field_names_not_aliases(self):
+        """Test aliased API fields are returned under their model field names"""
+        bucket = {
+            "key": "bucket_abc",
+            "name": "Bucket",
+            "created_at": 1700000000,
+            "default": False,
+            "is_private": False,
+            "trigger_url": "https://api.runscope.com/radar/bucket/abc/trigger",
+            "team": None,
+        }
+        run = {
+            "runs_id": "r1",
+            "consolidated_test_results_url": None,
+            "runs_started": 1,
+            "runs_failed": 0,
+            "runs_total": 1,
+            "runs": [],
+        }
+
+        assert format_buckets([bucket])[0]["bucket_key"] == "bucket_abc"
+        assert format_triggered_runs([run])[0]["bucket_level_test_run_id"] == "r1"
+        assert format_triggered_runs([run]) == [result_models.TestExecution(**run).model_dump(by_alias=False)]
+
+    def test_adapter_is_built_once_per_model(self):
+        """Test the list validator is cached per model"""
+        assert list_adapter(Bucket) is list_adapter(Bucket)
+        assert list_adapter(Bucket) is not list_adapter(result_models.TestResult)
+
+    def test_only_models_without_model_lists_are_batched(self):
+        """Test models with lists of nested models are formatted one item at a time"""
+        assert has_model_lists(result_models.TestResult)
+        assert not has_model_lists(Bucket)
+        assert not has_model_lists(result_models.StepLatency)
+
+    def test_invalid_item_raises(self):
+        """Test an item missing required fields fails validation"""
+        with pytest.raises(ValidationError):
+            format_models(Bucket, [{"key": "bucket_abc"}])
+
+    def test_empty_list(self):
+        """Test formatting nothing returns an empty list"""
+        assert format_models(result_models.TestResult, []) == []
+
+
+class TestFieldProjection:
+    """Test cases for projecting formatted results on a list of fields"""
+
+    def test_include_spec_from_dotted_paths(self):
+        """Test dotted paths become a nested include spec, with list fields applied to every item"""
+        spec = include_spec(result_models.TestResult, ("result", "requests.url", "requests.assertions.result"))
+
+        assert spec == {
+            "result": True,
+            "requests": {"__all__": {"url": True, "assertions": {"__all__": {"result": True}}}},
+        }
+
+    def test_projects_nested_results(self):
+        """Test only the requested fields of each result and request are returned"""
+        results = [make_result(i, 2) for i in range(3)]
+
+        formatted = format_results(results, fields_params(["test_run_id", "requests.url"]))
+
+        assert formatted[0] == {
+            "test_run_id": "run_0",
+            "requests": [{"url": "https://example.com/api/items/0"}, {"url": "https://example.com/api/items/1"}],
+        }
+        assert len(formatted) == 3
+
+    def test_projects_field_names_and_missing_nested_values(self):
+        """Test fields are named as in the output and a missing nested object stays None"""
+        test = {
+            "id": "test_1",
+            "name": "Test 1",
+            "default_environment_id": "env_1",
+            "trigger_url": "https://api.runscope.com/radar/test_1/trigger",
+            "created_by": {"id": "u1", "email": "u1@example.com", "name": "User"},
+            "created_at": 1700000000,
+            "last_run": None,
+        }
+
+        assert format_tests([test], fields_params(["test_id", "last_run.status"])) == [
+            {"test_id": "test_1", "last_run": None}
+        ]
+
+    def test_unknown_field_raises(self):
+        """Test an unknown field is reported with the available fields"""
+        with pytest.raises(ValueError, match="Unknown field 'nope' for Bucket"):
+            format_models(Bucket, [], fields_params(["nope"]))
+
+    def test_fields_error_checks_formatter_model(self):
+        """Test unknown fields are found from the model of a formats or projects formatter"""
+        assert fields_error(format_buckets, fields_params(["name"])) is None
+        assert fields_error(format_result_summaries, fields_params(["failed_requests.url"])) is None
+        error = fields_error(format_test_metrics, fields_params(["nope"]))
+        assert error.startswith("Unknown field 'nope' for TestMetrics")
+        assert fields_error(format_buckets, None) is None
+
+    def test_no_fields_returns_everything(self):
+        """Test empty or missing fields do not project the result"""
+        assert fields_params(None) is None
+        assert fields_params([]) is None
+        assert fields_params(("a", "b")) == {"fields": ["a", "b"]}
+
+
+def _failing_result(failed: list, requests: int = 30) -> dict:
+    result = make_result(1, requests)
+    for index in failed:
+        result["requests"][index]["result"] = "fail"
+        result["requests"][index]["assertions"][0]["result"] = "fail"
+    result["subtest_detail"] = [
+        {"name": "Login", "result": "fail", "test_uuid": "t1", "test_run_uuid": "tr1"},
+        {"name": "Search", "result": "pass", "test_uuid": "t2", "test_run_uuid": "tr2"},
+    ]
+    return result
+
+
+class TestResultSummary:
+    """Test cases for summarizing test results to their failures"""
+
+    def test_summary_lists_only_failures(self):
+        """Test the summary keeps the aggregates and only failed requests, assertions and subtests"""
+        summary = format_result_summaries([_failing_result([3, 7])])[0]
+
+        assert summary["test_run_id"] == "run_1"
+        assert summary["requests_executed"] == 30
+        assert summary["requests_failed"] == 2
+        assert "requests" not in summary
+        assert [request["request_index"] for request in summary["failed_requests"]] == [3, 7]
+        assert summary["failed_requests"][0]["step_id"] == "step_3"
+        assert [assertion["source"] for assertion in summary["failed_requests"][0]["failed_assertions"]] == [
+            "response_status"
+        ]
+        assert summary["failed_subtests"] == [
+            {"name": "Login", "result": "fail", "test_id": "t1", "test_run_id": "tr1"}
+        ]
+        assert summary["next_cursor"] is None
+
+    def test_request_with_failed_scripts_is_failed(self):
+        """Test a request whose result passed but has failed scripts is listed"""
+        result = _failing_result([])
+        result["requests"][5]["scripts_failed"] = 1
+
+        assert format_result_summaries([result])[0]["failed_requests"][0]["request_index"] == 5
+
+    def test_summary_pages_failed_requests_with_cursor(self):
+        """Test failed requests past the limit are read from the next cursor"""
+        result = _failing_result(list(range(RESULT_SUMMARY_MAX_FAILED_REQUESTS + 5)))
+
+        first = format_result_summaries([result])[0]
+        second = format_result_summaries([result], {"cursor": first["next_cursor"]})[0]
+
+        assert len(first["failed_requests"]) == RESULT_SUMMARY_MAX_FAILED_REQUESTS
+        assert first["next_cursor"] == RESULT_SUMMARY_MAX_FAILED_REQUESTS
+        assert [request["request_index"] for request in second["failed_requests"]] == list(
+            range(RESULT_SUMMARY_MAX_FAILED_REQUESTS, RESULT_SUMMARY_MAX_FAILED_REQUESTS + 5)
+        )
+        assert second["next_cursor"] is None
+        assert second["requests_failed"] == RESULT_SUMMARY_MAX_FAILED_REQUESTS + 5
+
+    def test_summary_projects_fields(self):
+        """Test the summary can be projected on fields"""
+        formatted = format_result_summaries(
+            [_failing_result([2])], fields_params(["result", "failed_requests.request_index"])
+        )
+
+        assert formatted == [{"result": "fail", "failed_requests": [{"request_index": 2}]}]
+
+    def test_read_request_by_index(self):
+        """Test a single request is read with all its details, or not at all when out of range"""
+        result = _failing_result([3])
+
+        detail = format_result_requests([result], {"request_index": 3})[0]
+
+        assert detail["request_index"] == 3
+        assert detail["url"] == "https://example.com/api/items/3"
+        assert len(detail["assertions"]) == 2
+        assert format_result_requests([result], {"request_index": 30}) == []
+
+
+class TestBucketLevelRunSummary:
+    """Test cases for merging the tracked test runs of a bucket-level run"""
+
+    def test_merges_counts_and_durations(self):
+        """Test runs are counted by result and timed, with running runs left out of the duration"""
+        test_runs = [
+            {"test_run_id": "r1", "test_id": "t1", "test_name": "A", "result": "pass",
+             "started_at": 100.0, "finished_at": 103.0, "requests_failed": 0},
+            {"test_run_id": "r2", "test_id": "t2", "test_name": "B", "result": "fail",
+             "started_at": 101.0, "finished_at": 108.0, "requests_failed": 3},
+            {"test_run_id": "r3", "test_id": "t3", "test_name": "C", "result": "working",
+             "started_at": 101.0, "finished_at": None, "requests_failed": 0},
+        ]
+
+        summary = format_bucket_level_run_summaries([{"bucket_key": "bucket_abc", "test_runs": test_runs}])[0]
+
+        assert summary["status"] == "running"
+        assert summary["result"] == "fail"
+        assert (summary["test_runs_passed"], summary["test_runs_failed"], summary["test_runs_running"]) == (1, 1, 1)
+        assert summary["requests_failed"] == 3
+        assert summary["total_duration_in_sec"] == 8.0
+        assert [run["duration_in_sec"] for run in summary["test_runs"]] == [3.0, 7.0, None]
+
+    def test_all_passed(self):
+        """Test a completed run whose test runs all passed passes"""
+        test_runs = [{"test_run_id": "r1", "test_id": "t1", "test_name": "A", "result": "pass"}]
+
+        summary = format_bucket_level_run_summaries([{"bucket_key": "bucket_abc", "test_runs": test_runs}])[0]
+
+        assert (summary["status"], summary["result"], summary["total_duration_in_sec"]) == ("completed", "pass", None)
+
+
+def _metrics(points: int) -> dict:
+    return {
+        "response_times": [
+            {"timestamp": i, "avg_response_time_ms": 100.0 + i % 7, "success_ratio": 1.0} for i in range(points)
+        ],
+        "timeframe": "month",
+        "this_time_period": {},
+        "change_from_last_period": {},
+        "region": "all",
+        "environment_uuid": "all",
+    }
+
+
+class TestMetricsDownsampling:
+    """Test cases for downsampling the response times of test metrics"""
+
+    def test_keeps_spikes_dips_and_ends(self):
+        """Test the slowest and least successful points survive, in time order"""
+        points = _metrics(1000)["response_times"]
+        points[333]["avg_response_time_ms"] = 5000.0
+        points[334]["success_ratio"] = 0.2
+        points[777]["avg_response_time_ms"] = 4000.0
+
+        kept = downsample_points(points, 50)
+
+        assert len(kept) <= 50
+        timestamps = [point["timestamp"] for point in kept]
+        assert timestamps == sorted(timestamps)
+        assert {0, 333, 334, 777, 999} <= set(timestamps)
+
+    def test_short_series_and_minimum(self):
+        """Test short series are kept whole, and max_points is at least 10"""
+        points = _metrics(30)["response_times"]
+
+        assert downsample_points(points, 100) is points
+        assert 2 < len(downsample_points(points, 1)) <= 10
+
+    def test_format_test_metrics_with_max_points(self):
+        """Test max_points downsamples the series, and is ignored when not given"""
+        assert len(format_test_metrics([_metrics(500)], {"max_points": 40})[0]["response_times"]) <= 40
+        assert len(format_test_metrics([_metrics(500)])[0]["response_times"]) == 500
@@ -4,8 +4,9 @@ Integration tests for MCP Server
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
 from mcp.server.fastmcp import FastMCP
-from src.server import register_tools
+from src.server import prewarm_cache, register_tools
 from src.config.token import BzmApimToken
+from src.models import BaseResult
 
 
 @pytest.mark.asyncio
@@ -136,3 +137,43 @@ class TestMCPServerIntegration:
             )
             assert step_result.error is None
 
+
+
+@pytest.mark.asyncio
+class TestPrewarmCache:
+    """Test cases for prewarming the cache on startup"""
+
+    @staticmethod
+    def _api(calls):
+        async def _api_request(token, method, endpoint, result_formatter=None, **kwargs):
+            calls.append((endpoint, kwargs.get("params")))
+            if endpoint == "/buckets":
+                return BaseResult(result=[{"bucket_key": f"b{i}"} for i in range(5)])
+            return BaseResult(result=[])
+
+        return _api_request
+
+    async def _prewarm(self, budget):
+        calls = []
+        fake = self._api(calls)
+        with patch("src.tools.team_manager.api_request", side_effect=fake), \
+             patch("src.tools.bucket_manager.api_request", side_effect=fake), \
+             patch("src.tools.test_manager.api_request", side_effect=fake):
+            made = await prewarm_cache(BzmApimToken("test_token"), budget)
+        return made, calls
+
+    async def test_prewarm_fetches_first_pages(self):
+        """Test the account, buckets and first page of tests of each bucket are fetched"""
+        made, calls = await self._prewarm(budget=10)
+
+        assert made == 7 == len(calls)
+        assert calls[:2] == [("/account", {"include_owner": True}), ("/buckets", None)]
+        assert ("/buckets/b4/tests", {"count": 50, "offset": 0}) in calls
+
+    async def test_prewarm_respects_budget(self):
+        """Test no more requests than the budget are made"""
+        made, calls = await self._prewarm(budget=4)
+
+        assert made == 4 == len(calls)
+        assert [endpoint for endpoint, _ in calls[2:]] == ["/buckets/b0/tests", "/buckets/b1/tests"]
+        assert await prewarm_cache(None) == 0
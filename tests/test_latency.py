@@ -0,0 +1,53 @@
+"""
+Unit tests for the latency percentiles of test steps
+"""
+import random
+
+import pytest
+
+from src.common import latency
+from src.common.latency import step_percentiles
+
+
+@pytest.fixture(params=["numpy", "python"])
+def percentiles_path(request, monkeypatch):
+    """Run a test with the NumPy path and with the Python fallback"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(latency, "numpy_available", lambda: False)
+    return request.param
+
+
+class TestStepPercentiles:
+    """Test cases for step_percentiles"""
+
+    def test_interpolates_between_closest_ranks(self, percentiles_path):
+        """Test percentiles are interpolated linearly, with the maximum last"""
+        stats = step_percentiles({"step_1": [40.0, 10.0, 30.0, 20.0]})
+
+        assert stats["step_1"] == pytest.approx([25.0, 38.5, 39.7, 40.0])
+
+    def test_steps_with_different_sample_counts(self, percentiles_path):
+        """Test steps with fewer samples only use their own samples"""
+        stats = step_percentiles({"a": [5.0], "b": [1.0, 3.0], "c": []})
+
+        assert stats == {"a": [5.0, 5.0, 5.0, 5.0], "b": pytest.approx([2.0, 2.9, 2.98, 3.0])}
+
+    def test_no_samples(self, percentiles_path):
+        """Test no steps are returned without samples"""
+        assert step_percentiles({"a": []}) == {}
+
+    def test_numpy_matches_python(self, monkeypatch):
+        """Test the NumPy path returns the results of the Python fallback"""
+        pytest.importorskip("numpy")
+        rng = random.Random(7)
+        samples = {f"step_{i}": [rng.uniform(1, 900) for _ in range(rng.randint(1, 60))] for i in range(40)}
+
+        with_numpy = step_percentiles(samples)
+        monkeypatch.setattr(latency, "numpy_available", lambda: False)
+        without_numpy = step_percentiles(samples)
+
+        assert with_numpy.keys() == without_numpy.keys()
+        for step, stats in with_numpy.items():
+            assert stats == pytest.approx(without_numpy[step], abs=1e-9)
@@ -0,0 +1,54 @@
+"""
+Unit tests for the shared request budget
+"""
+import asyncio
+import time
+
+import pytest
+
+from src.common.rate_limiter import TokenBucket
+
+
+@pytest.mark.asyncio
+class TestTokenBucket:
+    """Test cases for TokenBucket"""
+
+    async def test_burst_is_not_delayed(self):
+        """Test requests within the burst capacity go through immediately"""
+        bucket = TokenBucket(rate=10, capacity=5)
+
+        assert [bucket.reserve() for _ in range(5)] == [0.0] * 5
+
+    async def test_requests_beyond_burst_are_spaced(self):
+        """Test requests beyond the capacity wait for refilled tokens in order"""
+        bucket = TokenBucket(rate=10, capacity=1)
+        bucket.reserve()
+
+        waits = [bucket.reserve() for _ in range(3)]
+
+        assert waits == sorted(waits)
+        assert waits[0] == pytest.approx(0.1, abs=0.01)
+        assert waits[2] == pytest.approx(0.3, abs=0.01)
+
+    async def test_zero_rate_disables_limit(self):
+        """Test a rate of 0 never delays requests"""
+        bucket = TokenBucket(rate=0, capacity=1)
+
+        assert all(bucket.reserve() == 0.0 for _ in range(100))
+
+    async def test_block_for_delays_all_callers(self):
+        """Test a Retry-After block holds back every caller"""
+        bucket = TokenBucket(rate=100, capacity=10)
+        bucket.block_for(0.5)
+
+        assert bucket.reserve() == pytest.approx(0.5, abs=0.05)
+        assert bucket.reserve() == pytest.approx(0.5, abs=0.05)
+
+    async def test_concurrent_acquire_shares_budget(self):
+        """Test parallel callers share one budget"""
+        bucket = TokenBucket(rate=50, capacity=2)
+
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(7)))
+
+        assert time.monotonic() - start == pytest.approx(0.1, abs=0.05)
@@ -0,0 +1,130 @@
+"""
+Unit tests for the response cache
+"""
+import pytest
+
+from src.common.response_cache import ResponseCache, entity_type, path_segments
+
+TTLS = {"buckets": 60, "tests": 30, "steps": 30, "account": 300}
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache"""
+
+    def test_path_segments_normalizes_urls(self):
+        """Test relative paths, absolute URLs and the /v1 prefix map to the same segments"""
+        expected = ("buckets", "abc", "tests", "t1", "schedules")
+
+        assert path_segments("/buckets/abc/tests/t1/schedules") == expected
+        assert path_segments("/v1/buckets/abc/tests/t1/schedules") == expected
+        assert path_segments("https://api.runscope.com/buckets/abc/tests/t1/schedules?x=1") == expected
+
+    def test_entity_type(self):
+        """Test the entity type is the innermost collection of the path"""
+        assert entity_type("/account") == "account"
+        assert entity_type("/buckets") == "buckets"
+        assert entity_type("/buckets/abc") == "buckets"
+        assert entity_type("/buckets/abc/tests") == "tests"
+        assert entity_type("/buckets/abc/tests/t1/steps/s1") == "steps"
+        assert entity_type("/buckets/abc/tests/t1/metrics") == "metrics"
+
+    def test_ttl_only_for_configured_entities(self):
+        """Test endpoints of entities without a TTL are not cacheable"""
+        cache = ResponseCache(10, 0, TTLS)
+
+        assert cache.ttl_for("/buckets/abc/tests/t1") == 30
+        assert cache.ttl_for("/buckets/abc/tests/t1/results/r1") is None
+        assert ResponseCache(0, 0, TTLS).ttl_for("/buckets") is None
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted when full"""
+        cache = ResponseCache(2, 0, TTLS)
+        cache.set("a", "/buckets/a", "A", 60)
+        cache.set("b", "/buckets/b", "B", 60)
+        cache.get("a")
+        cache.set("c", "/buckets/c", "C", 60)
+
+        assert cache.get("b") is None
+        assert cache.get("a").value == "A"
+        assert cache.get("c").value == "C"
+
+    def test_expired_entries_are_dropped(self):
+        """Test entries past TTL and the stale window are not returned"""
+        cache = ResponseCache(10, 5, TTLS)
+        cache.set("a", "/buckets/a", "A", 60)
+        cache.get("a").stored_at -= 64
+
+        assert cache.get("a").value == "A"  # stale but within the revalidation window
+
+        cache.get("a").stored_at -= 2
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_expired_entries_with_etag_are_kept(self):
+        """Test expired entries with an ETag are kept for a conditional request and refreshed"""
+        cache = ResponseCache(10, 5, TTLS)
+        cache.set("a", "/buckets/a/tests/t1/results", "A", 0, etag='"v1"')
+        entry = cache.get("a")
+        entry.stored_at -= 3600
+
+        assert cache.get("a") is entry
+        assert not cache.is_fresh(entry)
+        assert not cache.is_usable_stale(entry)  # a TTL of 0 is never served without revalidation
+
+        cache.refresh("a", entry)
+        assert entry.age < 1
+
+    def test_write_invalidates_resource_and_ancestors(self):
+        """Test a write drops cached entries of the resource and its parents only"""
+        cache = ResponseCache(10, 0, TTLS)
+        for key, endpoint in {
+            "buckets": "/buckets",
+            "bucket": "/buckets/abc",
+            "tests": "/buckets/abc/tests",
+            "test": "/buckets/abc/tests/t1",
+            "steps": "/buckets/abc/tests/t1/steps",
+            "other_test": "/buckets/abc/tests/t2",
+            "other_steps": "/buckets/abc/tests/t2/steps",
+            "account": "/account",
+        }.items():
+            cache.set(key, endpoint, key, 60)
+
+        dropped = cache.invalidate("/buckets/abc/tests/t1/steps")
+
+        assert dropped == 5
+        assert {key for key in ("other_test", "other_steps", "account") if cache.get(key)} == {
+            "other_test",
+            "other_steps",
+            "account",
+        }
+
+    def test_invalidate_descendants(self):
+        """Test descendants are dropped only when requested"""
+        cache = ResponseCache(10, 0, TTLS)
+        cache.set("team", "/teams/t1", "team", 60)
+
+        cache.invalidate("/teams")
+        assert cache.get("team") is not None
+
+        cache.invalidate("/teams", descendants=True)
+        assert cache.get("team") is None
+
+    def test_invalidate_bumps_generation(self):
+        """Test each invalidation bumps the generation"""
+        cache = ResponseCache(10, 0, TTLS)
+        generation = cache.generation
+
+        cache.invalidate("/buckets")
+        cache.clear()
+
+        assert cache.generation == generation + 2
+
+    @pytest.mark.parametrize("endpoint", ["/buckets/abc/results", "/teams/t1/people"])
+    def test_invalidate_unrelated_is_noop(self, endpoint):
+        """Test writes to unrelated resources keep cached entries"""
+        cache = ResponseCache(10, 0, TTLS)
+        cache.set("tests", "/buckets/abc/tests", "tests", 60)
+
+        cache.invalidate(endpoint)
+
+        assert cache.get("tests") is not None
@@ -1,8 +1,15 @@
 """
 Unit tests for ResultManager
 """
+import asyncio
+import time
 import pytest
-from unittest.mock import patch
+import httpx
+from itertools import repeat
+from unittest.mock import AsyncMock, patch
+from src.config.defaults import POLL_INTERVAL_MAX, POLL_INTERVAL_MIN
+from src.formatters.result import format_results
+from src.tools import result_manager
 from src.tools.result_manager import ResultManager
 from src.models import BaseResult
 
@@ -66,3 +73,454 @@ class TestResultManager:
 
             assert result.error is None
 
+    async def test_concurrent_starts_each_trigger_a_run(self, mock_token, mock_context):
+        """Test concurrent starts of the same test each call the trigger URL"""
+        manager = ResultManager(mock_token, mock_context)
+
+        async def _request(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return httpx.Response(
+                200,
+                json={
+                    "data": {
+                        "consolidated_test_results_url": None,
+                        "runs_started": 0,
+                        "runs_failed": 0,
+                        "runs_total": 0,
+                        "runs": [],
+                    },
+                    "error": None,
+                },
+                request=httpx.Request("GET", "https://api.blazemeter.com/trigger/abc123"),
+            )
+
+        with patch("src.common.api_client.get_client") as mock_client:
+            mock_client.return_value.request = AsyncMock(side_effect=_request)
+
+            trigger_url = "https://api.blazemeter.com/trigger/abc123"
+            await asyncio.gather(*(manager.start(trigger_url) for _ in range(3)))
+
+            assert mock_client.return_value.request.call_count == 3
+
+    async def test_read_summary_hints_next_cursor(self, mock_token, mock_context):
+        """Test reading a summary with more failed requests hints the next cursor"""
+        manager = ResultManager(mock_token, mock_context)
+
+        with patch("src.tools.result_manager.api_request") as mock_api:
+            mock_api.return_value = BaseResult(
+                result=[{
+                    "test_run_id": "run_123",
+                    "failed_requests": [{"request_index": 4}],
+                    "next_cursor": 5
+                }],
+                total=1
+            )
+
+            result = await manager.read("bucket_abc", "test_123", "run_123", summary=True)
+
+            assert mock_api.call_args.kwargs["result_formatter_params"] == {"cursor": 0}
+            assert result.has_more is True
+            assert any("cursor=5" in hint for hint in result.hint)
+            assert any("request_index" in hint for hint in result.hint)
+
+    async def test_read_missing_request_index(self, mock_token, mock_context):
+        """Test reading a request index the run does not have returns an error"""
+        manager = ResultManager(mock_token, mock_context)
+
+        with patch("src.tools.result_manager.api_request") as mock_api:
+            mock_api.return_value = BaseResult(result=[], total=0)
+
+            result = await manager.read("bucket_abc", "test_123", "run_123", request_index=99)
+
+            assert mock_api.call_args.kwargs["result_formatter_params"] == {"request_index": 99}
+            assert "request_index 99" in result.error
+
+
+def _fake_api(polls):
+    """api_request stand-in that triggers one run and returns the given summaries of it in turn"""
+    summaries = iter(polls)
+
+    async def _api_request(token, method, endpoint, result_formatter=None, **kwargs):
+        if endpoint.startswith("https://"):
+            return BaseResult(result=[{
+                "test_results": [
+                    {"test_run_id": "run_1", "test_id": "test_123", "bucket_key": "bucket_abc", "test_name": "T"}
+                ]
+            }])
+        if result_formatter is format_results:
+            return BaseResult(result=[
+                {"result": "pass", "started_at": 100.0, "finished_at": 104.0},
+                {"result": "working", "started_at": 200.0, "finished_at": None},
+            ])
+        summary = next(summaries)
+        if isinstance(summary, Exception):
+            raise summary
+        return BaseResult(result=[summary], total=1)
+
+    return _api_request
+
+
+def _not_found():
+    request = httpx.Request("GET", "https://api.runscope.com/buckets/bucket_abc/tests/test_123/results/run_1")
+    response = httpx.Response(404, json={"error": {"message": "Not found"}}, request=request)
+    return httpx.HTTPStatusError("Not Found", request=request, response=response)
+
+
+@pytest.mark.asyncio
+class TestStartAndWait:
+    """Test cases for starting a test run and waiting for it to finish"""
+
+    @pytest.fixture(autouse=True)
+    def no_delay(self, monkeypatch):
+        self.delays = []
+
+        def _poll_delay(expected, elapsed, late_polls):
+            self.delays.append((expected, late_polls))
+            return 0
+
+        monkeypatch.setattr(result_manager, "poll_delay", _poll_delay)
+
+    async def test_polls_until_run_finishes(self, mock_token, mock_context):
+        """Test the run is polled until it finishes and progress is reported"""
+        mock_context.report_progress = AsyncMock()
+        manager = ResultManager(mock_token, mock_context)
+        polls = [
+            {"test_run_id": "run_1", "result": "queued"},
+            {"test_run_id": "run_1", "result": "working"},
+            {"test_run_id": "run_1", "result": "fail", "failed_requests": [{"request_index": 2}]},
+        ]
+
+        with patch("src.tools.result_manager.api_request", side_effect=_fake_api(polls)):
+            result = await manager.start_and_wait("https://api.runscope.com/radar/abc/trigger")
+
+        assert result.error is None
+        assert result.result == [polls[-1]]
+        assert result.warning is None
+        assert self.delays[0] == (4.0, 0)
+        assert mock_context.report_progress.await_args_list[-1].args[:2] == (1, 1)
+        assert any("request_index" in hint for hint in result.hint)
+
+    async def test_deadline_returns_running_run(self, mock_token, mock_context):
+        """Test a run still running at the deadline is returned as it is with a warning"""
+        mock_context.report_progress = AsyncMock()
+        manager = ResultManager(mock_token, mock_context)
+        running = {"test_run_id": "run_1", "result": "working"}
+
+        with patch("src.tools.result_manager.api_request", side_effect=_fake_api(repeat(running))):
+            result = await manager.start_and_wait("https://api.runscope.com/radar/abc/trigger", timeout=0.05)
+
+        assert result.result == [running]
+        assert "did not finish" in result.warning[0]
+        assert "run_1" in result.hint[0]
+
+    async def test_run_not_found_yet_is_polled_again(self, mock_token, mock_context):
+        """Test a run the API does not know yet is read again instead of failing the wait"""
+        mock_context.report_progress = AsyncMock()
+        manager = ResultManager(mock_token, mock_context)
+        finished = {"test_run_id": "run_1", "result": "pass"}
+
+        with patch("src.tools.result_manager.api_request", side_effect=_fake_api([_not_found(), _not_found(), finished])):
+            result = await manager.start_and_wait("https://api.runscope.com/radar/abc/trigger")
+
+        assert result.result == [finished]
+        assert result.warning is None
+
+    async def test_run_not_found_until_deadline(self, mock_token, mock_context):
+        """Test a run still unknown at the deadline is reported instead of raising"""
+        mock_context.report_progress = AsyncMock()
+        manager = ResultManager(mock_token, mock_context)
+
+        with patch("src.tools.result_manager.api_request", side_effect=_fake_api(_not_found() for _ in repeat(None))):
+            result = await manager.start_and_wait("https://api.runscope.com/radar/abc/trigger", timeout=0.05)
+
+        assert result.result == []
+        assert "not found before the deadline" in result.warning[0]
+
+    async def test_zero_timeout_is_not_the_default(self, mock_token, mock_context):
+        """Test a timeout of 0 reads the run once instead of waiting the default timeout"""
+        mock_context.report_progress = AsyncMock()
+        manager = ResultManager(mock_token, mock_context)
+        running = {"test_run_id": "run_1", "result": "working"}
+
+        with patch("src.tools.result_manager.api_request", side_effect=_fake_api(repeat(running))):
+            result = await manager.start_and_wait("https://api.runscope.com/radar/abc/trigger", timeout=0)
+
+        assert result.result == [running]
+        assert len(self.delays) == 1
+        assert "within 0s" in result.warning[0]
+
+    async def test_unknown_bucket_is_not_awaited(self, mock_token, mock_context):
+        """Test runs without a bucket are returned as started"""
+        mock_context.report_progress = AsyncMock()
+        manager = ResultManager(mock_token, mock_context)
+        started = BaseResult(result=[{"test_results": [{"test_run_id": "run_1", "test_id": "test_123"}]}])
+
+        with patch("src.tools.result_manager.api_request", return_value=started) as mock_api:
+            result = await manager.start_and_wait("https://api.runscope.com/radar/abc/trigger")
+
+        assert mock_api.call_count == 1
+        assert "not awaited" in result.warning[0]
+
+
+class TestPollDelay:
+    """Test cases for the interval between polls of a running test run"""
+
+    def test_waits_until_expected_duration(self):
+        """Test a run is read when it should be done, within the interval bounds"""
+        assert result_manager.poll_delay(10.0, 4.0, 0) == 6.0
+        assert result_manager.poll_delay(10.0, 9.9, 0) == POLL_INTERVAL_MIN
+        assert result_manager.poll_delay(600.0, 0.0, 0) == POLL_INTERVAL_MAX
+
+    def test_backs_off_when_late(self):
+        """Test the interval doubles with every late poll, up to the maximum"""
+        assert result_manager.poll_delay(None, 0.0, 0) == POLL_INTERVAL_MIN
+        assert result_manager.poll_delay(10.0, 12.0, 2) == POLL_INTERVAL_MIN * 4
+        assert result_manager.poll_delay(None, 0.0, 20) == POLL_INTERVAL_MAX
+
+
+@pytest.mark.asyncio
+class TestBucketLevelRunTracking:
+    """Test cases for tracking all test runs of a bucket-level run"""
+
+    @pytest.fixture(autouse=True)
+    def no_delay(self, monkeypatch):
+        monkeypatch.setattr(result_manager, "poll_delay", lambda expected, elapsed, late_polls: 0)
+
+    @staticmethod
+    def _fake_api(results, in_flight):
+        """api_request stand-in that triggers a bucket-level run with a test run per final result"""
+        polls = {f"run_{i}": iter(["working", result]) for i, result in enumerate(results)}
+
+        async def _api_request(token, method, endpoint, result_formatter=None, **kwargs):
+            if endpoint.startswith("https://"):
+                return BaseResult(result=[{
+                    "bucket_level_test_run_id": "bl_1",
+                    "test_results": [
+                        {"test_run_id": run_id, "test_id": f"test_{run_id}", "bucket_key": "bucket_abc",
+                         "test_name": f"Test {run_id}"}
+                        for run_id in polls
+                    ],
+                }])
+            if result_formatter is format_results:
+                return BaseResult(result=[])
+            in_flight.append(len(in_flight))
+            await asyncio.sleep(0.001)
+            in_flight.pop()
+            run_id = endpoint.rsplit("/", 1)[1]
+            result = next(polls[run_id])
+            finished_at = 110.0 if result != "working" else None
+            return BaseResult(result=[{
+                "test_run_id": run_id, "result": result, "started_at": 100.0, "finished_at": finished_at,
+                "requests_failed": 1 if result == "fail" else 0,
+            }])
+
+        return _api_request
+
+    async def test_merges_test_runs_and_reports_counts(self, mock_token, mock_context, monkeypatch):
+        """Test all runs are polled concurrently within the budget and merged into one summary"""
+        monkeypatch.setattr(result_manager, "POLL_CONCURRENCY", 3)
+        mock_context.report_progress = AsyncMock()
+        manager = ResultManager(mock_token, mock_context)
+        in_flight, peak = [], []
+        fake = self._fake_api(["pass"] * 8 + ["fail"] * 2, in_flight)
+
+        async def tracking_fake(*args, **kwargs):
+            peak.append(len(in_flight) + 1)
+            return await fake(*args, **kwargs)
+
+        with patch("src.tools.result_manager.api_request", side_effect=tracking_fake):
+            result = await manager.start_bucket_level_run_and_wait("https://api.runscope.com/radar/bucket/t")
+
+        summary = result.result[0]
+        assert summary["bucket_level_test_run_id"] == "bl_1"
+        assert summary["status"] == "completed"
+        assert summary["result"] == "fail"
+        assert (summary["test_runs_passed"], summary["test_runs_failed"], summary["test_runs_running"]) == (8, 2, 0)
+        assert summary["requests_failed"] == 2
+        assert summary["total_duration_in_sec"] == 10.0
+        assert {run["duration_in_sec"] for run in summary["test_runs"]} == {10.0}
+        assert max(peak) <= 3
+        last_progress = mock_context.report_progress.await_args_list[-1].args
+        assert last_progress[:2] == (10, 10)
+        assert last_progress[2].startswith("8 passed, 2 failed")
+
+
+@pytest.mark.asyncio
+class TestResultHistory:
+    """Test cases for syncing and querying the history of a test"""
+
+    @staticmethod
+    def _history_api(pages, calls):
+        """api_request stand-in listing the given pages of results in turn"""
+        pages = iter(pages)
+
+        async def _api_request(token, method, endpoint, result_formatter=None, params=None, **kwargs):
+            calls.append(params)
+            return BaseResult(result=next(pages))
+
+        return _api_request
+
+    @staticmethod
+    def _run(i, result="pass", started_at=None):
+        started_at = time.time() - 3600 + i if started_at is None else started_at
+        return {
+            "test_run_id": f"run_{i}", "bucket_key": "bucket_abc", "test_id": "test_123", "test_name": "T",
+            "result": result, "started_at": started_at, "finished_at": started_at + 2, "region": "us1",
+        }
+
+    async def test_sync_pages_back_and_skips_running_runs(self, mock_token, mock_context, monkeypatch, results_store):
+        """Test full pages are followed with before, and running runs are left for the next sync"""
+        monkeypatch.setattr(result_manager, "RESULTS_PAGE_SIZE", 2)
+        manager = ResultManager(mock_token, mock_context)
+        calls = []
+        pages = [[self._run(4, "working"), self._run(3)], [self._run(2), self._run(1, "fail")], []]
+
+        with patch("src.tools.result_manager.api_request", side_effect=self._history_api(pages, calls)):
+            synced = await manager.sync_history("bucket_abc", "test_123")
+
+        assert synced.total == 3
+        assert calls[1]["before"] == pages[0][1]["started_at"]
+        assert calls[2]["before"] == pages[1][1]["started_at"]
+        assert results_store.synced_until("bucket_abc", "test_123") == pages[0][0]["started_at"]
+
+    async def test_sync_fetches_only_newer_runs(self, mock_token, mock_context, results_store):
+        """Test a synced test is only fetched since its cursor"""
+        manager = ResultManager(mock_token, mock_context)
+        results_store.add_runs("bucket_abc", "test_123", [self._run(1)], 5000.0)
+        calls = []
+
+        with patch("src.tools.result_manager.api_request", side_effect=self._history_api([[]], calls)):
+            await manager.sync_history("bucket_abc", "test_123")
+
+        assert calls == [{"count": 50, "since": 5000.0}]
+        assert results_store.synced_until("bucket_abc", "test_123") == 5000.0
+
+    async def test_failed_sync_keeps_cursor(self, mock_token, mock_context, results_store):
+        """Test a sync failing midway does not move the cursor past the missing runs"""
+        manager = ResultManager(mock_token, mock_context)
+        results_store.add_runs("bucket_abc", "test_123", [], 5000.0)
+
+        with patch("src.tools.result_manager.api_request", return_value=BaseResult(error="Unavailable")):
+            result = await manager.query("bucket_abc", "test_123")
+
+        assert results_store.synced_until("bucket_abc", "test_123") == 5000.0
+        assert "Unavailable" in result.warning[0]
+
+    async def test_query_answers_from_store(self, mock_token, mock_context, results_store):
+        """Test the pass rate of recent runs is answered without calling the API"""
+        manager = ResultManager(mock_token, mock_context)
+        old = time.time() - 30 * 86400
+        runs = [self._run(1), self._run(2, "fail"), self._run(3), self._run(4, started_at=old)]
+        results_store.add_runs("bucket_abc", "test_123", runs, time.time())
+
+        with patch("src.tools.result_manager.api_request") as mock_api:
+            result = await manager.query("bucket_abc", "test_123", days=7, limit=2, sync=False)
+
+        mock_api.assert_not_called()
+        history = result.result[0]
+        assert (history["runs"], history["passed"], history["failed"]) == (3, 2, 1)
+        assert history["pass_rate"] == pytest.approx(2 / 3)
+        assert [run["test_run_id"] for run in history["test_runs"]] == ["run_3", "run_2"]
+        assert result.has_more is True
+
+
+@pytest.mark.asyncio
+class TestLatencyStats:
+    """Test cases for the latency percentiles of test steps"""
+
+    @staticmethod
+    def _request(step, response_time_ms, **timings):
+        return {
+            "uuid": step, "method": "GET", "url": f"https://api.example.com/{step}",
+            "response_time_ms": response_time_ms, "timings": timings,
+        }
+
+    async def test_percentiles_per_step_over_finished_runs(self, mock_token, mock_context):
+        """Test only finished runs are read, and steps are ordered by their p95"""
+        manager = ResultManager(mock_token, mock_context)
+        runs = [{"test_run_id": "r4", "result": "working"}] + [
+            {"test_run_id": f"r{i}", "result": "pass"} for i in range(3)
+        ]
+        details = {
+            f"r{i}": [{"requests": [self._request("fast", 10 + i), self._request("slow", 100 * (i + 1))]}]
+            for i in range(3)
+        }
+        read = []
+
+        async def _api_request(token, method, endpoint, result_formatter=None, result_formatter_params=None, **kwargs):
+            if endpoint.endswith("/results"):
+                return BaseResult(result=runs)
+            read.append(endpoint.rsplit("/", 1)[1])
+            return BaseResult(result=result_formatter(details[read[-1]], result_formatter_params))
+
+        with patch("src.tools.result_manager.api_request", side_effect=_api_request):
+            result = await manager.latency_stats("bucket_abc", "test_123", runs=4)
+
+        assert sorted(read) == ["r0", "r1", "r2"]
+        assert [step["step_id"] for step in result.result] == ["slow", "fast"]
+        slow = result.result[0]
+        assert slow["samples"] == 3
+        assert (slow["p50_ms"], slow["max_ms"]) == (200, 300)
+        assert slow["url"] == "https://api.example.com/slow"
+
+    async def test_metric_from_request_timings(self, mock_token, mock_context):
+        """Test a metric is read from the timings of the requests, and failed reads are reported"""
+        manager = ResultManager(mock_token, mock_context)
+        runs = [{"test_run_id": "r0", "result": "pass"}, {"test_run_id": "r1", "result": "fail"}]
+
+        async def _api_request(token, method, endpoint, result_formatter=None, result_formatter_params=None, **kwargs):
+            if endpoint.endswith("/results"):
+                return BaseResult(result=runs)
+            if endpoint.endswith("/r1"):
+                return BaseResult(error="Not found")
+            results = [{"requests": [self._request("login", 50, dial_ms=7)]}]
+            return BaseResult(result=result_formatter(results, result_formatter_params))
+
+        with patch("src.tools.result_manager.api_request", side_effect=_api_request):
+            result = await manager.latency_stats("bucket_abc", "test_123", metric="dial_ms")
+
+        assert result.result[0]["p99_ms"] == 7
+        assert "1 runs could not be read" in result.warning[0]
+
+
+@pytest.mark.asyncio
+class TestFlakyTests:
+    """Test cases for ranking the tests of a bucket by flakiness"""
+
+    async def test_ranks_flaky_tests_and_reads_only_failed_runs(self, mock_token, mock_context):
+        """Test steady tests are left out and the flipping assertion of a flaky test is found"""
+        manager = ResultManager(mock_token, mock_context)
+        histories = {
+            "steady": "PPPP",
+            "flaky": "PFPF",
+        }
+        read = []
+
+        def _assertions(result):
+            return [{"requests": [{"uuid": "s1", "url": "https://x", "assertions": [
+                {"source": "response_status", "comparison": "equal_number", "result": result,
+                 "target_value": 200, "actual_value": 200 if result == "pass" else 503},
+            ]}]}]
+
+        async def _api_request(token, method, endpoint, result_formatter=None, **kwargs):
+            parts = endpoint.split("/")
+            if endpoint.endswith("/results"):
+                return BaseResult(result=[
+                    {"test_run_id": f"{parts[4]}_{i}", "started_at": i * 3600.0,
+                     "result": "pass" if result == "P" else "fail", "region": "us1"}
+                    for i, result in reversed(list(enumerate(histories[parts[4]])))
+                ])
+            read.append(parts[-1])
+            return BaseResult(result=result_formatter(_assertions("fail")))
+
+        tests = BaseResult(result=[{"test_id": "steady", "name": "Steady"}, {"test_id": "flaky", "name": "Flaky"}])
+        with patch("src.tools.result_manager.api_request", side_effect=_api_request), \
+                patch.object(result_manager.TestManager, "list_all", AsyncMock(return_value=tests)):
+            result = await manager.flaky_tests("bucket_abc", runs=4)
+
+        assert [test["test_id"] for test in result.result] == ["flaky"]
+        assert sorted(read) == ["flaky_1", "flaky_3"]
+        flaky = result.result[0]
+        assert flaky["flips"] == 3
+        assert flaky["flaky_assertion"]["source"] == "response_status"
+        assert flaky["flaky_assertion"]["flips"] == 3
@@ -0,0 +1,76 @@
+"""
+Unit tests for the local results store
+"""
+import pytest
+
+from src.common.results_store import ResultsStore
+
+
+def _run(i: int, result: str = "pass", region: str = "us1", started_at: float = None) -> dict:
+    started_at = 1000.0 + i * 100 if started_at is None else started_at
+    return {
+        "test_run_id": f"run_{i}",
+        "bucket_key": "bucket_abc",
+        "test_id": "test_123",
+        "test_name": "Checkout",
+        "started_at": started_at,
+        "finished_at": started_at + 2 + i,
+        "result": result,
+        "region": region,
+        "environment_id": "env_1",
+        "source": "scheduled",
+    }
+
+
+class TestResultsStore:
+    """Test cases for ResultsStore"""
+
+    def test_never_synced_test_has_no_cursor(self):
+        """Test a test without sync state reports no cursor"""
+        assert ResultsStore(":memory:").synced_until("bucket_abc", "test_123") is None
+
+    def test_add_runs_moves_cursor_and_replaces_duplicates(self):
+        """Test stored runs are keyed by test_run_id and the cursor is saved with them"""
+        store = ResultsStore(":memory:")
+
+        store.add_runs("bucket_abc", "test_123", [_run(0), _run(1)], 1100.0)
+        store.add_runs("bucket_abc", "test_123", [_run(1, "fail"), _run(2)], 1200.0)
+
+        stats, runs = store.query("bucket_abc", "test_123")
+        assert store.synced_until("bucket_abc", "test_123") == 1200.0
+        assert stats["runs"] == 3
+        assert [run["test_run_id"] for run in runs] == ["run_2", "run_1", "run_0"]
+        assert runs[1]["result"] == "fail"
+
+    def test_query_aggregates_filtered_runs(self):
+        """Test pass rate inputs and durations are computed over the runs matching the filters"""
+        store = ResultsStore(":memory:")
+        runs = [_run(0), _run(1, "fail", "eu1"), _run(2, "fail"), _run(3)]
+        store.add_runs("bucket_abc", "test_123", runs, 1300.0)
+
+        stats, latest = store.query("bucket_abc", "test_123", since=1100.0, limit=2)
+        assert (stats["runs"], stats["passed"], stats["failed"]) == (3, 1, 2)
+        assert stats["avg_duration_in_sec"] == pytest.approx(4.0)
+        assert stats["max_duration_in_sec"] == pytest.approx(5.0)
+        assert [run["test_run_id"] for run in latest] == ["run_3", "run_2"]
+
+        stats, latest = store.query("bucket_abc", "test_123", result="fail", region="eu1")
+        assert stats["runs"] == 1
+        assert latest[0]["test_run_id"] == "run_1"
+
+    def test_query_without_runs(self):
+        """Test an empty history aggregates to zero runs"""
+        stats, runs = ResultsStore(":memory:").query("bucket_abc", "test_123", region="us1")
+
+        assert (stats["runs"], stats["passed"], stats["failed"], stats["avg_duration_in_sec"]) == (0, 0, 0, None)
+        assert runs == []
+
+    def test_database_file_is_created(self, tmp_path):
+        """Test runs persist in the database file across stores"""
+        path = str(tmp_path / "nested" / "results.sqlite3")
+        store = ResultsStore(path)
+        store.add_runs("bucket_abc", "test_123", [_run(0)], 1000.0)
+        store.close()
+
+        stats, _ = ResultsStore(path).query("bucket_abc", "test_123")
+        assert stats["runs"] == 1
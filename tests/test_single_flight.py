@@ -0,0 +1,85 @@
+"""
+Unit tests for coalescing of concurrent requests
+"""
+import asyncio
+
+import pytest
+
+from src.common.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+class TestSingleFlight:
+    """Test cases for SingleFlight"""
+
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test concurrent callers with the same key run the function once"""
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+
+        assert len(calls) == 1
+        assert [value for value, _ in results] == ["value"] * 5
+        assert [shared for _, shared in results] == [False, True, True, True, True]
+        assert len(flight) == 0
+
+    async def test_different_keys_run_separately(self):
+        """Test callers with different keys are not coalesced"""
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        await asyncio.gather(flight.do("a", fetch), flight.do("b", fetch))
+
+        assert len(calls) == 2
+
+    async def test_error_propagates_to_every_waiter(self):
+        """Test an exception is raised to all callers sharing the call"""
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream failed")
+
+        results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert len(flight) == 0
+
+    async def test_cancelled_leader_does_not_cancel_waiters(self):
+        """Test waiters still get the result when the first caller is cancelled"""
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "value"
+
+        leader = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await waiter == ("value", True)
+
+    async def test_sequential_calls_are_not_shared(self):
+        """Test a finished call is not reused by later callers"""
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return len(calls)
+
+        assert await flight.do("key", fetch) == (1, False)
+        assert await flight.do("key", fetch) == (2, False)
@@ -1,8 +1,11 @@
 """
 Unit tests for StepManager
 """
+import json
 import pytest
+import httpx
 from unittest.mock import patch
+from src.common import api_client
 from src.tools.step_manager import StepManager
 from src.models import BaseResult
 
@@ -213,3 +216,168 @@ class TestStepManager:
 
             assert result.error is None
 
+
+
+@pytest.mark.asyncio
+class TestAddSteps:
+    """Test cases for adding many steps at once"""
+
+    async def test_creates_steps_in_order_with_body_and_assertions(self, mock_token, mock_context):
+        """Test each step is created in one request, in the given order"""
+        manager = StepManager(mock_token, mock_context)
+        bodies = []
+
+        async def _api_request(token, method, endpoint, result_formatter=None, json=None, **kwargs):
+            bodies.append(json)
+            return BaseResult(result=[{"id": f"step_{len(bodies)}", **json}])
+
+        steps = [
+            {
+                "method": "POST",
+                "url": "https://api.example.com/login",
+                "body_type": "json",
+                "body_content": '{"user": "qa"}',
+                "assertions": [{"source": "response_status", "comparison": "equal_number", "value": "200"}],
+                "variables": [{"name": "token", "source": "response_json", "property": "token"}],
+            },
+            {"step_type": "pause", "duration": 2},
+            {"url": "https://api.example.com/me", "headers": {"Authorization": ["Bearer {{token}}"]}},
+        ]
+        with patch("src.tools.step_manager.api_request", side_effect=_api_request):
+            result = await manager.add_steps("bucket_abc", "test_123", steps)
+
+        assert [body.get("url") for body in bodies] == [
+            "https://api.example.com/login", None, "https://api.example.com/me"
+        ]
+        assert bodies[0]["body"] == '{"user": "qa"}'
+        assert bodies[0]["headers"] == {"Content-Type": "application/json"}
+        assert bodies[0]["assertions"] == [{"source": "response_status", "comparison": "equal_number", "value": "200"}]
+        assert bodies[1] == {"step_type": "pause", "duration": 2}
+        assert [step["index"] for step in result.result] == [0, 1, 2]
+        assert result.warning is None
+
+    async def test_reports_invalid_and_failed_steps(self, mock_token, mock_context, monkeypatch):
+        """Test invalid specs are not created and a rejected step does not stop the next steps"""
+        manager = StepManager(mock_token, mock_context)
+        calls = []
+
+        def _handler(request):
+            url = json.loads(request.content)["url"]
+            calls.append(url)
+            if url.endswith("/down"):
+                return httpx.Response(400, json={"data": None, "error": {"status": 400, "message": "Invalid url"}})
+            step = {"id": "step", "step_type": "request", "skipped": False, "url": url}
+            return httpx.Response(200, json={"data": [step], "error": None})
+
+        await api_client.close_client()
+        monkeypatch.setattr(
+            api_client,
+            "build_client",
+            lambda *args, **kwargs: httpx.AsyncClient(
+                base_url="https://api.runscope.com", transport=httpx.MockTransport(_handler)
+            ),
+        )
+        steps = [
+            {"url": "https://api.example.com/a"},
+            {"url": "https://api.example.com/b", "body_type": "json", "body_content": "{not json"},
+            {"url": "https://api.example.com/down"},
+            {"url": "https://api.example.com/c"},
+        ]
+        result = await manager.add_steps("bucket_abc", "test_123", steps)
+        await api_client.close_client()
+
+        assert calls == ["https://api.example.com/a", "https://api.example.com/down", "https://api.example.com/c"]
+        assert [step["index"] for step in result.result] == [0, 3]
+        assert result.error is None
+        assert result.warning[0].startswith("Step 1 was not created: Invalid JSON")
+        assert result.warning[1] == "Step 2 was not created: HTTP 400: Invalid url"
+
+    async def test_too_many_steps(self, mock_token, mock_context):
+        """Test batches above the limit are rejected before any request"""
+        manager = StepManager(mock_token, mock_context)
+
+        with patch("src.tools.step_manager.api_request") as mock_api:
+            result = await manager.add_steps("bucket_abc", "test_123", [{}] * 101)
+
+        mock_api.assert_not_called()
+        assert "At most 100 steps" in result.error
+
+
+@pytest.mark.asyncio
+class TestPatchStep:
+    """Test cases for patching a step with many mutations"""
+
+    @staticmethod
+    def _stored():
+        return {
+            "id": "step_123", "step_type": "request", "skipped": False, "method": "POST",
+            "url": "https://api.example.com",
+            "headers": {"Accept": ["application/json"]},
+            "assertions": [{"source": "response_status", "comparison": "equal_number", "value": "200"}],
+        }
+
+    async def test_reads_and_writes_once(self, mock_token, mock_context):
+        """Test every mutation is applied to a single read, and written with a single PUT"""
+        manager = StepManager(mock_token, mock_context)
+        mutations = [
+            {"op": "set_body", "body_type": "json", "body_content": '{"a": 1}'},
+            {"op": "set_headers", "headers": {"Accept": None, "X-Trace": ["1"]}},
+            *({"op": "add_assertion", "source": "response_json", "comparison": "not_empty", "property": f"p{i}"}
+              for i in range(8)),
+            {"op": "add_variable", "name": "id", "source": "response_json", "property": "id"},
+            {"op": "add_script", "script": "var a = 1;", "before": True},
+        ]
+
+        with patch("src.tools.step_manager.api_request") as mock_api:
+            mock_api.side_effect = [BaseResult(result=[self._stored()]), BaseResult(result=[{"id": "step_123"}])]
+            result = await manager.patch_step("bucket_abc", "test_123", "step_123", mutations)
+
+        assert result.error is None
+        assert [call[0][1] for call in mock_api.call_args_list] == ["GET", "PUT"]
+        written = mock_api.call_args_list[1][1]["json"]
+        assert written["body"] == '{"a": 1}'
+        assert written["headers"] == {"Content-Type": "application/json", "X-Trace": ["1"]}
+        assert len(written["assertions"]) == 9
+        assert written["variables"] == [{"name": "id", "source": "response_json", "property": "id"}]
+        assert written["before_scripts"] == ["var a = 1;"]
+
+    async def test_unchanged_step_is_not_written(self, mock_token, mock_context):
+        """Test the PUT is skipped when the step already has the changes"""
+        manager = StepManager(mock_token, mock_context)
+        mutations = [
+            {"op": "add_assertion", "source": "response_status", "comparison": "equal_number", "value": "200"},
+            {"op": "set_headers", "headers": {"Accept": ["application/json"]}},
+        ]
+
+        with patch("src.tools.step_manager.api_request") as mock_api:
+            mock_api.return_value = BaseResult(result=[self._stored()])
+            result = await manager.patch_step("bucket_abc", "test_123", "step_123", mutations)
+
+        assert mock_api.call_count == 1
+        assert "it was not written" in result.info[0]
+
+    async def test_invalid_mutation_writes_nothing(self, mock_token, mock_context):
+        """Test an invalid mutation aborts the patch before the write"""
+        manager = StepManager(mock_token, mock_context)
+        mutations = [
+            {"op": "add_assertion", "source": "response_time", "comparison": "is_less_than", "value": "500"},
+            {"op": "set_body", "body_type": "xml", "body_content": "<broken"},
+        ]
+
+        with patch("src.tools.step_manager.api_request") as mock_api:
+            mock_api.return_value = BaseResult(result=[self._stored()])
+            result = await manager.patch_step("bucket_abc", "test_123", "step_123", mutations)
+
+        assert mock_api.call_count == 1
+        assert result.error.startswith("Mutation 1 is invalid")
+
+    async def test_mutation_that_is_not_a_dict_writes_nothing(self, mock_token, mock_context):
+        """Test a mutation given as a string is rejected like an unknown op, without a write"""
+        manager = StepManager(mock_token, mock_context)
+
+        with patch("src.tools.step_manager.api_request") as mock_api:
+            mock_api.return_value = BaseResult(result=[self._stored()])
+            result = await manager.patch_step("bucket_abc", "test_123", "step_123", ["set_body"])
+
+        assert mock_api.call_count == 1
+        assert result.error.startswith("Mutation 0 is invalid, the step was not changed: Unsupported op")
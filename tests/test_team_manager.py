@@ -68,3 +68,112 @@ class TestTeamManager:
             assert len(result.result) == 2
             assert result.result[0]["email"] == "user1@example.com"
 
+
+
+@pytest.mark.asyncio
+class TestSearch:
+    """Test cases for searching teams, buckets and tests by name"""
+
+    @pytest.fixture(autouse=True)
+    def entity_index(self, monkeypatch):
+        from src.common import entity_index as entity_index_module
+        index = entity_index_module.EntityIndex()
+        monkeypatch.setattr(entity_index_module, "_index", index)
+        return index
+
+    @staticmethod
+    def _api(calls):
+        stored = {
+            "/account": [{"teams": [{"team_id": "team_pay", "name": "Payments"}]}],
+            "/buckets": [
+                {
+                    "bucket_key": "b_pay",
+                    "name": "Payments API",
+                    "trigger_url": "https://t/b_pay",
+                    "team": {"team_id": "team_pay", "name": "Payments"},
+                },
+                {
+                    "bucket_key": "b_web",
+                    "name": "Storefront",
+                    "trigger_url": "https://t/b_web",
+                    "team": {"team_id": "team_web", "name": "Web"},
+                },
+            ],
+            "/buckets/b_pay/tests": [
+                {"test_id": "t1", "name": "Checkout smoke test", "trigger_url": "https://t/t1"},
+                {"test_id": "t2", "name": "Refunds regression", "trigger_url": "https://t/t2"},
+            ],
+            "/buckets/b_web/tests": [
+                {"test_id": "t3", "name": "Checkout smoke", "trigger_url": "https://t/t3"}
+            ],
+        }
+
+        async def _api_request(token, method, endpoint, result_formatter=None, **kwargs):
+            calls.append(endpoint)
+            return BaseResult(result=stored[endpoint])
+
+        return _api_request
+
+    def _patched(self, calls):
+        fake = self._api(calls)
+        return (
+            patch("src.tools.team_manager.api_request", side_effect=fake),
+            patch("src.tools.bucket_manager.api_request", side_effect=fake),
+            patch("src.tools.test_manager.api_request", side_effect=fake),
+        )
+
+    async def test_search_resolves_test_in_one_call(self, mock_token, mock_context):
+        """Test a fuzzy query resolves to the test of the named team with its ids and trigger URL"""
+        manager = TeamManager(mock_token, mock_context)
+        calls = []
+        team_patch, bucket_patch, test_patch = self._patched(calls)
+
+        with team_patch, bucket_patch, test_patch:
+            result = await manager.search("chekout smoke test in payments team", limit=1)
+
+        assert result.error is None
+        assert (result.total, result.has_more) == (2, True)
+        best = result.result[0]
+        assert (best["kind"], best["test_id"], best["bucket_key"]) == ("test", "t1", "b_pay")
+        assert best["team_id"] == "team_pay"
+        assert best["trigger_url"] == "https://t/t1"
+        assert sorted(calls) == ["/account", "/buckets", "/buckets/b_pay/tests", "/buckets/b_web/tests"]
+
+    async def test_search_reuses_fresh_index(self, mock_token, mock_context, entity_index):
+        """Test a second search only re-lists the buckets whose tests are stale"""
+        manager = TeamManager(mock_token, mock_context)
+        calls = []
+        team_patch, bucket_patch, test_patch = self._patched(calls)
+
+        with team_patch, bucket_patch, test_patch:
+            await manager.search("refunds")
+            entity_index._tests_loaded_at["b_web"] -= 3600
+            calls.clear()
+            result = await manager.search("refunds", kinds=["test"])
+
+        assert calls == ["/buckets/b_web/tests"]
+        assert [match["test_id"] for match in result.result] == ["t2"]
+
+    async def test_search_rejects_unknown_fields(self, mock_token, mock_context):
+        """Test unknown fields are an error before anything is listed"""
+        manager = TeamManager(mock_token, mock_context)
+        calls = []
+        team_patch, bucket_patch, test_patch = self._patched(calls)
+
+        with team_patch, bucket_patch, test_patch:
+            result = await manager.search("checkout", fields=["test_id", "nope"])
+
+        assert result.error.startswith("Unknown field 'nope' for SearchMatch")
+        assert calls == []
+
+    async def test_search_without_matches_hints(self, mock_token, mock_context):
+        """Test a query matching nothing returns no matches and a hint"""
+        manager = TeamManager(mock_token, mock_context)
+        team_patch, bucket_patch, test_patch = self._patched([])
+
+        with team_patch, bucket_patch, test_patch:
+            result = await manager.search("inventory")
+
+        assert result.result == []
+        assert result.total == 0
+        assert result.hint
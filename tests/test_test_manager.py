@@ -1,7 +1,10 @@
 """
 Unit tests for TestManager
 """
+import asyncio
+
 import pytest
+import httpx
 from unittest.mock import AsyncMock, patch
 from src.tools.test_manager import TestManager
 from src.models import BaseResult
@@ -100,6 +103,167 @@ class TestTestManager:
             assert call_args[1]["params"]["offset"] == 20
             assert result.has_more is True
 
+    async def test_list_tests_with_fields(self, mock_token, mock_context):
+        """Test the requested fields are passed on to the formatter"""
+        manager = TestManager(mock_token, mock_context)
+
+        with patch("src.tools.test_manager.api_request") as mock_api:
+            mock_api.return_value = BaseResult(result=[{"test_id": "test_1"}], total=1)
+
+            await manager.list("bucket_abc", limit=10, offset=0, fields=["test_id", "last_run.status"])
+            await manager.list("bucket_abc", limit=10, offset=0)
+
+            with_fields, without_fields = mock_api.call_args_list
+            assert with_fields[1]["result_formatter_params"] == {"fields": ["test_id", "last_run.status"]}
+            assert without_fields[1]["result_formatter_params"] is None
+
+    async def test_list_all_fetches_every_page_in_order(self, mock_token, mock_context):
+        """Test list_all plans the pages from the total and returns the tests in order"""
+        manager = TestManager(mock_token, mock_context)
+        tests = [{"test_id": f"test_{i}"} for i in range(120)]
+
+        async def _page(token, method, endpoint, **kwargs):
+            offset, limit = kwargs["params"]["offset"], kwargs["params"]["count"]
+            await asyncio.sleep(0.01 if offset == 50 else 0)  # finishes after the page behind it
+            return BaseResult(result=tests[offset:offset + limit], total=len(tests))
+
+        with patch("src.tools.test_manager.api_request", side_effect=_page) as mock_api:
+            result = await manager.list_all("bucket_abc")
+
+            assert result.error is None
+            assert result.result == tests
+            assert result.total == 120
+            assert result.has_more is False
+            assert sorted(c[1]["params"]["offset"] for c in mock_api.call_args_list) == [0, 50, 100]
+
+    async def test_iter_all_bounds_concurrency(self, mock_token, mock_context):
+        """Test iter_all keeps at most `concurrency` pages in flight"""
+        manager = TestManager(mock_token, mock_context)
+        in_flight, peak = 0, 0
+
+        async def _page(token, method, endpoint, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            offset = kwargs["params"]["offset"]
+            return BaseResult(result=[{"id": i} for i in range(offset, min(offset + 10, 95))], total=95)
+
+        with patch("src.tools.test_manager.api_request", side_effect=_page):
+            pages = [page async for page in manager.iter_all("bucket_abc", page_size=10, concurrency=3)]
+
+            assert len(pages) == 10
+            assert peak == 3
+
+    async def test_list_all_without_total_stops_at_short_page(self, mock_token, mock_context):
+        """Test pages are fetched ahead until a short page when the API reports no total"""
+        manager = TestManager(mock_token, mock_context)
+        tests = [{"test_id": f"test_{i}"} for i in range(70)]
+
+        async def _page(token, method, endpoint, **kwargs):
+            offset, limit = kwargs["params"]["offset"], kwargs["params"]["count"]
+            page = tests[offset:offset + limit]
+            return BaseResult(result=page, total=len(page))
+
+        with patch("src.tools.test_manager.api_request", side_effect=_page):
+            result = await manager.list_all("bucket_abc")
+
+            assert result.result == tests
+
+    async def test_list_all_skips_tests_seen_twice(self, mock_token, mock_context):
+        """Test a test shifted onto the next page by a deletion while listing is returned once"""
+        manager = TestManager(mock_token, mock_context)
+        pages = {0: [{"test_id": "a"}, {"test_id": "b"}], 2: [{"test_id": "b"}, {"test_id": "c"}], 4: []}
+
+        async def _page(token, method, endpoint, **kwargs):
+            return BaseResult(result=pages[kwargs["params"]["offset"]], total=5)
+
+        with patch("src.tools.test_manager.api_request", side_effect=_page):
+            result = await manager.list_all("bucket_abc", page_size=2)
+
+            assert [test["test_id"] for test in result.result] == ["a", "b", "c"]
+            assert result.total == 3
+
+    async def test_list_all_returns_partial_result_on_error(self, mock_token, mock_context):
+        """Test a failing page stops the listing and reports the error with the tests read so far"""
+        manager = TestManager(mock_token, mock_context)
+
+        async def _page(token, method, endpoint, **kwargs):
+            offset = kwargs["params"]["offset"]
+            if offset == 50:
+                return BaseResult(error="Rate limited")
+            return BaseResult(result=[{"test_id": i} for i in range(offset, offset + 50)], total=200)
+
+        with patch("src.tools.test_manager.api_request", side_effect=_page):
+            result = await manager.list_all("bucket_abc")
+
+            assert result.error == "Rate limited"
+            assert len(result.result) == 50
+            assert result.has_more is True
+
+    async def test_list_across_buckets_merges_and_filters(self, mock_token, mock_context):
+        """Test tests of all buckets are merged, tagged with their bucket and filtered"""
+        manager = TestManager(mock_token, mock_context)
+        buckets = BaseResult(
+            result=[{"bucket_key": "b1", "name": "Bucket 1"}, {"bucket_key": "b2", "name": "Bucket 2"}]
+        )
+        tests = {
+            "b1": [
+                {"test_id": "t1", "name": "Login flow", "last_run": {"id": "r1", "status": "error"}},
+                {"test_id": "t2", "name": "Checkout", "last_run": {"id": "r2", "status": "completed"}},
+            ],
+            "b2": [{"test_id": "t3", "name": "Login API", "last_run": None}],
+        }
+
+        async def _page(token, method, endpoint, **kwargs):
+            return BaseResult(result=tests[endpoint.split("/")[2]], total=None)
+
+        with patch("src.tools.test_manager.BucketManager.list", AsyncMock(return_value=buckets)), \
+                patch("src.tools.test_manager.api_request", side_effect=_page):
+            everything = await manager.list_across_buckets()
+            login = await manager.list_across_buckets(name_contains="login")
+            failed = await manager.list_across_buckets(last_run_status="ERROR")
+
+            assert [t["test_id"] for t in everything.result] == ["t1", "t2", "t3"]
+            assert everything.result[2]["bucket_key"] == "b2"
+            assert everything.result[2]["bucket_name"] == "Bucket 2"
+            assert len(everything.info) == 2
+            assert everything.warning is None
+            assert [t["test_id"] for t in login.result] == ["t1", "t3"]
+            assert [t["test_id"] for t in failed.result] == ["t1"]
+
+    async def test_list_across_buckets_reports_partial_failures(self, mock_token, mock_context):
+        """Test a bucket failing to list is reported as a warning without losing the others"""
+        manager = TestManager(mock_token, mock_context)
+        buckets = BaseResult(
+            result=[{"bucket_key": "b1", "name": "Bucket 1"}, {"bucket_key": "b2", "name": "Bucket 2"}]
+        )
+
+        async def _page(token, method, endpoint, **kwargs):
+            if "/b2/" in endpoint:
+                return BaseResult(error="Unauthorized to perform this action")
+            return BaseResult(result=[{"test_id": "t1", "name": "Test 1"}], total=1)
+
+        with patch("src.tools.test_manager.BucketManager.list", AsyncMock(return_value=buckets)), \
+                patch("src.tools.test_manager.api_request", side_effect=_page):
+            result = await manager.list_across_buckets()
+
+            assert result.error is None
+            assert [t["test_id"] for t in result.result] == ["t1"]
+            assert len(result.warning) == 1
+            assert "b2" in result.warning[0]
+
+    async def test_list_across_buckets_returns_bucket_list_error(self, mock_token, mock_context):
+        """Test an error listing the buckets is returned as is"""
+        manager = TestManager(mock_token, mock_context)
+        error = BaseResult(error="Invalid Credentials")
+
+        with patch("src.tools.test_manager.BucketManager.list", AsyncMock(return_value=error)):
+            result = await manager.list_across_buckets()
+
+            assert result.error == "Invalid Credentials"
+
     async def test_get_test_metrics(self, mock_token, mock_context):
         """Test getting test metrics"""
         manager = TestManager(mock_token, mock_context)
@@ -153,6 +317,17 @@ class TestTestManager:
             assert params["environment_uuid"] == "env_123"
             assert params["region"] == "us1"
 
+    async def test_get_test_metrics_with_max_points(self, mock_token, mock_context):
+        """Test max_points is passed to the metrics formatter"""
+        manager = TestManager(mock_token, mock_context)
+
+        with patch("src.tools.test_manager.api_request") as mock_api:
+            mock_api.return_value = BaseResult(result=[{}], total=1)
+
+            await manager.get_test_metrics("bucket_abc", "test_123", "month", "all", "all", max_points=60)
+
+            assert mock_api.call_args[1]["result_formatter_params"]["max_points"] == 60
+
     async def test_manager_without_token(self, mock_context):
         """Test manager operations without token"""
         manager = TestManager(None, mock_context)
@@ -167,3 +342,280 @@ class TestTestManager:
             assert result.error is not None
             assert "No API token" in result.error
 
+
+
+@pytest.mark.asyncio
+class TestDetectAnomalies:
+    """Test cases for detecting anomalies across the tests of a bucket"""
+
+    @staticmethod
+    def _metrics(latencies):
+        return BaseResult(result=[{
+            "response_times": [
+                {"timestamp": i, "avg_response_time_ms": latency, "success_ratio": 1.0}
+                for i, latency in enumerate(latencies)
+            ],
+            "timeframe": "day",
+            "this_time_period": {"response_time_95th_percentile": 300.0},
+            "change_from_last_period": {"response_time_95th_percentile": 120.0},
+        }])
+
+    async def test_reports_only_tests_with_anomalies(self, mock_token, mock_context):
+        """Test every test and timeframe is checked and only anomalous ones are returned"""
+        manager = TestManager(mock_token, mock_context)
+        tests = BaseResult(result=[{"test_id": "slow", "name": "Slow"}, {"test_id": "steady", "name": "Steady"}])
+        calls = []
+
+        async def _get_test_metrics(bucket_key, test_id, timeframe, environment_uuid, region, fields=None):
+            calls.append((test_id, timeframe))
+            if test_id == "slow" and timeframe == "week":
+                return self._metrics([100, 101, 99, 100, 102, 98, 500])
+            return self._metrics([100, 101, 99, 100, 102, 98, 100])
+
+        with patch.object(manager, "list_all", AsyncMock(return_value=tests)), \
+                patch.object(manager, "get_test_metrics", side_effect=_get_test_metrics):
+            result = await manager.detect_anomalies("bucket_abc")
+
+        assert sorted(calls) == [("slow", "day"), ("slow", "week"), ("steady", "day"), ("steady", "week")]
+        assert len(result.result) == 1
+        found = result.result[0]
+        assert (found["test_id"], found["timeframe"], found["latency_spikes"]) == ("slow", "week", 1)
+        assert found["response_time_95th_percentile_change"] == 120.0
+        assert found["anomalies"][0]["timestamp"] == 6
+
+    async def test_given_tests_are_not_listed(self, mock_token, mock_context):
+        """Test test_ids skip the listing, and failed reads are reported"""
+        manager = TestManager(mock_token, mock_context)
+
+        with patch.object(manager, "list_all", AsyncMock()) as mock_list, \
+                patch.object(manager, "get_test_metrics", AsyncMock(return_value=BaseResult(error="Not found"))):
+            result = await manager.detect_anomalies("bucket_abc", ["month"], test_ids=["t1"])
+
+        mock_list.assert_not_called()
+        assert result.result == []
+        assert "Not found" in result.warning[0]
+
+
+@pytest.mark.asyncio
+class TestCloneTest:
+    """Test cases for cloning a test"""
+
+    @staticmethod
+    def _api(calls):
+        source = {"id": "t1", "name": "Checkout", "description": "Smoke", "default_environment_id": "env_default"}
+        stored = {
+            "/buckets/b1/tests/t1": [source],
+            "/buckets/b1/tests/t1/steps": [
+                {"id": "s1", "step_type": "request", "url": "https://a"},
+                {"id": "s2", "step_type": "conditional", "steps": [{"id": "s3", "step_type": "pause"}]},
+                {"id": "s4", "step_type": "request", "url": "https://b"},
+            ],
+            "/buckets/b1/tests/t1/environments": [
+                {"id": "env_default", "test_id": "t1", "name": "Default"},
+                {"id": "env_eu", "test_id": "t1", "name": "EU", "parent_environment_id": "shared_1"},
+            ],
+            "/buckets/b1/tests/t1/schedules": [
+                {"id": "sch_1", "environment_id": "env_eu", "interval": "1h"},
+                {"id": "sch_2", "environment_id": "shared_2", "interval": "1d"},
+            ],
+        }
+
+        async def _api_request(token, method, endpoint, result_formatter=None, json=None, **kwargs):
+            calls.append((method, endpoint, json))
+            if method == "GET" and endpoint in stored:
+                return BaseResult(result=stored[endpoint])
+            if method == "GET":
+                return BaseResult(result=[{"id": "t2", "name": "cloned"}])
+            if endpoint.endswith("/tests"):
+                return BaseResult(result=[{"id": "t2", "default_environment_id": "env_new_default"}])
+            if endpoint.endswith("/environments"):
+                return BaseResult(result=[{"id": f"new_{json['name']}"}])
+            return BaseResult(result=[{"id": "new", **(json or {})}])
+
+        return _api_request
+
+    async def test_clone_into_another_bucket(self, mock_token, mock_context):
+        """Test steps keep their order, environments are mapped and shared ones are not carried over"""
+        manager = TestManager(mock_token, mock_context)
+        calls = []
+
+        with patch("src.tools.test_manager.api_request", side_effect=self._api(calls)):
+            result = await manager.clone("b1", "t1", "b2")
+
+        writes = [(method, endpoint, body) for method, endpoint, body in calls if method != "GET"]
+        assert writes[0] == ("POST", "/buckets/b2/tests", {"name": "Checkout", "description": "Smoke"})
+        step_bodies = [body for _, endpoint, body in writes if endpoint == "/buckets/b2/tests/t2/steps"]
+        assert [body.get("url") for body in step_bodies] == ["https://a", None, "https://b"]
+        assert all("id" not in body for body in step_bodies)
+        assert step_bodies[1]["steps"] == [{"step_type": "pause"}]
+        assert ("PUT", "/buckets/b2/tests/t2/environments/env_new_default", {"name": "Default"}) in writes
+        assert ("POST", "/buckets/b2/tests/t2/environments", {"name": "EU"}) in writes
+        schedules = [body for _, endpoint, body in writes if endpoint == "/v1/buckets/b2/tests/t2/schedules"]
+        assert schedules == [{"environment_id": "new_EU", "interval": "1h"}]
+        assert "Copied 3 of 3 steps, 2 of 2 environments and 1 of 2 schedules" in result.info[0]
+        assert len(result.warning) == 2
+
+    async def test_clone_in_same_bucket(self, mock_token, mock_context):
+        """Test a clone in the same bucket gets a new name and keeps shared environments"""
+        manager = TestManager(mock_token, mock_context)
+        calls = []
+
+        with patch("src.tools.test_manager.api_request", side_effect=self._api(calls)):
+            await manager.clone("b1", "t1")
+
+        assert calls[4] == ("POST", "/buckets/b1/tests", {"name": "Checkout (copy)", "description": "Smoke"})
+        environments = [body for method, endpoint, body in calls if method == "POST" and "environments" in endpoint]
+        assert environments == [{"name": "EU", "parent_environment_id": "shared_1"}]
+        schedules = [body for method, endpoint, body in calls if "schedules" in endpoint and method == "POST"]
+        assert {"environment_id": "shared_2", "interval": "1d"} in schedules
+
+    async def test_clone_with_rejected_parts(self, mock_token, mock_context):
+        """Test parts rejected with a 4xx are reported and the created test is still returned"""
+        manager = TestManager(mock_token, mock_context)
+        calls = []
+        api = self._api(calls)
+
+        async def _api_request(token, method, endpoint, result_formatter=None, json=None, **kwargs):
+            if (method == "POST" and endpoint.endswith("/steps") and json.get("url") == "https://a") or (
+                method == "GET" and endpoint == "/buckets/b2/tests/t2"
+            ):
+                request = httpx.Request(method, f"https://api.runscope.com{endpoint}")
+                response = httpx.Response(400, json={"error": {"message": "Invalid step"}}, request=request)
+                raise httpx.HTTPStatusError("Bad Request", request=request, response=response)
+            return await api(token, method, endpoint, result_formatter, json, **kwargs)
+
+        with patch("src.tools.test_manager.api_request", side_effect=_api_request):
+            result = await manager.clone("b1", "t1", "b2")
+
+        assert result.error is None
+        assert result.result == [{"test_id": "t2", "name": "Checkout"}]
+        assert "Copied 2 of 3 steps" in result.info[0]
+        assert "Step 0 was not copied: HTTP 400: Invalid step" in result.warning
+        assert any(warning.startswith("Test t2 was created but could not be read back") for warning in result.warning)
+
+    async def test_clone_of_unreadable_test(self, mock_token, mock_context):
+        """Test nothing is created when the test cannot be read"""
+        manager = TestManager(mock_token, mock_context)
+
+        with patch("src.tools.test_manager.api_request", AsyncMock(return_value=BaseResult(error="Not found"))) as api:
+            result = await manager.clone("b1", "t1", "b2")
+
+        assert api.call_count == 4
+        assert "could not be read: Not found" in result.error
+
+
+@pytest.mark.asyncio
+class TestBucketArchive:
+    """Test cases for exporting and importing bucket archives"""
+
+    @staticmethod
+    def _source_api(tests):
+        async def _api_request(token, method, endpoint, result_formatter=None, json=None, **kwargs):
+            parts = endpoint.strip("/").split("/")
+            if endpoint == "/buckets/b1/tests":
+                return BaseResult(result=result_formatter([
+                    {"id": f"t{i}", "name": f"Test {i}", "default_environment_id": f"env{i}", "trigger_url": "x",
+                     "created_by": {"id": "u", "email": "qa@example.com", "name": "QA"}, "created_at": 0}
+                    for i in range(tests)
+                ], kwargs.get("result_formatter_params")))
+            test_id = parts[3]
+            if len(parts) == 4:
+                return BaseResult(result=[{"id": test_id, "name": f"Test {test_id[1:]}", "default_environment_id": f"env{test_id[1:]}"}])
+            match parts[4]:
+                case "steps":
+                    return BaseResult(result=[{"id": f"{test_id}_s{i}", "step_type": "pause", "duration": i} for i in range(3)])
+                case "environments":
+                    return BaseResult(result=[{"id": f"env{test_id[1:]}", "test_id": test_id, "name": "Default"}])
+                case "schedules":
+                    return BaseResult(result=[{"id": "sch", "environment_id": f"env{test_id[1:]}", "interval": "1h"}])
+
+        return _api_request
+
+    async def test_export_then_import(self, mock_token, mock_context, tmp_path):
+        """Test every test is written in order and replayed into another bucket"""
+        manager = TestManager(mock_token, mock_context)
+        path = str(tmp_path / "backup" / "b1.jsonl.gz")
+        bucket = BaseResult(result=[{"bucket_key": "b1", "name": "Payments"}])
+
+        with patch("src.tools.test_manager.api_request", side_effect=self._source_api(7)), \
+                patch("src.tools.test_manager.BucketManager.read", AsyncMock(return_value=bucket)):
+            exported = await manager.export_bucket("b1", path)
+
+        assert exported.result[0] == {
+            "path": path, "bucket_key": "b1", "tests": 7, "steps": 21, "environments": 7, "schedules": 7
+        }
+
+        writes = []
+
+        async def _target_api(token, method, endpoint, result_formatter=None, json=None, **kwargs):
+            writes.append((method, endpoint, json))
+            if endpoint == "/buckets/b2/tests":
+                return BaseResult(result=[{"id": f"n{len(writes)}", "default_environment_id": "new_default"}])
+            return BaseResult(result=[{"id": "new"}])
+
+        with patch("src.tools.test_manager.api_request", side_effect=_target_api):
+            imported = await manager.import_bucket(path, target_bucket_key="b2")
+
+        created = [body["name"] for method, endpoint, body in writes if endpoint == "/buckets/b2/tests"]
+        assert sorted(created) == [f"Test {i}" for i in range(7)]
+        assert imported.result[0]["tests"] == 7
+        assert imported.result[0]["steps"] == 21
+        assert imported.result[0]["schedules"] == 7
+        assert imported.warning is None
+        step_writes = [endpoint for _, endpoint, body in writes if endpoint.endswith("/steps")]
+        assert len(step_writes) == 21
+
+    async def test_import_keeps_going_after_a_failed_test(self, mock_token, mock_context, tmp_path):
+        """Test a test that fails to be created is reported and the next ones are still imported"""
+        manager = TestManager(mock_token, mock_context)
+        path = str(tmp_path / "b1.jsonl.gz")
+        bucket = BaseResult(result=[{"bucket_key": "b1", "name": "Payments"}])
+        with patch("src.tools.test_manager.api_request", side_effect=self._source_api(3)), \
+                patch("src.tools.test_manager.BucketManager.read", AsyncMock(return_value=bucket)):
+            await manager.export_bucket("b1", path)
+
+        async def _target_api(token, method, endpoint, result_formatter=None, json=None, **kwargs):
+            if endpoint == "/buckets/b2/tests" and json["name"] == "Test 1":
+                raise httpx.ConnectError("Connection reset")
+            return BaseResult(result=[{"id": "new"}])
+
+        with patch("src.tools.test_manager.api_request", side_effect=_target_api):
+            imported = await manager.import_bucket(path, target_bucket_key="b2")
+
+        assert imported.result[0]["tests"] == 2
+        assert imported.warning == ["Test Test 1: It was not imported: ConnectError('Connection reset')"]
+
+    async def test_import_into_new_bucket_of_team(self, mock_token, mock_context, tmp_path):
+        """Test a team_id creates the bucket named after the exported one"""
+        manager = TestManager(mock_token, mock_context)
+        path = str(tmp_path / "b1.jsonl.gz")
+        bucket = BaseResult(result=[{"bucket_key": "b1", "name": "Payments"}])
+        with patch("src.tools.test_manager.api_request", side_effect=self._source_api(1)), \
+                patch("src.tools.test_manager.BucketManager.read", AsyncMock(return_value=bucket)):
+            await manager.export_bucket("b1", path)
+
+        created_bucket = BaseResult(result=[{"bucket_key": "b9", "name": "Payments"}])
+        with patch("src.tools.test_manager.api_request", AsyncMock(return_value=BaseResult(result=[{"id": "n"}]))), \
+                patch("src.tools.test_manager.BucketManager.create", AsyncMock(return_value=created_bucket)) as create:
+            imported = await manager.import_bucket(path, team_id="team_1")
+
+        create.assert_called_once_with("Payments", "team_1")
+        assert imported.result[0]["bucket_key"] == "b9"
+
+    async def test_archive_paths_are_checked(self, mock_token, mock_context, tmp_path):
+        """Test archives need the .jsonl.gz suffix and are not overwritten by default"""
+        manager = TestManager(mock_token, mock_context)
+        existing = tmp_path / "old.jsonl.gz"
+        existing.write_bytes(b"")
+
+        with patch("src.tools.test_manager.api_request") as mock_api:
+            wrong_suffix = await manager.export_bucket("b1", str(tmp_path / "notes.txt"))
+            exists = await manager.export_bucket("b1", str(existing))
+            missing = await manager.import_bucket(str(tmp_path / "missing.jsonl.gz"), target_bucket_key="b2")
+            no_target = await manager.import_bucket(str(existing))
+
+        mock_api.assert_not_called()
+        assert ".jsonl.gz" in wrong_suffix.error
+        assert "already exists" in exists.error
+        assert "does not exist" in missing.error
+        assert "target_bucket_key or team_id" in no_target.error